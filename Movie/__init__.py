@@ -2,6 +2,7 @@
 
 import os
 
+import click
 from flask import Flask
 
 from sqlalchemy import create_engine
@@ -10,6 +11,13 @@ from sqlalchemy.pool import NullPool
 
 import Movie.adapters.repository as repo
 from Movie.adapters.memory_repository import MemoryRepository, populate
+from Movie.adapters import columnar_repository, password_hashing, shared_catalog, snapshot
+from Movie.api import export
+from Movie.fragment_cache import FragmentCacheExtension
+from Movie.news import page_cache
+from Movie.utilities import conditional
+from Movie.utilities.editors_picks import EditorsPicks
+from Movie.utilities.navigation import NavigationMaps
 
 
 def create_app(test_config=None):
@@ -27,9 +35,82 @@ def create_app(test_config=None):
         app.config.from_mapping(test_config)
         data_path = app.config['TEST_DATA_PATH']
 
-    # Create the MemoryRepository implementation for a memory-based repository.
-    repo.repo_instance = MemoryRepository()
-    populate(data_path, repo.repo_instance)
+    if app.config['REPOSITORY'] == 'shared':
+        # Map the read-only catalog file shared by all worker processes, building it first if it is missing or
+        # older than the movie data. Users and comments are loaded per process.
+        catalog_path = app.config.get('SHARED_CATALOG_PATH')
+        if not catalog_path:
+            raise RuntimeError('SHARED_CATALOG_PATH must be set to the catalog file when REPOSITORY is shared')
+        shared_catalog.ensure_catalog(data_path, catalog_path)
+        repo.repo_instance = shared_catalog.SharedCatalogRepository(
+            catalog_path, app.config.get('CASE_INSENSITIVE_USERNAMES', False))
+        shared_catalog.populate(data_path, repo.repo_instance)
+    elif app.config['REPOSITORY'] == 'columnar':
+        # Create the ColumnarRepository implementation, which keeps large catalogs compact.
+        repo.repo_instance = columnar_repository.ColumnarRepository(app.config.get('CASE_INSENSITIVE_USERNAMES', False))
+        columnar_repository.populate(data_path, repo.repo_instance)
+    else:
+        # Create the MemoryRepository implementation for a memory-based repository.
+        repo.repo_instance = MemoryRepository(app.config.get('CASE_INSENSITIVE_USERNAMES', False))
+        # Start from the snapshot when there is an up-to-date one, otherwise from the CSV files.
+        snapshot.populate(app.config.get('SNAPSHOT_PATH'), data_path, repo.repo_instance)
+
+    @app.cli.command('write-snapshot')
+    @click.argument('snapshot_path', required=False)
+    def write_snapshot(snapshot_path):
+        """ Load the CSV files and write a snapshot of the repository for fast startup. """
+        snapshot_path = snapshot_path or app.config.get('SNAPSHOT_PATH')
+        if snapshot_path is None:
+            raise click.UsageError('Give a snapshot path or set SNAPSHOT_PATH')
+        snapshot_repo = MemoryRepository(app.config.get('CASE_INSENSITIVE_USERNAMES', False))
+        populate(data_path, snapshot_repo)
+        snapshot.write_snapshot(snapshot_repo, snapshot_path)
+        click.echo(f'Wrote snapshot of {snapshot_repo.get_number_of_movie()} movies to {snapshot_path}')
+
+    @app.cli.command('build-catalog')
+    @click.argument('catalog_path', required=False)
+    def build_catalog(catalog_path):
+        """ Build the read-only catalog file shared by worker processes when REPOSITORY is shared. """
+        catalog_path = catalog_path or app.config.get('SHARED_CATALOG_PATH')
+        if catalog_path is None:
+            raise click.UsageError('Give a catalog path or set SHARED_CATALOG_PATH')
+        with shared_catalog.catalog_lock(catalog_path):
+            shared_catalog.build_catalog(data_path, catalog_path)
+        click.echo(f'Wrote {catalog_path}')
+
+    @app.cli.command('hash-users')
+    @click.argument('hashed_users_path')
+    def hash_users(hashed_users_path):
+        """ Write a copy of users.csv with hashed passwords, which then loads without hashing. """
+        password_hashing.write_hashed_users_file(os.path.join(data_path, 'users.csv'), hashed_users_path)
+        click.echo(f'Wrote {hashed_users_path}')
+
+    @app.cli.command('export')
+    @click.argument('dataset', type=click.Choice(sorted(export.DATASETS)))
+    @click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+    @click.option('--format', 'export_format', type=click.Choice(sorted(export.FORMATS)), default='ndjson')
+    def export_dataset(dataset, output, export_format):
+        """ Write all movies or reviews as NDJSON or CSV to OUTPUT (standard output by default). """
+        for chunk in export.export_chunks(repo.repo_instance, dataset, export_format):
+            output.write(chunk)
+
+    # Browse pages' ETags are derived from the data the repository was loaded from.
+    app.extensions['data_digest'] = conditional.data_digest(data_path)
+    # Editor's picks in the sidebar change once per rotation period.
+    app.extensions['editors_picks'] = EditorsPicks(app, int(app.config.get('EDITORS_PICKS_ROTATION_SECONDS') or 300))
+    # Genre and actor navigation is rebuilt only when the repository's catalog changes.
+    app.extensions['navigation'] = NavigationMaps()
+
+    # Templates cache fragments such as the sidebar with {% cache %}, under the versions they are rendered from.
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache.maxsize = int(app.config.get('FRAGMENT_CACHE_SIZE') or 256)
+
+    # Pages served to anonymous users are cached until a comment on one of their movies is added.
+    page_cache.cache_for(repo.repo_instance).maxsize = int(app.config.get('PAGE_CACHE_SIZE', 512))
+
+    @app.context_processor
+    def inject_catalog_version():
+        return {'catalog_version': repo.repo_instance.get_catalog_version()}
 
     # Build the application - these steps require an application context.
     with app.app_context():
@@ -46,5 +127,8 @@ def create_app(test_config=None):
         from .utilities import utilities
         app.register_blueprint(utilities.utilities_blueprint)
 
+        from .api import api
+        app.register_blueprint(api.api_blueprint)
+
     return app
 
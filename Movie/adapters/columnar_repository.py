@@ -0,0 +1,548 @@
+import os
+import threading
+import weakref
+
+from array import array
+from bisect import bisect_left, bisect_right, insort_left
+from typing import List
+
+from Movie.adapters.columns import StringColumn
+from Movie.adapters.repository import AbstractRepository, PAGED_KINDS, RankPage, RepositoryException, page_of_ranks
+from Movie.adapters.search_index import SearchIndex
+from Movie.adapters.ingestion import IngestionStats, paused_gc, read_movie_records
+from Movie.adapters.locking import ReaderWriterLock, reads, writes
+from Movie.adapters.memory_repository import load_users, load_comments
+from Movie.domain.domain_model import Movie, Genre, User, Review, Director, Actor
+
+
+ENTITY_CLASSES = {'genre': Genre, 'actor': Actor, 'director': Director}
+
+# Attribute of each entity class that holds the list of Movies the entity is linked to.
+MOVIE_LIST_ATTRIBUTES = {Genre: '_genre_movie', Actor: '_actor_movie', Director: '_Director__director_movie'}
+
+
+class MovieView:
+    """ List-like view of the Movies linked to an entity, backed by an ascending array of movie ranks.
+
+    Movies are materialized by the repository only when the view is iterated or indexed.
+    """
+
+    def __init__(self, repo: 'ColumnarRepository', ranks: array):
+        self._repo = repo
+        self._ranks = ranks
+
+    def __len__(self):
+        return len(self._ranks)
+
+    def __iter__(self):
+        for rank in self._ranks:
+            yield self._repo.get_movie(rank)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._repo.get_movie(rank) for rank in self._ranks[index]]
+        return self._repo.get_movie(self._ranks[index])
+
+    def __contains__(self, movie):
+        if not isinstance(movie, Movie) or movie.id is None:
+            return False
+        index = bisect_left(self._ranks, movie.id)
+        return index < len(self._ranks) and self._ranks[index] == movie.id
+
+    def append(self, movie: Movie):
+        if movie.id is not None and movie not in self:
+            insort_left(self._ranks, movie.id)
+
+
+class ColumnarRepository(AbstractRepository):
+    # Movie fields are stored column by column in typed arrays and string buffers, one row per movie. Movie objects
+    # are only built when asked for, and are shared while anything still refers to them.
+
+    def __init__(self, case_insensitive_usernames: bool = False):
+        super().__init__()
+        # Movie columns.
+        self._ranks = array('i')
+        self._release_years = array('i')
+        self._runtimes = array('i')
+        self._titles = StringColumn()
+        self._descriptions = StringColumn()
+        # Comma separated names of the entities linked to each movie.
+        self._names = {'genre': StringColumn(), 'actor': StringColumn(), 'director': StringColumn()}
+
+        # Rank -> row, as parallel arrays sorted by rank.
+        self._rank_keys = array('i')
+        self._rank_rows = array('i')
+        # Rows ordered by title, then release year.
+        self._order = array('i')
+        # Ranks bucketed by release year, plus the distinct years in ascending order.
+        self._years_index = dict()
+        self._years = list()
+        self._search_index = SearchIndex()
+
+        # Postings: for each kind of entity, entity name -> ascending array of movie ranks.
+        self._postings = {'genre': dict(), 'actor': dict(), 'director': dict()}
+        self._entities = {'genre': dict(), 'actor': dict(), 'director': dict()}
+        self._entity_lists = {'genre': list(), 'actor': list(), 'director': list()}
+        # Links made after a movie was added: kind -> rank -> entity names.
+        self._extra_links = {'genre': dict(), 'actor': dict(), 'director': dict()}
+
+        self._movies = weakref.WeakValueDictionary()
+        # Readers materialize Movies while sharing the read lock, so they take turns at it.
+        self._materialize_lock = threading.Lock()
+        self._users = list()
+        # Users keyed by (optionally case-folded) username, maintained by add_user.
+        self._users_index = dict()
+        self._case_insensitive_usernames = case_insensitive_usernames
+        self._reviews = list()
+        self._reviews_by_rank = dict()
+        # Many requests can read at once under threaded serving; adding users, reviews and movies is serialized.
+        self._lock = ReaderWriterLock()
+
+    @writes
+    def add_user(self, user: User):
+        self._users.append(user)
+        self._users_index.setdefault(self._user_key(user.user_name), user)
+
+    @reads
+    def get_user(self, username) -> User:
+        return self._users_index.get(self._user_key(username))
+
+    @writes
+    def add_movie(self, article: Movie, rank: int, description: str):
+        article.set_id(rank)
+        article.description = description
+        row = self._append_article_row(article)
+        index = bisect_left(self._rank_keys, rank)
+        if index < len(self._rank_keys) and self._rank_keys[index] == rank:
+            # The movie replaces the one of the same rank.
+            self._unindex_row(self._rank_rows[index])
+            self._order.remove(self._rank_rows[index])
+            self._rank_rows[index] = row
+        else:
+            self._rank_keys.insert(index, rank)
+            self._rank_rows.insert(index, row)
+        self._index_row(row)
+        self._insert_order(row)
+        self._movies[rank] = article
+        self._index_postings(article)
+        self._catalog_changed()
+
+    @writes
+    def add_movies(self, articles: List[Movie]):
+        # Bulk load: each Movie must already carry its rank (set_id) and description.
+        start = len(self._ranks)
+        for article in articles:
+            self._append_article_row(article)
+        self._index_rows(start)
+        for article in articles:
+            self._movies[article.id] = article
+            self._index_postings(article)
+        self._catalog_changed()
+
+    @writes
+    def add_movie_rows(self, rows):
+        """ Bulk loads movies from (rank, title, genres, description, director, actors, year, runtime) tuples.
+
+        genres, director and actors are comma separated names. No Movie objects are built.
+        """
+        start = len(self._ranks)
+        for rank, title, genres, description, director, actors, year, runtime in rows:
+            self._append_row(rank, title, year, runtime, description, genres, actors, director)
+        self._index_rows(start)
+
+        # Build the postings and entities from the name columns.
+        postings = {'genre': dict(), 'actor': dict(), 'director': dict()}
+        rows = [row for row in range(start, len(self._ranks)) if self._row_of(self._ranks[row]) == row]
+        for kind, column in self._names.items():
+            for row in rows:
+                for name in self._split_names(column[row]):
+                    if name not in postings[kind]:
+                        postings[kind][name] = array('i')
+                    postings[kind][name].append(self._ranks[row])
+
+        for kind in postings:
+            for name, ranks in postings[kind].items():
+                entity = ENTITY_CLASSES[kind](name)
+                self._entity_lists[kind].append(entity)
+                self._entities[kind].setdefault(name, entity)
+                self._merge_postings(kind, name, sorted(ranks))
+                self._attach_view(kind, entity)
+        self._catalog_changed()
+
+    @reads
+    def get_movie(self, id: int) -> Movie:
+        movie = self._movies.get(id)
+        if movie is None:
+            row = self._row_of(id)
+            if row is not None:
+                with self._materialize_lock:
+                    # Another reader may have materialized the Movie while this one waited.
+                    movie = self._movies.get(id)
+                    if movie is None:
+                        movie = self._materialize(row)
+        return movie
+
+    @reads
+    def get_movie_by_year(self, target_date: int) -> List[Movie]:
+        return sorted(self.get_movie(rank) for rank in self._years_index.get(target_date, []))
+
+    @reads
+    def get_movies_by_year_range(self, start_year: int, end_year: int) -> List[Movie]:
+        start = bisect_left(self._years, start_year)
+        end = bisect_right(self._years, end_year)
+
+        matching_articles = list()
+        for year in self._years[start:end]:
+            matching_articles.extend(self.get_movie_by_year(year))
+        return matching_articles
+
+    @reads
+    def get_release_years(self) -> List[int]:
+        return list(self._years)
+
+    @reads
+    def get_year_of_previous_movie(self, year: int):
+        index = bisect_left(self._years, year)
+        return self._years[index - 1] if index > 0 else None
+
+    @reads
+    def get_year_of_next_movie(self, year: int):
+        index = bisect_right(self._years, year)
+        return self._years[index] if index < len(self._years) else None
+
+    @reads
+    def search_movie_ranks(self, query: str, limit: int = None) -> List[int]:
+        return self._search_index.search(query, limit)
+
+    @reads
+    def get_number_of_movie(self):
+        return len(self._rank_keys)
+
+    @reads
+    def get_first_movie(self):
+        article = None
+
+        if len(self._order) > 0:
+            article = self.get_movie(self._ranks[self._order[0]])
+        return article
+
+    @reads
+    def get_last_movie(self):
+        article = None
+
+        if len(self._order) > 0:
+            article = self.get_movie(self._ranks[self._order[-1]])
+        return article
+
+    @reads
+    def get_movie_by_rank(self, id_list):
+        articles = [self.get_movie(id) for id in id_list]
+        return [article for article in articles if article is not None]
+
+    @reads
+    def get_movie_ranks_for_genre(self, genre_name: str):
+        return list(self._postings['genre'].get(genre_name, []))
+
+    @reads
+    def get_movie_ranks_for_actor(self, actor_name: str):
+        return list(self._postings['actor'].get(actor_name, []))
+
+    @reads
+    def get_movie_ranks_for_director(self, director_name: str):
+        return list(self._postings['director'].get(director_name, []))
+
+    @reads
+    def get_movie_ranks_page(self, kind: str, name: str, limit: int, after_rank: int = None, before_rank=None,
+                             count_total: bool = False) -> RankPage:
+        if kind not in PAGED_KINDS:
+            raise RepositoryException(f'Movies cannot be paged by {kind}')
+        return page_of_ranks(self._postings[kind].get(name, []), limit, after_rank, before_rank, count_total)
+
+    @writes
+    def add_genre(self, tag: Genre):
+        self._add_entity('genre', tag, tag.genre_name, tag.genre_movie)
+        self._catalog_changed()
+
+    @reads
+    def get_genres(self) -> List[Genre]:
+        return self._entity_lists['genre']
+
+    @writes
+    def add_director(self, director: Director):
+        self._add_entity('director', director, director.director_full_name, director.director_movie)
+        self._catalog_changed()
+
+    @reads
+    def get_directors(self) -> List[Director]:
+        return self._entity_lists['director']
+
+    @writes
+    def add_actor(self, actor: Actor):
+        self._add_entity('actor', actor, actor.actor_full_name, actor.actor_movie)
+        self._catalog_changed()
+
+    @reads
+    def get_actors(self) -> List[Actor]:
+        return self._entity_lists['actor']
+
+    @writes
+    def add_review(self, comment: Review):
+        super().add_review(comment)
+        self._reviews.append(comment)
+        if comment.movie.id not in self._reviews_by_rank:
+            self._reviews_by_rank[comment.movie.id] = list()
+        self._reviews_by_rank[comment.movie.id].append(comment)
+        self._movie_changed(comment.movie, comment)
+
+    @writes
+    def make_review(self, review_text: str, user: User, movie: Movie) -> Review:
+        return super().make_review(review_text, user, movie)
+
+    @reads
+    def get_reviews(self):
+        return self._reviews
+
+    def iter_movies(self, batch_size: int = 1000):
+        # Movies in rank order; each batch resumes after the last rank of the one before.
+        batch = self._movies_after(None, batch_size)
+        while len(batch) > 0:
+            yield from batch
+            batch = self._movies_after(batch[-1].id, batch_size)
+
+    def iter_reviews(self, batch_size: int = 1000):
+        start = 0
+        batch = self._reviews_from(start, batch_size)
+        while len(batch) > 0:
+            yield from batch
+            start += len(batch)
+            batch = self._reviews_from(start, batch_size)
+
+    # Helper methods for the iterators, which take the lock for a batch at a time rather than while the caller
+    # consumes the Movies and Comments.
+    @reads
+    def _movies_after(self, rank: int, batch_size: int) -> List[Movie]:
+        start = 0 if rank is None else bisect_right(self._rank_keys, rank)
+        return [self.get_movie(rank) for rank in self._rank_keys[start:start + batch_size]]
+
+    @reads
+    def _reviews_from(self, start: int, batch_size: int) -> List[Review]:
+        return self._reviews[start:start + batch_size]
+
+    # Helper methods to maintain the movie columns. Rows are appended to the columns, then indexed: one at a time by
+    # add_movie, and all together after a bulk load.
+    def _append_article_row(self, article: Movie) -> int:
+        return self._append_row(
+            article.id, article.title, article.release_year, article.runtime_minutes, article.description,
+            ','.join(genre.genre_name for genre in article.genres),
+            ','.join(actor.actor_full_name for actor in article.actors),
+            ','.join(director.director_full_name for director in self._directors_of(article))
+        )
+
+    def _append_row(self, rank, title, year, runtime, description, genres, actors, director) -> int:
+        row = len(self._ranks)
+        self._ranks.append(rank)
+        self._release_years.append(year or 0)
+        self._runtimes.append(runtime or 0)
+        self._titles.append(title)
+        self._descriptions.append(description)
+        self._names['genre'].append(genres)
+        self._names['actor'].append(actors)
+        self._names['director'].append(director)
+        return row
+
+    def _index_rows(self, start: int):
+        """ Indexes the rows appended from row start on, sorting the rank index and the title order once.
+
+        A row replaces any row of the same rank already in the repository, or earlier in the rows appended. Replaced
+        rows are dropped from every index, and left unused in the columns.
+        """
+        added = dict()
+        for row in range(start, len(self._ranks)):
+            added[self._ranks[row]] = row
+        for rank in added:
+            replaced = self._row_of(rank)
+            if replaced is not None:
+                self._unindex_row(replaced)
+
+        # Merge the sorted runs of kept and added ranks.
+        merged = [(rank, row) for rank, row in zip(self._rank_keys, self._rank_rows) if rank not in added]
+        merged.extend(sorted(added.items()))
+        merged.sort()
+        self._rank_keys = array('i', [rank for rank, row in merged])
+        self._rank_rows = array('i', [row for rank, row in merged])
+        for row in sorted(added.values()):
+            self._index_row(row)
+        self._sort_order()
+
+    def _index_row(self, row: int):
+        rank = self._ranks[row]
+        year = self._release_years[row] or None
+        if year not in self._years_index:
+            self._years_index[year] = array('i')
+            if year is not None:
+                insort_left(self._years, year)
+        self._years_index[year].append(rank)
+
+        self._search_index.add(rank, self._titles[row], self._descriptions[row])
+
+    def _unindex_row(self, row: int):
+        rank = self._ranks[row]
+        year = self._release_years[row] or None
+        self._years_index[year].remove(rank)
+        if len(self._years_index[year]) == 0:
+            del self._years_index[year]
+            if year is not None:
+                self._years.remove(year)
+
+        self._search_index.remove(rank)
+        for kind in self._postings:
+            for name in self._linked_names(kind, row):
+                postings = self._postings[kind].get(name)
+                if postings is not None:
+                    index = bisect_left(postings, rank)
+                    if index < len(postings) and postings[index] == rank:
+                        del postings[index]
+            self._extra_links[kind].pop(rank, None)
+        self._movies.pop(rank, None)
+
+    def _row_of(self, rank: int):
+        index = bisect_left(self._rank_keys, rank)
+        if index < len(self._rank_keys) and self._rank_keys[index] == rank:
+            return self._rank_rows[index]
+        return None
+
+    def _sort_key(self, row: int):
+        return self._titles[row], self._release_years[row]
+
+    def _sort_order(self):
+        self._order = array('i', sorted(sorted(self._rank_rows), key=self._sort_key))
+
+    def _insert_order(self, row: int):
+        key = self._sort_key(row)
+        low, high = 0, len(self._order)
+        while low < high:
+            middle = (low + high) // 2
+            if self._sort_key(self._order[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        self._order.insert(low, row)
+
+    def _materialize(self, row: int) -> Movie:
+        rank = self._ranks[row]
+        movie = Movie(self._titles[row], self._release_years[row])
+        movie.set_id(rank)
+        description = self._descriptions[row]
+        if description != '':
+            movie.description = description
+        if self._runtimes[row] > 0:
+            movie.runtime_minutes = self._runtimes[row]
+
+        for name in self._linked_names('genre', row):
+            movie.add_genre(self._entity('genre', name))
+        for name in self._linked_names('actor', row):
+            movie.add_actor(self._entity('actor', name))
+        for name in self._linked_names('director', row):
+            movie.add_director(self._entity('director', name))
+        for review in self._reviews_by_rank.get(rank, []):
+            movie.add_review(review)
+
+        self._movies[rank] = movie
+        return movie
+
+    # Helper methods to maintain the entities and postings.
+    def _add_entity(self, kind: str, entity, name: str, movies):
+        movies = list(movies)
+        self._entity_lists[kind].append(entity)
+        self._entities[kind].setdefault(name, entity)
+
+        ranks = list()
+        for movie in movies:
+            if movie.id is not None and self._row_of(movie.id) is not None:
+                ranks.append(movie.id)
+                linked_names = self._extra_links[kind].setdefault(movie.id, list())
+                if name not in linked_names:
+                    linked_names.append(name)
+        self._merge_postings(kind, name, sorted(ranks))
+        self._attach_view(kind, entity)
+
+    def _attach_view(self, kind: str, entity):
+        setattr(entity, MOVIE_LIST_ATTRIBUTES[ENTITY_CLASSES[kind]], MovieView(self, self._postings[kind][entity_name(entity)]))
+
+    def _merge_postings(self, kind: str, name: str, ranks: List[int]):
+        postings = self._postings[kind].get(name)
+        if postings is None:
+            self._postings[kind][name] = array('i', ranks)
+        else:
+            # Merge in place, so views over the postings see the new ranks.
+            merged = sorted(set(postings).union(ranks))
+            postings[:] = array('i', merged)
+
+    def _add_posting(self, kind: str, name: str, rank: int):
+        postings = self._postings[kind].get(name)
+        if postings is not None:
+            index = bisect_left(postings, rank)
+            if index == len(postings) or postings[index] != rank:
+                postings.insert(index, rank)
+
+    def _index_postings(self, article: Movie):
+        # A movie added at runtime may already be linked to entities in the repository.
+        for genre in article.genres:
+            self._add_posting('genre', genre.genre_name, article.id)
+        for actor in article.actors:
+            self._add_posting('actor', actor.actor_full_name, article.id)
+        for director in self._directors_of(article):
+            self._add_posting('director', director.director_full_name, article.id)
+
+    def _entity(self, kind: str, name: str):
+        entity = self._entities[kind].get(name)
+        if entity is None:
+            entity = ENTITY_CLASSES[kind](name)
+        return entity
+
+    def _linked_names(self, kind: str, row: int) -> List[str]:
+        names = self._split_names(self._names[kind][row])
+        for name in self._extra_links[kind].get(self._ranks[row], []):
+            if name not in names:
+                names.append(name)
+        return names
+
+    @staticmethod
+    def _split_names(names: str) -> List[str]:
+        return [name.strip() for name in names.split(',') if name.strip() != '']
+
+    @staticmethod
+    def _directors_of(article: Movie):
+        if isinstance(article.director, list):
+            return article.director
+        return list()
+
+
+def entity_name(entity) -> str:
+    if isinstance(entity, Genre):
+        return entity.genre_name
+    if isinstance(entity, Actor):
+        return entity.actor_full_name
+    return entity.director_full_name
+
+
+def load_movies_and_genres_and_actors_and_directors(data_path: str, repo: ColumnarRepository, processes: int = None,
+                                                    stats: IngestionStats = None):
+    rows = (
+        (record.rank, record.title, ','.join(record.genres), record.description, record.director,
+         ','.join(record.actors), record.release_year, record.runtime_minutes or 0)
+        for record in read_movie_records(os.path.join(data_path, 'news_articles.csv'), processes, stats=stats)
+    )
+    with paused_gc():
+        repo.add_movie_rows(rows)
+
+
+def populate(data_path: str, repo: ColumnarRepository):
+    # Load movies and their genres, actors and directors into the repository.
+    load_movies_and_genres_and_actors_and_directors(data_path, repo)
+
+    # Load users into the repository.
+    users = load_users(data_path, repo)
+
+    # Load comments into the repository.
+    load_comments(data_path, repo, users)
@@ -0,0 +1,105 @@
+from array import array
+from bisect import bisect_left
+
+
+class StringColumn:
+    """ Strings packed end to end into one UTF-8 buffer and addressed by row through an offsets array.
+
+    The buffer and offsets may also be read-only memoryviews, e.g. over a memory-mapped file.
+    """
+
+    def __init__(self, data=None, offsets=None):
+        self._data = bytearray() if data is None else data
+        self._offsets = array('q', [0]) if offsets is None else offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        return str(self._data[self._offsets[row]:self._offsets[row + 1]], 'utf-8')
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def append(self, value: str):
+        if value is not None:
+            self._data += value.encode('utf-8')
+        self._offsets.append(len(self._data))
+
+
+class SliceColumn:
+    """ Sequences packed end to end into one array and addressed by row through an offsets array. """
+
+    def __init__(self, data, offsets):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row: int):
+        return self._data[self._offsets[row]:self._offsets[row + 1]]
+
+
+class MapColumn:
+    """ A FrozenMap per row, from a column of sorted keys and a parallel column of values. """
+
+    def __init__(self, keys: SliceColumn, values: SliceColumn):
+        self._keys = keys
+        self._values = values
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __getitem__(self, row: int) -> 'FrozenMap':
+        return FrozenMap(self._keys[row], self._values[row])
+
+
+class FrozenMap:
+    """ Read-only mapping over an ascending sequence of keys and a parallel sequence of values.
+
+    Lookups are binary searches, so the keys and values can be compact arrays, memoryviews or columns that are never
+    turned into a dict.
+    """
+
+    def __init__(self, keys, values):
+        self._keys = keys
+        self._values = values
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return self._index(key) is not None
+
+    def __getitem__(self, key):
+        index = self._index(key)
+        if index is None:
+            raise KeyError(key)
+        return self._values[index]
+
+    def get(self, key, default=None):
+        index = self._index(key)
+        return default if index is None else self._values[index]
+
+    def keys(self):
+        return iter(self._keys)
+
+    def values(self):
+        return (self._values[index] for index in range(len(self._keys)))
+
+    def items(self):
+        return ((self._keys[index], self._values[index]) for index in range(len(self._keys)))
+
+    def _index(self, key):
+        try:
+            index = bisect_left(self._keys, key)
+        except TypeError:
+            return None  # A key of another type can't be in the map.
+        if index < len(self._keys) and self._keys[index] == key:
+            return index
+        return None
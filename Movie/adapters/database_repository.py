@@ -1,19 +1,22 @@
 import csv
+import math
 import os
 
 from datetime import date
+from itertools import tee
 from typing import List
 
 from sqlalchemy import desc, asc
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
-from werkzeug.security import generate_password_hash
 
 from sqlalchemy.orm import scoped_session
 from flask import _app_ctx_stack
 
-from Movie.domain.domain_model import User, Movie, Review, Genre, Actor, Director
-from Movie.adapters.repository import AbstractRepository
+from Movie.domain.domain_model import Actor, Director
+from Movie.adapters.orm import User, Movie, Review, Genre, persistent
+from Movie.adapters.password_hashing import hash_passwords, users_file_is_hashed
+from Movie.adapters.repository import AbstractRepository, PAGED_KINDS, RankPage, RepositoryException
 
 genres = None
 director = None
@@ -52,8 +55,11 @@ class SessionContextManager:
 
 
 class SqlAlchemyRepository(AbstractRepository):
+    # Other worker processes write to the same database without changing this process's versions.
+    versions_see_all_changes = False
 
     def __init__(self, session_factory):
+        super().__init__()
         self._session_cm = SessionContextManager(session_factory)
 
     def close_session(self):
@@ -64,13 +70,13 @@ class SqlAlchemyRepository(AbstractRepository):
 
     def add_user(self, user: User):
         with self._session_cm as scm:
-            scm.session.add(user)
+            scm.session.add(persistent(user))
             scm.commit()
 
     def get_user(self, username) -> User:
         user = None
         try:
-            user = self._session_cm.session.query(User).filter_by(_username=username).one()
+            user = self._session_cm.session.query(User).filter_by(_User__user_name=username).one()
         except NoResultFound:
             # Ignore any exception and return None.
             pass
@@ -79,15 +85,16 @@ class SqlAlchemyRepository(AbstractRepository):
 
     def add_movie(self, movie: Movie,rating:int,desc:str):
         with self._session_cm as scm:
-            scm.session.add(movie)
+            scm.session.add(persistent(movie))
             scm.session.add(rating)
             scm.session.add(desc)
             scm.commit()
+        self._catalog_changed()
 
     def get_movie(self, rank: int) -> Movie:
         movie = []
         try:
-            movie = self._session_cm.session.query(Movie).filter(Movie.rank == rank).one()
+            movie = self._session_cm.session.query(Movie).filter(Movie._Movie__id == rank).one()
         except NoResultFound:
             # Ignore any exception and return None.
             pass
@@ -100,9 +107,47 @@ class SqlAlchemyRepository(AbstractRepository):
             return movies
         else:
             # Return articles matching target_date; return an empty list if there are no matches.
-            movies = self._session_cm.session.query(Movie).filter(Movie.year == target_year).all()
+            movies = self._session_cm.session.query(Movie).filter(Movie._Movie__release_year == target_year).all()
             return movies
 
+    def get_movies_by_year_range(self, start_year: int, end_year: int) -> List[Movie]:
+        movies = self._session_cm.session.query(Movie).filter(
+            Movie._Movie__release_year >= start_year, Movie._Movie__release_year <= end_year
+        ).order_by(asc(Movie._Movie__release_year)).all()
+        return movies
+
+    def get_release_years(self) -> List[int]:
+        rows = self._session_cm.session.execute('SELECT DISTINCT year FROM movies ORDER BY year ASC').fetchall()
+        return [row[0] for row in rows]
+
+    def get_year_of_previous_movie(self, year: int):
+        row = self._session_cm.session.execute(
+            'SELECT MAX(year) FROM movies WHERE year < :year', {'year': year}
+        ).fetchone()
+        return row[0]
+
+    def get_year_of_next_movie(self, year: int):
+        row = self._session_cm.session.execute(
+            'SELECT MIN(year) FROM movies WHERE year > :year', {'year': year}
+        ).fetchone()
+        return row[0]
+
+    def search_movie_ranks(self, query: str, limit: int = None) -> List[int]:
+        # There is no full-text index in the database, so match titles containing every word of the query.
+        words = query.split()
+        if len(words) == 0:
+            return list()
+
+        conditions = ' AND '.join(f'title LIKE :word{i}' for i in range(len(words)))
+        parameters = {f'word{i}': f'%{word}%' for i, word in enumerate(words)}
+        statement = f'SELECT rank FROM movies WHERE {conditions} ORDER BY rank ASC'
+        if limit is not None:
+            statement += ' LIMIT :limit'
+            parameters['limit'] = limit
+
+        rows = self._session_cm.session.execute(statement, parameters).fetchall()
+        return [row[0] for row in rows]
+
     def get_number_of_movie(self):
         number_of_movies = self._session_cm.session.query(Movie).count()
         return number_of_movies
@@ -112,11 +157,11 @@ class SqlAlchemyRepository(AbstractRepository):
         return movie
 
     def get_last_article(self):
-        movie = self._session_cm.session.query(Movie).order_by(desc(Movie.rank)).first()
+        movie = self._session_cm.session.query(Movie).order_by(desc(Movie._Movie__id)).first()
         return movie
 
     def get_movies_by_rank(self, rank_list):
-        movies = self._session_cm.session.query(Movie).filter(Movie.rank.in_(rank_list)).all()
+        movies = self._session_cm.session.query(Movie).filter(Movie._Movie__id.in_(rank_list)).all()
         return movies
 
     def get_movie_ranks_for_genre(self, genre_name: str):
@@ -140,6 +185,11 @@ class SqlAlchemyRepository(AbstractRepository):
 
         return movie_ranks
 
+    def get_movie_ranks_page(self, kind: str, name: str, limit: int, after_rank: int = None, before_rank=None,
+                             count_total: bool = False) -> RankPage:
+        return query_movie_ranks_page(self._session_cm.session, kind, name, limit, after_rank, before_rank,
+                                      count_total)
+
 
     def get_genre(self) -> List[Genre]:
         genres = self._session_cm.session.query(Genre).all()
@@ -147,8 +197,9 @@ class SqlAlchemyRepository(AbstractRepository):
 
     def add_genre(self, genre: Genre):
         with self._session_cm as scm:
-            scm.session.add(genre)
+            scm.session.add(persistent(genre))
             scm.commit()
+        self._catalog_changed()
 
     def get_actor(self) -> List[Actor]:
         actors = self._session_cm.session.query(Actor).all()
@@ -158,6 +209,7 @@ class SqlAlchemyRepository(AbstractRepository):
         with self._session_cm as scm:
             scm.session.add(actor)
             scm.commit()
+        self._catalog_changed()
 
     def get_director(self) -> List[Director]:
         directors = self._session_cm.session.query(Director).all()
@@ -167,17 +219,89 @@ class SqlAlchemyRepository(AbstractRepository):
         with self._session_cm as scm:
             scm.session.add(director)
             scm.commit()
+        self._catalog_changed()
 
 
     def get_reviews(self) -> List[Review]:
         reviews = self._session_cm.session.query(Review).all()
         return reviews
 
+    def iter_movies(self, batch_size: int = 1000):
+        # Stream the rows through a server-side cursor, batch_size at a time, rather than loading them all.
+        yield from self._session_cm.session.query(Movie).order_by(asc(Movie._Movie__id)).yield_per(batch_size)
+
+    def iter_reviews(self, batch_size: int = 1000):
+        yield from self._session_cm.session.query(Review).yield_per(batch_size)
+
+    def make_review(self, review_text: str, user: User, movie: Movie) -> Review:
+        # The session's User and Movie can only hold a Review of the mapped class.
+        review = Review(user, movie, review_text, 5)
+        user.add_review(review)
+        movie.add_review(review)
+        self.add_review(review)
+        return review
+
     def add_review(self, review: Review):
         super().add_review(review)
         with self._session_cm as scm:
-            scm.session.add(review)
+            scm.session.add(persistent(review))
             scm.commit()
+        self._movie_changed(review.movie, review)
+
+# Rank column, tables and condition for the name of the Movies of each kind of entity. The movies table holds a movie's
+# director and its actors as text, with the actors separated by ', '.
+PAGED_QUERIES = {
+    'genre': ('movie_genres.movie_id', 'movie_genres JOIN genres ON genres.id = movie_genres.genre_id',
+              'genres.name = :name'),
+    'actor': ('movies.rank', 'movies', "', ' || movies.actors || ', ' LIKE :name ESCAPE '\\'"),
+    'director': ('movies.rank', 'movies', 'movies.director = :name'),
+}
+
+
+def query_movie_ranks_page(session, kind: str, name: str, limit: int, after_rank: int = None, before_rank=None,
+                           count_total: bool = False) -> RankPage:
+    """ Runs the keyset queries of SqlAlchemyRepository.get_movie_ranks_page in session. """
+    if kind not in PAGED_KINDS:
+        raise RepositoryException(f'Movies cannot be paged by {kind}')
+    rank, source, condition = PAGED_QUERIES[kind]
+    parameters = {'name': like_pattern(name) if kind == 'actor' else name, 'limit': limit + 1}
+
+    # Seek to the cursor through the index on rank, and fetch one rank more than the page to see if there are more.
+    if before_rank is not None:
+        if before_rank != math.inf:
+            condition += f' AND {rank} < :before_rank'
+            parameters['before_rank'] = before_rank
+        statement = f'SELECT {rank} FROM {source} WHERE {condition} ORDER BY {rank} DESC LIMIT :limit'
+    else:
+        if after_rank is not None:
+            condition += f' AND {rank} > :after_rank'
+            parameters['after_rank'] = after_rank
+        statement = f'SELECT {rank} FROM {source} WHERE {condition} ORDER BY {rank} ASC LIMIT :limit'
+    ranks = [row[0] for row in session.execute(statement, parameters).fetchall()]
+
+    more = len(ranks) > limit
+    ranks = ranks[:limit]
+    if before_rank is not None:
+        ranks.reverse()
+        # The before_rank of a page is the first rank of the page after it.
+        next_cursor = ranks[-1] if ranks and before_rank != math.inf else None
+        previous_cursor = ranks[0] if ranks and more else None
+    else:
+        next_cursor = ranks[-1] if ranks and more else None
+        previous_cursor = ranks[0] if ranks and after_rank is not None else None
+
+    total = None
+    if count_total:
+        _, _, condition = PAGED_QUERIES[kind]
+        total = session.execute(f'SELECT COUNT(*) FROM {source} WHERE {condition}', parameters).scalar()
+    return RankPage(ranks, next_cursor, previous_cursor, total)
+
+
+def like_pattern(actor_name: str) -> str:
+    """ Returns a LIKE pattern matching the actors text of the Movies actor_name acted in. """
+    escaped = actor_name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%, {escaped}, %'
+
 
 def movie_record_generator(filename: str):
     with open(filename, mode='r', encoding='utf-8-sig') as infile:
@@ -245,9 +369,16 @@ def generic_generator(filename, post_process=None):
             yield row
 
 
-def process_user(user_row):
-    user_row[2] = generate_password_hash(user_row[2])
-    return user_row
+def user_record_generator(filename: str):
+    user_rows, password_rows = tee(generic_generator(filename))
+    passwords = (user_row[2] for user_row in password_rows)
+    if not users_file_is_hashed(filename):
+        # Hash the passwords in a process pool; a pre-hashed users file is loaded as it is.
+        passwords = hash_passwords(passwords)
+
+    for user_row, password in zip(user_rows, passwords):
+        user_row[2] = password
+        yield user_row
 
 
 def populate(engine: Engine, data_path: str):
@@ -282,7 +413,7 @@ def populate(engine: Engine, data_path: str):
         INSERT INTO users (
         id, username, password)
         VALUES (?, ?, ?)"""
-    cursor.executemany(insert_users, generic_generator(os.path.join(data_path, 'users.csv'), process_user))
+    cursor.executemany(insert_users, user_record_generator(os.path.join(data_path, 'users.csv')))
 
     insert_reviews = """
         INSERT INTO reviews (
@@ -0,0 +1,144 @@
+import csv
+import gc
+import io
+import os
+import time
+
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from multiprocessing import Pool
+from typing import Iterator, List
+
+from Movie.domain.domain_model import normalize_name
+
+# Bytes of the movie file parsed by a worker process at a time.
+CHUNK_BYTES = 4 * 2 ** 20
+
+# A row of the movie file, stripped, with its genres and actors split into lists of normalized names.
+MovieRecord = namedtuple('MovieRecord', [
+    'rank', 'title', 'genres', 'description', 'director', 'actors', 'release_year', 'runtime_minutes'])
+
+
+class IngestionStats:
+    """ Rows parsed by read_movie_records so far, and how long it has taken. """
+
+    def __init__(self):
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.seconds == 0:
+            return 0.0
+        return self.rows / self.seconds
+
+
+@contextmanager
+def paused_gc():
+    """ Pauses the cyclic garbage collector while a bulk load allocates many long-lived objects.
+
+    None of those objects are garbage, so letting the collector repeatedly scan the growing heap only costs time.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def split_names(names: str, canonical_names: dict) -> List[str]:
+    names = [normalize_name(name) for name in names.split(',')]
+    return [canonical_names.setdefault(name, name) for name in names if name != '']
+
+
+def parse_movie_row(row: List[str], canonical_names: dict = None) -> MovieRecord:
+    # Equal genre, actor and director names are replaced by the first such string in canonical_names.
+    if canonical_names is None:
+        canonical_names = dict()
+    row = [item.strip() for item in row]
+    return MovieRecord(
+        int(row[0]),
+        row[1],
+        split_names(row[2], canonical_names),
+        row[3],
+        canonical_names.setdefault(normalize_name(row[4]), normalize_name(row[4])),
+        split_names(row[5], canonical_names),
+        int(row[6]),
+        int(row[7]) if len(row) > 7 and row[7] != '' else None
+    )
+
+
+def chunk_ranges(filename: str, chunk_bytes: int = CHUNK_BYTES) -> List[tuple]:
+    """ Splits the rows of a CSV file, after its header, into (start, end) byte ranges of about chunk_bytes.
+
+    Ranges end on line breaks outside quoted fields, so a row whose quoted field spans lines is kept whole. Quotes are
+    counted as the file is read: a line break is inside a quoted field if an odd number of quotes precede it in the
+    range, since an escaped quote counts twice.
+    """
+    ranges = list()
+    size = os.path.getsize(filename)
+    with open(filename, 'rb') as infile:
+        read_to_row_end(infile, 0)
+        start = infile.tell()
+        while start < size:
+            read_to_row_end(infile, infile.read(chunk_bytes).count(b'"'))
+            end = infile.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_to_row_end(infile, quotes: int):
+    # Reads lines until the number of quotes read, starting from quotes, is even at the end of a line.
+    line = infile.readline()
+    quotes += line.count(b'"')
+    while quotes % 2 == 1 and line:
+        line = infile.readline()
+        quotes += line.count(b'"')
+
+
+def parse_chunk(filename: str, start: int, end: int) -> List[MovieRecord]:
+    with open(filename, 'rb') as infile:
+        infile.seek(start)
+        text = infile.read(end - start).decode('utf-8')
+
+    # Repeated names in the chunk share one string, which is pickled back to the consumer only once.
+    canonical_names = dict()
+    return [parse_movie_row(row, canonical_names) for row in csv.reader(io.StringIO(text)) if len(row) > 0]
+
+
+def read_movie_records(filename: str, processes: int = None, chunk_bytes: int = CHUNK_BYTES,
+                       stats: IngestionStats = None) -> Iterator[MovieRecord]:
+    """ Yields the rows of a movie CSV file as MovieRecords, in file order.
+
+    The file is split into byte-range chunks that are parsed by a pool of processes (one per CPU by default). At most
+    two chunks per process are parsed ahead of the consumer, so memory stays bounded however large the file is. A file
+    of a single chunk, or a single process, is parsed in this process. If stats is given, it is kept up to date.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if stats is None:
+        stats = IngestionStats()
+    started = time.perf_counter() - stats.seconds
+    ranges = chunk_ranges(filename, chunk_bytes)
+
+    def parsed(records):
+        stats.rows += len(records)
+        stats.seconds = time.perf_counter() - started
+        return records
+
+    if processes == 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield from parsed(parse_chunk(filename, start, end))
+        return
+
+    with Pool(processes) as pool:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(pool.apply_async(parse_chunk, (filename, start, end)))
+            if len(pending) >= processes * 2:
+                yield from parsed(pending.popleft().get())
+        while len(pending) > 0:
+            yield from parsed(pending.popleft().get())
@@ -0,0 +1,81 @@
+import functools
+import threading
+
+from contextlib import contextmanager
+
+
+class ReaderWriterLock:
+    """ Lets any number of threads read at once, or one thread write.
+
+    Waiting writers go ahead of newly arriving readers, so a steady stream of reads can't starve them. A thread that
+    holds the lock may take it again for reading or writing, except that a reader can't become a writer.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._waiting_writers = 0
+        self._held = threading.local()
+
+    @contextmanager
+    def read(self):
+        if self._writer == threading.get_ident() or self._read_depth() > 0:
+            yield
+            return
+
+        with self._condition:
+            while self._writer is not None or self._waiting_writers > 0:
+                self._condition.wait()
+            self._readers += 1
+        self._held.reads = 1
+        try:
+            yield
+        finally:
+            self._held.reads = 0
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        if self._writer == threading.get_ident():
+            yield
+            return
+        if self._read_depth() > 0:
+            raise RuntimeError('A reader can\'t take the lock for writing')
+
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers > 0:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = threading.get_ident()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
+
+    def _read_depth(self) -> int:
+        return getattr(self._held, 'reads', 0)
+
+
+def reads(method):
+    """ Runs a repository method holding its lock (self._lock) for reading. """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def writes(method):
+    """ Runs a repository method holding its lock (self._lock) for writing. """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+    return locked
@@ -3,38 +3,85 @@ import os
 
 from typing import List
 
-from bisect import bisect_left, insort_left
+from bisect import bisect_left, bisect_right, insort_left
+from itertools import tee
 
-from werkzeug.security import generate_password_hash
-
-from Movie.adapters.repository import AbstractRepository
-from Movie.domain.domain_model import Movie, Genre, User, Review, make_genre_association, make_comment,Director,Actor,make_actor_association,make_director_association
+from Movie.adapters.ingestion import IngestionStats, paused_gc, read_movie_records
+from Movie.adapters.locking import ReaderWriterLock, reads, writes
+from Movie.adapters.password_hashing import hash_passwords, users_file_is_hashed
+from Movie.adapters.repository import AbstractRepository, PAGED_KINDS, RankPage, RepositoryException, page_of_ranks
+from Movie.adapters.search_index import SearchIndex
+from Movie.domain.domain_model import Movie, Genre, User, Review, make_genre_association, make_comment,Director,Actor,make_actor_association,make_director_association, \
+    EntityRegistry
 
 
 class MemoryRepository(AbstractRepository):
     # Articles ordered by date, not id. id is assumed unique.
 
-    def __init__(self):
+    def __init__(self, case_insensitive_usernames: bool = False):
+        super().__init__()
         self._articles = list()
         self._articles_index = dict()
+        # Movies bucketed by release year, plus the distinct years in ascending order.
+        self._years_index = dict()
+        self._years = list()
+        # Full-text index over movie titles and descriptions.
+        self._search_index = SearchIndex()
         self._genres = list()
+        # Postings: for each kind of entity, entity name -> ascending list of ranks of the movies linked to it.
+        self._postings = {'genre': dict(), 'actor': dict(), 'director': dict()}
         self._users = list()
+        # Users keyed by (optionally case-folded) username, maintained by add_user.
+        self._users_index = dict()
+        self._case_insensitive_usernames = case_insensitive_usernames
         self._reviews = list()
         self._directors = list()
         self._actors = list()
+        # Many requests can read at once under threaded serving; adding users, reviews and movies is serialized.
+        self._lock = ReaderWriterLock()
 
+    @writes
     def add_user(self, user: User):
         self._users.append(user)
+        self._users_index.setdefault(self._user_key(user.user_name), user)
 
+    @reads
     def get_user(self, username) -> User:
-        return next((user for user in self._users if user.user_name == username),None)
+        return self._users_index.get(self._user_key(username))
 
+    @writes
     def add_movie(self, article: Movie, rank: int, description:str):
         insort_left(self._articles, article)
         article.set_id(rank)
         article.description = description
         self._articles_index[article.id] = article
-
+        self._index_year(article)
+        self._index_postings(article)
+        self._search_index.add(article.id, article.title, article.description)
+        self._catalog_changed()
+
+    @writes
+    def add_movies(self, articles: List[Movie]):
+        # Bulk load: each Movie must already carry its rank (set_id) and description. The movie list and the year
+        # index are sorted once at the end instead of an insort per movie.
+        self._articles.extend(articles)
+        self._articles.sort()
+
+        for article in articles:
+            self._articles_index[article.id] = article
+            self._index_postings(article)
+            self._search_index.add(article.id, article.title, article.description)
+            year = article.release_year
+            if year not in self._years_index:
+                self._years_index[year] = list()
+            self._years_index[year].append(article)
+
+        for bucket in self._years_index.values():
+            bucket.sort()
+        self._years = sorted(year for year in self._years_index if year is not None)
+        self._catalog_changed()
+
+    @reads
     def get_movie(self, id: int) -> Movie:
         movie = None
 
@@ -45,22 +92,52 @@ class MemoryRepository(AbstractRepository):
 
         return movie
 
+    @reads
     def get_movie_by_year(self, target_date: int) -> List[Movie]:
-        matching_articles = list()
+        # Copy the bucket so callers can't disturb the index.
+        return list(self._years_index.get(target_date, []))
 
-        try:
-            for movie in self._articles:
-                if movie.release_year == target_date:
-                    matching_articles.append(movie)
-        except ValueError:
-            # No articles for specified date. Simply return an empty list.
-            pass
+    @reads
+    def get_movies_by_year_range(self, start_year: int, end_year: int) -> List[Movie]:
+        start = bisect_left(self._years, start_year)
+        end = bisect_right(self._years, end_year)
 
+        matching_articles = list()
+        for year in self._years[start:end]:
+            matching_articles.extend(self._years_index[year])
         return matching_articles
 
+    @reads
+    def get_release_years(self) -> List[int]:
+        return list(self._years)
+
+    @reads
+    def get_year_of_previous_movie(self, year: int):
+        previous_year = None
+
+        index = bisect_left(self._years, year)
+        if index > 0:
+            previous_year = self._years[index - 1]
+        return previous_year
+
+    @reads
+    def get_year_of_next_movie(self, year: int):
+        next_year = None
+
+        index = bisect_right(self._years, year)
+        if index < len(self._years):
+            next_year = self._years[index]
+        return next_year
+
+    @reads
+    def search_movie_ranks(self, query: str, limit: int = None) -> List[int]:
+        return self._search_index.search(query, limit)
+
+    @reads
     def get_number_of_movie(self):
         return len(self._articles)
 
+    @reads
     def get_first_movie(self):
         article = None
 
@@ -68,6 +145,7 @@ class MemoryRepository(AbstractRepository):
             article = self._articles[0]
         return article
 
+    @reads
     def get_last_movie(self):
         article = None
 
@@ -75,6 +153,7 @@ class MemoryRepository(AbstractRepository):
             article = self._articles[-1]
         return article
 
+    @reads
     def get_movie_by_rank(self, id_list):
         # Strip out any ids in id_list that don't represent Article ids in the repository.
         existing_ids = [id for id in id_list if id in self._articles_index]
@@ -83,95 +162,212 @@ class MemoryRepository(AbstractRepository):
         articles = [self._articles_index[id] for id in existing_ids]
         return articles
 
+    @reads
     def get_movie_ranks_for_genre(self, genre_name: str):
-        # Linear search, to find the first occurrence of a Tag with the name tag_name.
-        tag = next((tag for tag in self._genres if tag.genre_name == genre_name), None)
-
-        # Retrieve the ids of articles associated with the Tag.
-        if tag is not None:
-            article_ids = [article.id for article in tag.genre_movie]
-        else:
-            # No Tag with name tag_name, so return an empty list.
-            article_ids = list()
-
-        return article_ids
+        return self._get_postings('genre', genre_name)
 
+    @reads
     def get_movie_ranks_for_actor(self,actor_name:str):
+        return self._get_postings('actor', actor_name)
 
-        actor = next((actor for actor in self._actors if actor.actor_full_name == actor_name),None)
-
-        if actor is not None:
-            movie_ids = [movie.id for movie in actor.actor_movie]
-        else:
-            movie_ids = list()
-
+    @reads
     def get_movie_ranks_for_director(self, director_name: str):
+        return self._get_postings('director', director_name)
 
-        director = next((director for director in self._actors if director.director_full_name == director_name), None)
-
-        if director is not None:
-            movie_ids = [movie.id for movie in director.actor_movie]
-        else:
-            movie_ids = list()
-
-    '''
-    def get_date_of_previous_article(self, article: Article):
-        previous_date = None
-
-        try:
-            index = self.article_index(article)
-            for stored_article in reversed(self._articles[0:index]):
-                if stored_article.date < article.date:
-                    previous_date = stored_article.date
-                    break
-        except ValueError:
-            # No earlier articles, so return None.
-            pass
-
-        return previous_date
-
-    def get_date_of_next_article(self, article: Article):
-        next_date = None
-
-        try:
-            index = self.article_index(article)
-            for stored_article in self._articles[index + 1:len(self._articles)]:
-                if stored_article.date > article.date:
-                    next_date = stored_article.date
-                    break
-        except ValueError:
-            # No subsequent articles, so return None.
-            pass
-
-        return next_date
-    '''
+    @reads
+    def get_movie_ranks_page(self, kind: str, name: str, limit: int, after_rank: int = None, before_rank=None,
+                             count_total: bool = False) -> RankPage:
+        if kind not in PAGED_KINDS:
+            raise RepositoryException(f'Movies cannot be paged by {kind}')
+        return page_of_ranks(self._postings[kind].get(name, []), limit, after_rank, before_rank, count_total)
 
+    @writes
     def add_genre(self, tag: Genre):
         self._genres.append(tag)
+        self._add_postings('genre', tag.genre_name, tag.genre_movie)
+        self._catalog_changed()
 
+    @reads
     def get_genres(self) -> List[Genre]:
         return self._genres
 
+    @writes
     def add_director(self,director:Director):
         self._directors.append(director)
+        self._add_postings('director', director.director_full_name, director.director_movie)
+        self._catalog_changed()
 
+    @reads
     def get_directors(self) -> List[Director]:
         return self._directors
 
+    @writes
     def add_actor(self,actor:Actor):
         self._actors.append(actor)
+        self._add_postings('actor', actor.actor_full_name, actor.actor_movie)
+        self._catalog_changed()
 
+    @reads
     def get_actors(self)->List[Actor]:
         return self._actors
 
+    @writes
     def add_review(self, comment: Review):
         super().add_review(comment)
         self._reviews.append(comment)
+        self._movie_changed(comment.movie, comment)
+
+    @writes
+    def make_review(self, review_text: str, user: User, movie: Movie) -> Review:
+        return super().make_review(review_text, user, movie)
 
+    @reads
     def get_reviews(self):
         return self._reviews
 
-    # Helper method to return article index.
+    def iter_movies(self, batch_size: int = 1000):
+        # Movies in title order; each batch resumes after the last Movie of the one before, wherever it has moved to.
+        batch = self._movies_after(None, batch_size)
+        while len(batch) > 0:
+            yield from batch
+            batch = self._movies_after(batch[-1], batch_size)
+
+    def iter_reviews(self, batch_size: int = 1000):
+        start = 0
+        batch = self._reviews_from(start, batch_size)
+        while len(batch) > 0:
+            yield from batch
+            start += len(batch)
+            batch = self._reviews_from(start, batch_size)
+
+    # Helper methods for the iterators, which take the lock for a batch at a time rather than while the caller
+    # consumes the Movies and Comments.
+    @reads
+    def _movies_after(self, article: Movie, batch_size: int) -> List[Movie]:
+        start = 0
+        if article is not None:
+            # Movies of the same title and year compare equal, so find article itself among them.
+            start = bisect_left(self._articles, article)
+            end = bisect_right(self._articles, article)
+            while start < end and self._articles[start] is not article:
+                start += 1
+            start = start + 1 if start < end else end
+        return self._articles[start:start + batch_size]
+
+    @reads
+    def _reviews_from(self, start: int, batch_size: int) -> List[Review]:
+        return self._reviews[start:start + batch_size]
+
+    @reads
+    def snapshot_state(self) -> dict:
+        """ Returns the repository contents as flat records, in repository order, for writing to a snapshot. """
+        return {
+            'movies': [(article.id, article.title, article.release_year, article.description)
+                       for article in self._articles],
+            'genres': [(genre.genre_name, [movie.id for movie in genre.genre_movie]) for genre in self._genres],
+            'actors': [(actor.actor_full_name, [movie.id for movie in actor.actor_movie]) for actor in self._actors],
+            'directors': [(director.director_full_name, [movie.id for movie in director.director_movie])
+                          for director in self._directors],
+            'postings': self._postings,
+            'search_index': self._search_index,
+            'users': [(user.user_name, user.password) for user in self._users],
+            'reviews': [(review.user.user_name, review.movie.id, review.review_text, review.rating, review.timestamp)
+                        for review in self._reviews],
+        }
+
+    @writes
+    def restore_state(self, state: dict):
+        """ Fills an empty repository from records returned by snapshot_state.
+
+        The records are already in repository order and consistent, so nothing is sorted, re-indexed or re-checked.
+        """
+        for rank, title, release_year, description in state['movies']:
+            article = Movie(title, release_year)
+            article.set_id(rank)
+            article.description = description
+            self._articles.append(article)
+            self._articles_index[rank] = article
+            # Movies arrive in sorted order, so each year bucket is filled in sorted order too.
+            self._years_index.setdefault(release_year, list()).append(article)
+        self._years = sorted(year for year in self._years_index if year is not None)
+
+        # Links are restored in the order they were made, so each movie's genres, actors and directors come back in
+        # their original order; appending directly skips the duplicate checks.
+        for genre_name, ranks in state['genres']:
+            genre = Genre(genre_name)
+            movies = [self._articles_index[rank] for rank in ranks]
+            for article in movies:
+                article.genres.append(genre)
+            genre.add_movies(movies)
+            self._genres.append(genre)
+        for actor_name, ranks in state['actors']:
+            actor = Actor(actor_name)
+            movies = [self._articles_index[rank] for rank in ranks]
+            for article in movies:
+                article.actors.append(actor)
+            actor.add_movies(movies)
+            self._actors.append(actor)
+        for director_name, ranks in state['directors']:
+            director = Director(director_name)
+            movies = [self._articles_index[rank] for rank in ranks]
+            for article in movies:
+                article.director.append(director)
+            director.add_movies(movies)
+            self._directors.append(director)
+        self._postings = state['postings']
+        self._search_index = state['search_index']
+
+        users = dict()
+        for user_name, password in state['users']:
+            user = User(user_name, password)
+            self.add_user(user)
+            users.setdefault(user_name, user)
+        for user_name, rank, review_text, rating, timestamp in state['reviews']:
+            review = Review(users[user_name], self._articles_index[rank], review_text, rating, timestamp)
+            review.user.add_review(review)
+            review.movie.add_review(review)
+            self._reviews.append(review)
+        self._catalog_changed()
+
+    # Helper method to add a movie to the year index.
+    def _index_year(self, article: Movie):
+        year = article.release_year
+        if year not in self._years_index:
+            self._years_index[year] = list()
+            if year is not None:
+                insort_left(self._years, year)
+        insort_left(self._years_index[year], article)
+
+    # Helper methods to maintain the postings index.
+    def _add_postings(self, kind: str, name: str, movies):
+        ranks = [movie.id for movie in movies if movie.id is not None]
+        postings = self._postings[kind].get(name)
+        if postings is None:
+            self._postings[kind][name] = sorted(ranks)
+        else:
+            # Merge with the postings of an entity of the same name added earlier.
+            self._postings[kind][name] = sorted(set(postings).union(ranks))
+
+    def _add_posting(self, kind: str, name: str, rank: int):
+        postings = self._postings[kind].get(name)
+        if postings is not None:
+            index = bisect_left(postings, rank)
+            if index == len(postings) or postings[index] != rank:
+                postings.insert(index, rank)
+
+    def _index_postings(self, article: Movie):
+        # A movie added at runtime may already be linked to entities in the repository.
+        for genre in article.genres:
+            self._add_posting('genre', genre.genre_name, article.id)
+        for actor in article.actors:
+            self._add_posting('actor', actor.actor_full_name, article.id)
+        if isinstance(article.director, list):
+            for director in article.director:
+                self._add_posting('director', director.director_full_name, article.id)
+
+    def _get_postings(self, kind: str, name: str):
+        # Copy the postings so callers can't disturb the index.
+        return list(self._postings[kind].get(name, []))
 
 
 def read_csv_file(filename: str):
@@ -188,78 +384,84 @@ def read_csv_file(filename: str):
             yield row
 
 
-def load_movies_and_genres_and_actors_and_directors(data_path: str, repo: MemoryRepository):
-    tags = dict()
-    actors = dict()
-    directors = dict()
+def load_movies_and_genres_and_actors_and_directors(data_path: str, repo: MemoryRepository, processes: int = None,
+                                                    stats: IngestionStats = None):
+    # Everything built here is kept, so the collector is paused for the duration of the load.
+    with paused_gc():
+        movies = list()
+        tags = dict()
+        actors = dict()
+        directors = dict()
 
-    for data_row in read_csv_file(os.path.join(data_path,'news_articles.csv')):
+        # Rows are parsed and normalised in worker processes; the dictionaries and domain objects are built here.
+        for record in read_movie_records(os.path.join(data_path, 'news_articles.csv'), processes, stats=stats):
+            article_key = record.rank
 
-        article_key = int(data_row[0])
-        number_of_tags = len(data_row[2].split())
-        article_tags = data_row[2].split(",")
-        movie_actors = data_row[5].split(",")
-        movie_director = data_row[4]
-        movie_description = data_row[3]
+            # Add any new tags; associate the current article with tags.
+            for tag in record.genres:
+                tags.setdefault(tag, list()).append(article_key)
 
-        # Add any new tags; associate the current article with tags.
-        for tag in article_tags:
-            if tag not in tags.keys():
-                tags[tag] = list()
-            tags[tag].append(article_key)
-        #del data_row[-number_of_tags:]
+            for actor in record.actors:
+                actors.setdefault(actor, list()).append(article_key)
 
-        for actor in movie_actors:
-            if actor not in actors.keys():
-                actors[actor] = list()
-            actors[actor].append(article_key)
-        # Create Article object.
+            directors.setdefault(record.director, list()).append(article_key)
 
-        if movie_director not in directors.keys():
-            directors[movie_director] = list()
-        directors[movie_director].append(article_key)
+            # Create Article object.
+            movie = Movie(
+                title=record.title,
+                release_year=record.release_year
+            )
+            movie.set_id(article_key)
+            movie.description = record.description
+            movies.append(movie)
 
-        movie = Movie(
-            title=data_row[1],
-            release_year= int(data_row[6])
+        # Add all the movies to the repository in one go.
+        repo.add_movies(movies)
 
-        )
-        repo.add_movie(movie, article_key, movie_description)
+        # One shared entity per name, with an interned name string.
+        registry = EntityRegistry()
 
-    # Create Tag objects, associate them with Articles and add them to the repository.
-    for tag_name in tags.keys():
-        tag = Genre(tag_name)
+        # Create Tag objects, associate them with Articles and add them to the repository.
+        for tag_name in tags.keys():
+            tag = registry.genre(tag_name)
 
-        # Add the Article to the repository.
+            # Add the Article to the repository.
 
-        for article_id in tags[tag_name]:
-            movie = repo.get_movie(article_id)
-            make_genre_association(movie, tag)
-        repo.add_genre(tag)
+            for article_id in tags[tag_name]:
+                movie = repo.get_movie(article_id)
+                make_genre_association(movie, tag)
+            repo.add_genre(tag)
 
-    for actor_name in actors.keys():
-        actor = Actor(actor_name)
-        for article_id in actors[actor_name]:
-            movie = repo.get_movie(article_id)
-            make_actor_association(movie,actor)
-        repo.add_actor(actor)
+        for actor_name in actors.keys():
+            actor = registry.actor(actor_name)
+            for article_id in actors[actor_name]:
+                movie = repo.get_movie(article_id)
+                make_actor_association(movie,actor)
+            repo.add_actor(actor)
 
-    for director_name in directors.keys():
-        director = Director(director_name)
-        for movie_id in directors[director_name]:
-            movie = repo.get_movie(movie_id)
-            make_director_association(movie,director)
-        repo.add_director(director)
+        for director_name in directors.keys():
+            director = registry.director(director_name)
+            for movie_id in directors[director_name]:
+                movie = repo.get_movie(movie_id)
+                make_director_association(movie,director)
+            repo.add_director(director)
 
 
 
 def load_users(data_path: str, repo: MemoryRepository):
     users = dict()
 
-    for data_row in read_csv_file(os.path.join(data_path, 'users.csv')):
+    filename = os.path.join(data_path, 'users.csv')
+    data_rows, password_rows = tee(read_csv_file(filename))
+    passwords = (data_row[2] for data_row in password_rows)
+    if not users_file_is_hashed(filename):
+        # Hash the passwords in a process pool; a pre-hashed users file is loaded as it is.
+        passwords = hash_passwords(passwords)
+
+    for data_row, password in zip(data_rows, passwords):
         user = User(
             user_name=data_row[1],
-            password=generate_password_hash(data_row[2])
+            password=password
         )
         repo.add_user(user)
         users[data_row[0]] = user
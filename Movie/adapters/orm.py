@@ -2,12 +2,91 @@ from sqlalchemy import (
     Table, MetaData, Column, Integer, String, Date, DateTime,
     ForeignKey
 )
-from sqlalchemy.orm import mapper, relationship
+from sqlalchemy.orm import mapper, relationship, class_mapper, reconstructor
 
 import Movie.domain.domain_model as model
 
 metadata = MetaData()
 
+
+# The domain classes declare __slots__ to keep the in-memory catalog small, so their instances have no __dict__ for
+# SQLAlchemy to keep its instance state in, and the domain classes can't be mapped. These dict-backed subclasses are
+# mapped instead: sessions are queried with them, and return instances of them, which are also instances of the domain
+# classes. Code that queries or adds entities to a session imports them from here.
+#
+# The columns and relationships are mapped onto the slot names of the domain classes, as Python mangles them, so the
+# domain methods read and write the mapped attributes. Loading an instance doesn't call __init__; the reconstructors
+# give the attributes that have no column their initial values.
+class User(model.User):
+    @reconstructor
+    def _init_unmapped(self):
+        self._User__watched_movies = list()
+        self._User__time_spent_watching_movies_minutes = 0
+
+
+class Review(model.Review):
+    @reconstructor
+    def _init_unmapped(self):
+        self._Review__rating = None
+
+
+class Movie(model.Movie):
+    @reconstructor
+    def _init_unmapped(self):
+        self._Movie__description = None
+        self._Movie__director = list()
+        self._Movie__actors = list()
+        self._Movie__runtime_minutes = None
+
+
+class Genre(model.Genre):
+    pass
+
+
+PERSISTENT_CLASSES = {model.User: User, model.Review: Review, model.Movie: Movie, model.Genre: Genre}
+
+
+def persistent(entity, copies: dict = None):
+    """ Returns a copy of a domain entity as an instance of its mapped class, ready to add to a session.
+
+    The domain layer, such as the services, builds instances of the unmapped domain classes, which a session refuses
+    to add. The repository passes them through here first. The Users, Reviews, Movies and Genres the entity refers to
+    are copied with it, each once, so the copies refer to each other as the originals do; the session tracks the
+    copies, not the originals. Entities that are already persistent, or have no mapped class, are returned unchanged.
+    """
+    mapped_class = PERSISTENT_CLASSES.get(type(entity))
+    if mapped_class is None:
+        return entity
+    if copies is None:
+        copies = dict()
+    if id(entity) in copies:
+        return copies[id(entity)]
+
+    instance = copies[id(entity)] = class_mapper(mapped_class).class_manager.new_instance()
+    for name in slot_names(type(entity)):
+        if hasattr(entity, name):
+            setattr(instance, name, _persistent_value(getattr(entity, name), copies))
+    return instance
+
+
+def _persistent_value(value, copies: dict):
+    if isinstance(value, (list, model.Association)):
+        return [persistent(item, copies) for item in value]
+    return persistent(value, copies)
+
+
+def slot_names(cls):
+    # Slot attribute names, with private names mangled the way Python stores them.
+    names = list()
+    for klass in cls.__mro__:
+        for name in getattr(klass, '__slots__', ()):
+            if name == '__weakref__':
+                continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = f'_{klass.__name__.lstrip("_")}{name}'
+            names.append(name)
+    return names
+
 users = Table(
     'users', metadata,
     Column('id', Integer, primary_key=True, autoincrement=True),
@@ -49,26 +128,32 @@ movie_genres = Table(
 
 
 def map_model_to_tables():
-    mapper(model.User, users, properties={
-        '_username': users.c.username,
-        '_password': users.c.password,
-        '_reviews': relationship(model.Review, backref='_user')
+    mapper(User, users, properties={
+        '_User__user_name': users.c.username,
+        '_User__password': users.c.password,
+        '_User__reviews': relationship(Review, back_populates='_Review__user')
     })
-    mapper(model.Review, reviews, properties={
-        '_review': reviews.c.review,
-        '_timestamp': reviews.c.timestamp
+    mapper(Review, reviews, properties={
+        '_Review__review_text': reviews.c.review,
+        '_Review__timestamp': reviews.c.timestamp,
+        '_Review__user': relationship(User, back_populates='_User__reviews'),
+        '_Review__movie': relationship(Movie, back_populates='_Movie__review')
     })
-    movies_mapper = mapper(model.Movie, movies, properties={
-        '_rank': movies.c.rank,
-        '_year': movies.c.year,
-        '_title': movies.c.title,
-        '_reviews': relationship(model.Review, backref='_movie')
+    movies_mapper = mapper(Movie, movies, properties={
+        '_Movie__id': movies.c.rank,
+        '_Movie__release_year': movies.c.year,
+        '_Movie__title': movies.c.title,
+        # The names of a movie's director, genres and actors, as text; kept off the domain's director and actors.
+        '_director_names': movies.c.director,
+        '_genre_names': movies.c.genres,
+        '_actor_names': movies.c.actors,
+        '_Movie__review': relationship(Review, back_populates='_Review__movie')
     })
-    mapper(model.Genre, genres, properties={
-        '_genre_name': genres.c.name,
-        '_genred_movie': relationship(
+    mapper(Genre, genres, properties={
+        '_Genre__genre_name': genres.c.name,
+        '_genre_movie': relationship(
             movies_mapper,
             secondary=movie_genres,
-            backref="_genres"
+            backref='_Movie__genres'
         )
     })
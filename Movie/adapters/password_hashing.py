@@ -0,0 +1,58 @@
+import csv
+import os
+
+from itertools import islice
+from multiprocessing import Pool
+from typing import Iterable, Iterator
+
+from werkzeug.security import generate_password_hash
+
+# Header of the third column of a users file whose passwords are already hashed. Such files are loaded as they are.
+HASHED_PASSWORD_HEADER = 'password_hash'
+
+# Passwords handed to each worker process at a time.
+CHUNK_SIZE = 32
+
+
+def users_file_is_hashed(filename: str) -> bool:
+    with open(filename, encoding='utf-8-sig') as infile:
+        headers = next(csv.reader(infile), [])
+    return len(headers) > 2 and headers[2].strip() == HASHED_PASSWORD_HEADER
+
+
+def hash_passwords(passwords: Iterable[str], processes: int = None, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """ Yields generate_password_hash(password) for each of passwords, in order.
+
+    Hashing is spread over a pool of processes (one per CPU by default). Passwords are read from passwords a batch at
+    a time, so a generator of passwords is never held in memory all at once. Fewer passwords than one chunk, or a
+    single process, are hashed in this process.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    passwords = iter(passwords)
+    batch_size = chunk_size * processes * 4
+
+    batch = list(islice(passwords, batch_size))
+    if processes == 1 or len(batch) <= chunk_size:
+        yield from map(generate_password_hash, batch)
+        yield from map(generate_password_hash, passwords)
+        return
+
+    with Pool(processes) as pool:
+        while len(batch) > 0:
+            yield from pool.map(generate_password_hash, batch, chunk_size)
+            batch = list(islice(passwords, batch_size))
+
+
+def write_hashed_users_file(filename: str, hashed_filename: str, processes: int = None):
+    """ Writes a copy of the users file with its passwords hashed, which can then be loaded without hashing. """
+    with open(filename, encoding='utf-8-sig') as infile:
+        reader = csv.reader(infile)
+        headers = next(reader)
+        rows = [[item.strip() for item in row] for row in reader]
+
+    with open(hashed_filename, 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(headers[:2] + [HASHED_PASSWORD_HEADER] + headers[3:])
+        for row, password_hash in zip(rows, hash_passwords((row[2] for row in rows), processes)):
+            writer.writerow(row[:2] + [password_hash] + row[3:])
@@ -1,5 +1,10 @@
 import abc
-from typing import List
+import hashlib
+import itertools
+import time
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from typing import Iterator, List
 from datetime import date
 
 from Movie.domain.domain_model import Movie, Genre, User, Review, make_genre_association, make_comment,Director,Actor
@@ -7,6 +12,19 @@ from Movie.domain.domain_model import Movie, Genre, User, Review, make_genre_ass
 
 repo_instance = None
 
+# Source of the versions of repository contents; every change takes a new, higher number. It is shared by all the
+# repositories of the process rather than kept per repository, because the navigation maps and template fragment cache
+# of an app key their entries on the version of repo_instance alone: a repository that replaces repo_instance must not
+# hand out a version that the one before it already had.
+_versions = itertools.count(1)
+
+
+# A page of Movie ranks and the cursors of the pages on either side of it.
+RankPage = namedtuple('RankPage', ['ranks', 'next_cursor', 'previous_cursor', 'total'])
+
+# Kinds of entity whose Movies can be paged through.
+PAGED_KINDS = ('genre', 'actor', 'director')
+
 
 class RepositoryException(Exception):
 
@@ -15,6 +33,16 @@ class RepositoryException(Exception):
 
 
 class AbstractRepository(abc.ABC):
+    # Implementations that index users by case-folded username set this.
+    _case_insensitive_usernames = False
+    # Whether the versions record every change to the repository. They only count changes made through this instance,
+    # which is every change for a repository held in the process's memory, but not for a database other processes
+    # write to.
+    versions_see_all_changes = True
+
+    def __init__(self):
+        # Key -> (version, time, digest) of the last change recorded under it by _record_change.
+        self._changes = dict()
 
     @abc.abstractmethod
     def add_user(self, user: User):
@@ -50,6 +78,43 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_movies_by_year_range(self, start_year: int, end_year: int) -> List[Movie]:
+        """ Returns a list of Movies released between start_year and end_year inclusive, ordered by year.
+
+        If there are no Movies in the range, this method returns an empty list.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_release_years(self) -> List[int]:
+        """ Returns the distinct release years of Movies in the repository, in ascending order. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_year_of_previous_movie(self, year: int):
+        """ Returns the latest release year before year that has Movies.
+
+        Returns None if there are no Movies released before year.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_year_of_next_movie(self, year: int):
+        """ Returns the earliest release year after year that has Movies.
+
+        Returns None if there are no Movies released after year.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def search_movie_ranks(self, query: str, limit: int = None) -> List[int]:
+        """ Returns the ranks of Movies whose title or description match query, best match first.
+
+        At most limit ranks are returned when limit is given. If nothing matches, this method returns an empty list.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_number_of_movie(self):
         """ Returns the number of Articles in the repository. """
@@ -94,6 +159,22 @@ class AbstractRepository(abc.ABC):
     @abc.abstractmethod
     def get_movie_ranks_for_director(self,director_name:str):
         raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_movie_ranks_page(self, kind: str, name: str, limit: int, after_rank: int = None, before_rank=None,
+                             count_total: bool = False) -> 'RankPage':
+        """ Returns a page of the ranks, in ascending order, of the Movies of the Genre, Actor or Director of kind
+        ('genre', 'actor' or 'director') named name.
+
+        The page holds the first limit ranks greater than after_rank, or from the start when after_rank is None. If
+        before_rank is given, the page instead holds the last limit ranks less than before_rank; a before_rank of
+        math.inf gives the last page. The page's next_cursor and previous_cursor are the after_rank and before_rank of
+        the neighbouring pages, or None where there are no more ranks. Its total is the number of ranks of name when
+        count_total is True, and None otherwise.
+
+        Finding a page costs the same however deep it is. An unknown kind raises a RepositoryException.
+        """
+        raise NotImplementedError
     @abc.abstractmethod
 
     def add_genre(self, tag: Genre):
@@ -117,11 +198,35 @@ class AbstractRepository(abc.ABC):
         if comment.movie is None or comment not in comment.movie.review:
             raise RepositoryException('Comment not correctly attached to an Article')
 
+    def make_review(self, review_text: str, user: User, movie: Movie) -> Review:
+        """ Makes a Comment by user on movie, links it to both and adds it to the repository.
+
+        Repositories that lock do all of this under one write lock, so no reader sees a Comment linked to its User and
+        Movie that the repository hasn't added.
+        """
+        review = make_comment(review_text, user, movie)
+        self.add_review(review)
+        return review
+
     @abc.abstractmethod
     def get_reviews(self):
         """ Returns the Comments stored in the repository. """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def iter_movies(self, batch_size: int = 1000) -> Iterator[Movie]:
+        """ Yields each Movie in the repository, fetching batch_size Movies at a time, so that the Movies of the whole
+        repository are never held at once.
+
+        The order of the Movies depends on the implementation. Movies added while iterating may not be yielded.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_reviews(self, batch_size: int = 1000) -> Iterator[Review]:
+        """ Yields each Comment in the repository, fetching batch_size Comments at a time. """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_directors(self):
         """ Return the Directors in the repository."""
@@ -138,5 +243,95 @@ class AbstractRepository(abc.ABC):
     def get_actors(self):
         raise NotImplementedError
 
+    def get_catalog_version(self) -> int:
+        """ Returns a version of the repository that changes whenever a Movie, Genre, Actor or Director is added. """
+        return self._change_of('catalog')[0]
 
+    def get_movie_version(self, rank: int) -> tuple:
+        """ Returns the version of the Movie with rank.
+
+        The version changes whenever a Comment is added to the Movie, or a Movie, Genre, Actor or Director is added to
+        the repository, so anything built from the Movie can be cached under its version.
+
+        Only changes made through this repository are counted. If versions_see_all_changes is False, as for
+        SqlAlchemyRepository, other processes can change the Movie without changing its version, and nothing built
+        from it is cached.
+        """
+        return self.get_catalog_version(), self._change_of(('movie', rank))[0]
 
+    def get_mutation_version(self, kind: str = None, name=None) -> int:
+        """ Returns a version that grows whenever the repository changes in a way that can change what is shown of
+        the Movies of the Genre, Actor, Director or release year of kind ('genre', 'actor', 'director' or 'year')
+        named name: a Movie, Genre, Actor or Director is added, or a Comment on one of its Movies.
+
+        With no kind, the version grows with every change to the Movies and Comments in the repository.
+        """
+        return self._last_change(kind, name)[0]
+
+    def get_mutation_time(self, kind: str = None, name=None) -> float:
+        """ Returns the time, in seconds since the epoch, of the change that gave get_mutation_version its value. """
+        return self._last_change(kind, name)[1]
+
+    def get_mutation_digest(self, kind: str = None, name=None) -> str:
+        """ Returns a digest of the changes counted by get_mutation_version, and of the Comments added by them.
+
+        Unlike the version, which comes from a counter shared by the process, the digest depends only on the changes
+        themselves, so repositories loaded the same way from the same data give the same digests until different
+        Comments are added to them, as in different worker processes.
+        """
+        if kind is None:
+            return self._change_of('all')[2].hex()
+        return (self._change_of('catalog')[2] + self._change_of((kind, name))[2]).hex()
+
+    # Helper methods for implementations to call after they change the repository.
+    def _catalog_changed(self):
+        self._record_change(['catalog', 'all'])
+
+    def _movie_changed(self, movie: Movie, review: Review = None):
+        keys = ['all', ('movie', movie.id), ('year', movie.release_year)]
+        keys.extend(('genre', genre.genre_name) for genre in movie.genres)
+        keys.extend(('actor', actor.actor_full_name) for actor in movie.actors)
+        directors = movie.director if isinstance(movie.director, list) else [movie.director]
+        keys.extend(('director', director.director_full_name) for director in directors if director is not None)
+        content = b''
+        if review is not None:
+            # Comments loaded from the data files are stamped with the time they were loaded, so the time is left out.
+            user_name = review.user.user_name if review.user is not None else None
+            content = repr((user_name, movie.id, review.review_text, review.rating)).encode()
+        self._record_change(keys, content)
+
+    def _record_change(self, keys: list, content: bytes = b''):
+        # Each key's digest chains the content of every change recorded under it.
+        version = next(_versions)
+        now = time.time()
+        for key in keys:
+            digest = hashlib.blake2b(self._change_of(key)[2] + content, digest_size=8).digest()
+            self._changes[key] = (version, now, digest)
+
+    def _change_of(self, key) -> tuple:
+        return self._changes.get(key, (0, 0.0, b''))
+
+    def _last_change(self, kind: str, name) -> tuple:
+        if kind is None:
+            return self._change_of('all')
+        return max(self._change_of('catalog'), self._change_of((kind, name)))
+
+    # Helper method to return the users index key for a username.
+    def _user_key(self, username):
+        if self._case_insensitive_usernames and isinstance(username, str):
+            return username.casefold()
+        return username
+
+
+def page_of_ranks(ranks, limit: int, after_rank: int = None, before_rank=None, count_total: bool = False) -> RankPage:
+    """ Returns a page of ranks, a sorted sequence, as get_movie_ranks_page does, found by bisection. """
+    if before_rank is not None:
+        end = bisect_left(ranks, before_rank)
+        start = max(0, end - limit)
+    else:
+        start = 0 if after_rank is None else bisect_right(ranks, after_rank)
+        end = min(len(ranks), start + limit)
+    page = list(ranks[start:end])
+    next_cursor = page[-1] if page and end < len(ranks) else None
+    previous_cursor = page[0] if page and start > 0 else None
+    return RankPage(page, next_cursor, previous_cursor, len(ranks) if count_total else None)
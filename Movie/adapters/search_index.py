@@ -0,0 +1,223 @@
+import math
+import re
+import sys
+
+from array import array
+from heapq import heappush, heappushpop
+from typing import List
+
+from Movie.adapters.columns import FrozenMap, MapColumn, SliceColumn
+
+# Runs of word characters in any script, so accented and non-Latin titles can be found.
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    if text is None:
+        return list()
+    # Lower-casing is the same as case-folding for ASCII text, and quicker.
+    return TOKEN_PATTERN.findall(text.lower() if text.isascii() else text.casefold())
+
+
+class SearchIndex:
+    """ Inverted index over movie text, ranked with Okapi BM25.
+
+    Documents are identified by movie rank and can be added one at a time, so the index grows with the repository.
+    Top-k searches walk impact-ordered posting lists (threshold algorithm) and stop early. The impact lists are built
+    lazily per term and dropped when a document containing the term is added or removed; the lists of other terms are
+    kept, and their scores scaled up to bounds that still hold for the current collection statistics.
+    Matches scoring the same are ordered by rank.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self._k1 = k1
+        self._b = b
+        # term -> {rank: term frequency}
+        self._postings = dict()
+        # rank -> number of tokens in the document
+        self._lengths = dict()
+        # rank -> distinct terms of the document
+        self._terms = dict()
+        self._total_length = 0
+        # term -> (ranks, scores, idf, average document length), ordered by descending score, with the collection
+        # statistics the scores were computed with
+        self._impacts = dict()
+
+    def __getstate__(self):
+        # The impact lists are a cache; they are rebuilt on demand after unpickling.
+        state = self.__dict__.copy()
+        state['_impacts'] = dict()
+        return state
+
+    def to_arrays(self) -> dict:
+        """ Returns the index as sorted terms and flat arrays, the arguments of SearchIndex.from_arrays. """
+        terms = sorted(self._postings)
+        term_offsets = array('q', [0])
+        ranks = array('i')
+        frequencies = array('i')
+        for term in terms:
+            postings = self._postings[term]
+            for rank in sorted(postings):
+                ranks.append(rank)
+                frequencies.append(postings[rank])
+            term_offsets.append(len(ranks))
+
+        length_ranks = sorted(self._lengths)
+        return {
+            'terms': terms, 'term_offsets': term_offsets, 'ranks': ranks, 'frequencies': frequencies,
+            'length_ranks': array('i', length_ranks),
+            'lengths': array('i', [self._lengths[rank] for rank in length_ranks]),
+            'total_length': self._total_length, 'k1': self._k1, 'b': self._b
+        }
+
+    @classmethod
+    def from_arrays(cls, terms, term_offsets, ranks, frequencies, length_ranks, lengths, total_length: int,
+                    k1: float, b: float) -> 'SearchIndex':
+        """ Returns a read-only index over the arrays from to_arrays, or memoryviews of them, without copying them.
+
+        terms may be any ascending sequence of strings, such as a StringColumn.
+        """
+        index = cls(k1, b)
+        index._postings = FrozenMap(terms, MapColumn(SliceColumn(ranks, term_offsets),
+                                                     SliceColumn(frequencies, term_offsets)))
+        index._lengths = FrozenMap(length_ranks, lengths)
+        index._total_length = total_length
+        return index
+
+    @property
+    def number_of_documents(self) -> int:
+        return len(self._lengths)
+
+    def add(self, rank: int, *texts: str):
+        if rank in self._lengths:
+            self.remove(rank)
+
+        # Terms are interned, so the forward index shares the term strings of the postings.
+        terms = list()
+        length = 0
+        for text in texts:
+            for term in tokenize(text):
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[sys.intern(term)] = dict()
+                frequency = postings.get(rank)
+                if frequency is None:
+                    terms.append(sys.intern(term))
+                    postings[rank] = 1
+                else:
+                    postings[rank] = frequency + 1
+                length += 1
+
+        if self._impacts:
+            for term in terms:
+                self._impacts.pop(term, None)
+        self._lengths[rank] = length
+        self._terms[rank] = tuple(terms)
+        self._total_length += length
+
+    def remove(self, rank: int):
+        length = self._lengths.pop(rank, None)
+        if length is None:
+            return
+
+        self._total_length -= length
+        for term in self._terms.pop(rank):
+            del self._postings[term][rank]
+            if len(self._postings[term]) == 0:
+                del self._postings[term]
+            self._impacts.pop(term, None)
+
+    def search(self, query: str, limit: int = None) -> List[int]:
+        """ Returns the ranks of movies matching any term of query, best match first, then by rank.
+
+        If limit is given, only the best limit ranks are returned.
+        """
+        # Look up each term's postings once per query, in a fixed order so scores are summed the same way every time.
+        postings = {term: self._postings.get(term) for term in sorted(set(tokenize(query)))}
+        postings = {term: term_postings for term, term_postings in postings.items() if term_postings is not None}
+        terms = list(postings)
+        if len(terms) == 0 or limit == 0:
+            return list()
+
+        if limit is None:
+            scores = dict()
+            for term in terms:
+                for rank in postings[term]:
+                    if rank not in scores:
+                        scores[rank] = self._score(rank, postings)
+            return sorted(scores, key=lambda rank: (-scores[rank], rank))
+
+        impact_lists = [self._impact_list(term) for term in terms]
+        best = list()  # min-heap of (score, -rank) holding the best limit documents seen so far
+        seen = set()
+        depth = 0
+        while True:
+            threshold = 0.0
+            deepest_rank = 0
+            exhausted = True
+            for ranks, impacts, scale in impact_lists:
+                if depth < len(ranks):
+                    exhausted = False
+                    threshold += impacts[depth] * scale
+                    rank = ranks[depth]
+                    deepest_rank = max(deepest_rank, rank)
+                    if rank not in seen:
+                        seen.add(rank)
+                        entry = (self._score(rank, postings), -rank)
+                        if len(best) < limit:
+                            heappush(best, entry)
+                        else:
+                            heappushpop(best, entry)
+
+            if exhausted:
+                break
+            # No unseen document can score more than the threshold, with room for rounding. One scoring the same has
+            # the impacts of this depth in every list, so comes after the documents here, and ranks above all of them.
+            if len(best) == limit:
+                worst_score, worst_negated_rank = best[0]
+                if worst_score > threshold * (1 + 1e-9) or \
+                        (worst_score >= threshold * (1 - 1e-9) and -worst_negated_rank <= deepest_rank):
+                    break
+            depth += 1
+
+        return [-negated_rank for score, negated_rank in sorted(best, reverse=True)]
+
+    def _idf(self, document_frequency: int) -> float:
+        number_of_documents = len(self._lengths)
+        return math.log(1 + (number_of_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _term_score(self, idf: float, frequency: int, rank: int, average_length: float) -> float:
+        norm = self._k1 * (1 - self._b + self._b * self._lengths[rank] / average_length)
+        return idf * frequency * (self._k1 + 1) / (frequency + norm)
+
+    def _score(self, rank: int, postings: dict) -> float:
+        average_length = self._total_length / len(self._lengths)
+        score = 0.0
+        for term_postings in postings.values():
+            frequency = term_postings.get(rank)
+            if frequency is not None:
+                score += self._term_score(self._idf(len(term_postings)), frequency, rank, average_length)
+        return score
+
+    def _impact_list(self, term: str):
+        """ Returns the ranks and scores of the documents containing term, best first, and the factor that scales the
+        scores to upper bounds of the current scores. """
+        term_postings = self._postings[term]
+        idf = self._idf(len(term_postings))
+        average_length = self._total_length / len(self._lengths)
+        impact_list = self._impacts.get(term)
+        if impact_list is None:
+            scored = sorted(
+                ((self._term_score(idf, frequency, rank, average_length), rank)
+                 for rank, frequency in term_postings.items()),
+                key=lambda entry: (-entry[0], entry[1])
+            )
+            impact_list = (array('q', [rank for score, rank in scored]), array('d', [score for score, rank in scored]),
+                           idf, average_length)
+            self._impacts[term] = impact_list
+
+        ranks, impacts, built_idf, built_average_length = impact_list
+        # Documents added or removed since the list was built don't contain term, but change the number of documents
+        # and the average length. A score grows with idf, and by at most the growth of the average length.
+        scale = idf / built_idf * max(1.0, average_length / built_average_length)
+        return ranks, impacts, scale
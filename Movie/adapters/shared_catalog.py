@@ -0,0 +1,253 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from array import array
+from contextlib import contextmanager
+from typing import List
+
+from Movie.adapters.columnar_repository import ColumnarRepository, ENTITY_CLASSES
+from Movie.adapters.columns import FrozenMap, SliceColumn, StringColumn
+from Movie.adapters.repository import RepositoryException
+from Movie.adapters.search_index import SearchIndex
+from Movie.adapters.memory_repository import load_users, load_comments
+from Movie.adapters import columnar_repository
+from Movie.domain.domain_model import Movie, Genre, Director, Actor
+
+try:
+    import fcntl
+except ImportError:  # Windows, where worker processes aren't forked and so don't start together.
+    fcntl = None
+
+# File layout: magic, format version, length of a JSON directory, the directory, then 8-byte aligned sections.
+CATALOG_MAGIC = b'MOVIECAT'
+# Bump the version whenever the layout changes, so older catalog files are rebuilt rather than misread.
+CATALOG_VERSION = 2
+HEADER = struct.Struct(f'>{len(CATALOG_MAGIC)}sHQ')
+
+ENTITY_KINDS = ('genre', 'actor', 'director')
+
+
+class CatalogWriter:
+    """ Collects named arrays and byte buffers and writes them as the sections of a catalog file. """
+
+    def __init__(self):
+        self._sections = list()
+        self._directory = {'sections': dict()}
+
+    def add_array(self, name: str, values: array):
+        self._sections.append((name, values.typecode, values.tobytes()))
+
+    def add_strings(self, name: str, strings):
+        # The same layout as a StringColumn: UTF-8 data end to end, plus offsets.
+        data = bytearray()
+        offsets = array('q', [0])
+        for string in strings:
+            data += string.encode('utf-8')
+            offsets.append(len(data))
+        self._sections.append((f'{name}.data', 'B', bytes(data)))
+        self._sections.append((f'{name}.offsets', 'q', offsets.tobytes()))
+
+    def add_value(self, name: str, value):
+        self._directory[name] = value
+
+    def write(self, catalog_path: str):
+        offset = 0
+        for name, typecode, data in self._sections:
+            self._directory['sections'][name] = [offset, len(data), typecode]
+            offset += len(data) + (-len(data) % 8)
+        directory = json.dumps(self._directory).encode('utf-8')
+        directory += b' ' * (-(HEADER.size + len(directory)) % 8)
+
+        # Write to a temporary file of this writer's own and rename it, so workers never map a half-written catalog.
+        descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(os.path.abspath(catalog_path)))
+        try:
+            with os.fdopen(descriptor, 'wb') as outfile:
+                outfile.write(HEADER.pack(CATALOG_MAGIC, CATALOG_VERSION, len(directory)))
+                outfile.write(directory)
+                for name, typecode, data in self._sections:
+                    outfile.write(data)
+                    outfile.write(b'\0' * (-len(data) % 8))
+            # mkstemp makes the file readable by its owner only, but the catalog is read by every worker.
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, catalog_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+
+def write_catalog(repo: ColumnarRepository, catalog_path: str):
+    """ Writes the movies, postings, year index and search index of a loaded ColumnarRepository to a catalog file. """
+    writer = CatalogWriter()
+    for name in ('_ranks', '_release_years', '_runtimes', '_rank_keys', '_rank_rows', '_order'):
+        writer.add_array(name, getattr(repo, name))
+    writer.add_strings('_titles', repo._titles)
+    writer.add_strings('_descriptions', repo._descriptions)
+    for kind in ENTITY_KINDS:
+        writer.add_strings(f'_names.{kind}', repo._names[kind])
+
+    year_keys = sorted(year for year in repo._years_index if year is not None)
+    year_offsets, year_ranks = flatten(repo._years_index[year] for year in year_keys)
+    writer.add_array('_years.keys', array('i', year_keys))
+    writer.add_array('_years.offsets', year_offsets)
+    writer.add_array('_years.ranks', year_ranks)
+
+    for kind in ENTITY_KINDS:
+        names = sorted(repo._postings[kind])
+        offsets, ranks = flatten(repo._postings[kind][name] for name in names)
+        writer.add_strings(f'_postings.{kind}.names', names)
+        writer.add_array(f'_postings.{kind}.offsets', offsets)
+        writer.add_array(f'_postings.{kind}.ranks', ranks)
+
+    search_arrays = repo._search_index.to_arrays()
+    writer.add_strings('_search.terms', search_arrays.pop('terms'))
+    for name in ('term_offsets', 'ranks', 'frequencies', 'length_ranks', 'lengths'):
+        writer.add_array(f'_search.{name}', search_arrays.pop(name))
+    writer.add_value('search', search_arrays)
+
+    writer.write(catalog_path)
+
+
+def flatten(sequences):
+    offsets = array('q', [0])
+    values = array('i')
+    for sequence in sequences:
+        values.extend(sequence)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def build_catalog(data_path: str, catalog_path: str):
+    repo = ColumnarRepository()
+    columnar_repository.load_movies_and_genres_and_actors_and_directors(data_path, repo)
+    write_catalog(repo, catalog_path)
+
+
+def catalog_is_stale(catalog_path: str, data_path: str) -> bool:
+    if not os.path.exists(catalog_path):
+        return True
+    return os.path.getmtime(os.path.join(data_path, 'news_articles.csv')) > os.path.getmtime(catalog_path)
+
+
+@contextmanager
+def catalog_lock(catalog_path: str):
+    """ Holds an exclusive lock on the catalog file's lock file, so one process at a time checks and builds it. """
+    with open(catalog_path + '.lock', 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # Closing the file releases the lock.
+        yield
+
+
+def ensure_catalog(data_path: str, catalog_path: str):
+    """ Builds the catalog if it is missing or older than the movie data.
+
+    Worker processes started together wait for the first to build it, then find it up to date.
+    """
+    with catalog_lock(catalog_path):
+        if catalog_is_stale(catalog_path, data_path):
+            build_catalog(data_path, catalog_path)
+
+
+class SharedCatalogRepository(ColumnarRepository):
+    """ ColumnarRepository whose movie catalog is a read-only, memory-mapped catalog file.
+
+    Every process that opens the same file shares its pages through the OS page cache, so adding worker processes
+    doesn't add copies of the catalog. Users and reviews are mutable and kept per process, as in ColumnarRepository.
+    Movies, genres, actors and directors can't be added.
+    """
+
+    def __init__(self, catalog_path: str, case_insensitive_usernames: bool = False):
+        super().__init__(case_insensitive_usernames)
+        with open(catalog_path, 'rb') as infile:
+            self._mmap = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, directory_length = HEADER.unpack_from(self._mmap)
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            raise RepositoryException(f'{catalog_path} is not a version {CATALOG_VERSION} catalog')
+        directory = json.loads(bytes(self._mmap[HEADER.size:HEADER.size + directory_length]))
+        self._base = HEADER.size + directory_length
+        self._sections = directory['sections']
+
+        self._ranks = self._section('_ranks')
+        self._release_years = self._section('_release_years')
+        self._runtimes = self._section('_runtimes')
+        self._rank_keys = self._section('_rank_keys')
+        self._rank_rows = self._section('_rank_rows')
+        self._order = self._section('_order')
+        self._titles = self._strings('_titles')
+        self._descriptions = self._strings('_descriptions')
+        self._names = {kind: self._strings(f'_names.{kind}') for kind in ENTITY_KINDS}
+
+        self._years_index = FrozenMap(self._section('_years.keys'),
+                                      SliceColumn(self._section('_years.ranks'), self._section('_years.offsets')))
+        self._years = list(self._section('_years.keys'))
+        self._postings = {
+            kind: FrozenMap(self._strings(f'_postings.{kind}.names'),
+                            SliceColumn(self._section(f'_postings.{kind}.ranks'),
+                                        self._section(f'_postings.{kind}.offsets')))
+            for kind in ENTITY_KINDS
+        }
+        self._search_index = SearchIndex.from_arrays(
+            self._strings('_search.terms'), self._section('_search.term_offsets'), self._section('_search.ranks'),
+            self._section('_search.frequencies'), self._section('_search.length_ranks'),
+            self._section('_search.lengths'), **directory['search'])
+        self._catalog_changed()
+
+    def add_movie(self, article: Movie, rank: int, description: str):
+        raise RepositoryException('The shared catalog is read-only')
+
+    def add_movies(self, articles: List[Movie]):
+        raise RepositoryException('The shared catalog is read-only')
+
+    def add_movie_rows(self, rows):
+        raise RepositoryException('The shared catalog is read-only')
+
+    def add_genre(self, tag: Genre):
+        raise RepositoryException('The shared catalog is read-only')
+
+    def add_director(self, director: Director):
+        raise RepositoryException('The shared catalog is read-only')
+
+    def add_actor(self, actor: Actor):
+        raise RepositoryException('The shared catalog is read-only')
+
+    def get_genres(self) -> List[Genre]:
+        return self._all_entities('genre')
+
+    def get_directors(self) -> List[Director]:
+        return self._all_entities('director')
+
+    def get_actors(self) -> List[Actor]:
+        return self._all_entities('actor')
+
+    # Entities are built the first time they are needed, and only in the processes that need them.
+    def _entity(self, kind: str, name: str):
+        entity = self._entities[kind].get(name)
+        if entity is None and name in self._postings[kind]:
+            entity = self._entities[kind][name] = ENTITY_CLASSES[kind](name)
+            self._attach_view(kind, entity)
+        elif entity is None:
+            entity = ENTITY_CLASSES[kind](name)
+        return entity
+
+    def _all_entities(self, kind: str):
+        if len(self._entity_lists[kind]) < len(self._postings[kind]):
+            self._entity_lists[kind] = [self._entity(kind, name) for name in self._postings[kind]]
+        return self._entity_lists[kind]
+
+    # Helper methods to map the catalog sections.
+    def _section(self, name: str) -> memoryview:
+        offset, length, typecode = self._sections[name]
+        return memoryview(self._mmap)[self._base + offset:self._base + offset + length].cast(typecode)
+
+    def _strings(self, name: str) -> StringColumn:
+        return StringColumn(self._section(f'{name}.data'), self._section(f'{name}.offsets'))
+
+
+def populate(data_path: str, repo: SharedCatalogRepository):
+    # The catalog itself is already in the file; load the users and comments of this process.
+    users = load_users(data_path, repo)
+    load_comments(data_path, repo, users)
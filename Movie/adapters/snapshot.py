@@ -0,0 +1,86 @@
+import hashlib
+import os
+import pickle
+import struct
+
+from Movie.adapters import memory_repository
+from Movie.adapters.ingestion import paused_gc
+from Movie.adapters.memory_repository import MemoryRepository
+
+# File layout: magic, format version, SHA-256 of the payload, then the pickled payload.
+SNAPSHOT_MAGIC = b'MOVIESNAP'
+# Bump the version whenever the payload layout changes, so older snapshots are ignored rather than misread.
+SNAPSHOT_VERSION = 2
+HEADER = struct.Struct(f'>{len(SNAPSHOT_MAGIC)}sH32s')
+
+# The CSV files a snapshot is built from; a snapshot older than any of them is stale.
+SOURCE_FILES = ('news_articles.csv', 'users.csv', 'comments.csv')
+
+
+class SnapshotException(Exception):
+    pass
+
+
+def write_snapshot(repo: MemoryRepository, snapshot_path: str):
+    payload = pickle.dumps(repo.snapshot_state(), protocol=pickle.HIGHEST_PROTOCOL)
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, hashlib.sha256(payload).digest())
+
+    # Write to a temporary file and rename, so a running app never reads a half-written snapshot.
+    temporary_path = snapshot_path + '.tmp'
+    with open(temporary_path, 'wb') as outfile:
+        outfile.write(header)
+        outfile.write(payload)
+    os.replace(temporary_path, snapshot_path)
+
+
+def is_stale(snapshot_path: str, data_path: str) -> bool:
+    snapshot_mtime = os.path.getmtime(snapshot_path)
+    for filename in SOURCE_FILES:
+        source_path = os.path.join(data_path, filename)
+        if os.path.exists(source_path) and os.path.getmtime(source_path) > snapshot_mtime:
+            return True
+    return False
+
+
+def read_snapshot(snapshot_path: str, repo: MemoryRepository):
+    """ Fills an empty MemoryRepository from a snapshot file.
+
+    Raises SnapshotException, without touching the repository, if the file isn't a snapshot of the current version or
+    its checksum doesn't match.
+    """
+    with open(snapshot_path, 'rb') as infile:
+        header = infile.read(HEADER.size)
+        payload = infile.read()
+
+    if len(header) < HEADER.size:
+        raise SnapshotException('Snapshot is truncated')
+    magic, version, checksum = HEADER.unpack(header)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotException('Not a snapshot file')
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotException(f'Snapshot version {version} is not supported')
+    if hashlib.sha256(payload).digest() != checksum:
+        raise SnapshotException('Snapshot checksum does not match')
+
+    with paused_gc():
+        try:
+            state = pickle.loads(payload)
+        except Exception as error:
+            raise SnapshotException(f'Snapshot cannot be read: {error}')
+        repo.restore_state(state)
+
+
+def populate(snapshot_path: str, data_path: str, repo: MemoryRepository) -> bool:
+    """ Fills an empty MemoryRepository from the snapshot if it is usable and up to date, otherwise from the CSV files.
+
+    Returns True if the snapshot was used.
+    """
+    if snapshot_path is not None and os.path.exists(snapshot_path) and not is_stale(snapshot_path, data_path):
+        try:
+            read_snapshot(snapshot_path, repo)
+            return True
+        except SnapshotException:
+            pass  # Ignore the snapshot and load the CSV files instead.
+
+    memory_repository.populate(data_path, repo)
+    return False
@@ -0,0 +1,124 @@
+import json
+
+from flask import Blueprint, current_app, request, stream_with_context
+
+import Movie.adapters.repository as repo
+import Movie.news.services as services
+from Movie.api import export
+
+# Most movies fetched by one call, and listed on one page.
+MAX_RANKS = 100
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = 20
+
+# Fields returned when a call doesn't select any.
+DEFAULT_FIELDS = ('id', 'title', 'release_year', 'description', 'tags', 'comment_count')
+
+# Entity kinds in URLs, and in the repository.
+KINDS = {'genres': 'genre', 'actors': 'actor', 'directors': 'director'}
+
+
+# Configure Blueprint.
+api_blueprint = Blueprint(
+    'api_bp', __name__, url_prefix='/api/v1')
+
+
+class ApiException(Exception):
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@api_blueprint.errorhandler(ApiException)
+def api_error(exception: ApiException):
+    return json_response({'error': exception.message}, exception.status)
+
+
+@api_blueprint.route('/movies', methods=['GET'])
+def movies():
+    # Read query parameters: ranks is a comma-separated list of movie ranks.
+    ranks = read_int_list('ranks')
+    if len(ranks) > MAX_RANKS:
+        raise ApiException(f'At most {MAX_RANKS} ranks can be fetched at once')
+
+    articles = services.get_selected_fields_by_rank(ranks, read_fields(), repo.repo_instance)
+    return json_response({'movies': articles})
+
+
+@api_blueprint.route('/<any(genres, actors, directors):kind>/<path:name>/ranks', methods=['GET'])
+def movie_ranks(kind: str, name: str):
+    if KINDS[kind] == 'genre':
+        ranks = services.get_movie_ranks_for_genre(name, repo.repo_instance)
+    elif KINDS[kind] == 'actor':
+        ranks = services.get_movie_ranks_for_actor(name, repo.repo_instance)
+    else:
+        ranks = services.get_movie_ranks_for_director(name, repo.repo_instance)
+    return json_response({'name': name, 'ranks': ranks})
+
+
+@api_blueprint.route('/<any(genres, actors, directors):kind>/<path:name>/movies', methods=['GET'])
+def movie_page(kind: str, name: str):
+    # Read query parameters: the page after the 'after' rank, or before the 'before' rank or the end.
+    limit = read_int('limit', DEFAULT_PAGE_SIZE)
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise ApiException(f'limit must be from 1 to {MAX_PAGE_SIZE}')
+    fields = read_fields()
+
+    before = request.args.get('before')
+    if before != services.LAST_PAGE:
+        before = read_int('before')
+
+    page = services.get_movie_ranks_page(KINDS[kind], name, limit, read_int('after'), before, repo.repo_instance,
+                                         count_total=request.args.get('total') == 'true')
+    return json_response({
+        'movies': services.get_selected_fields_by_rank(page.ranks, fields, repo.repo_instance),
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+        'total': page.total
+    })
+
+
+@api_blueprint.route('/export/<any(movies, reviews):dataset>.<any(ndjson, csv):format>', methods=['GET'])
+def export_dataset(dataset: str, format: str):
+    # Stream the whole catalog or all reviews in chunks, written as they are read from the repository.
+    chunks = export.export_chunks(repo.repo_instance, dataset, format)
+    _, mimetype = export.FORMATS[format]
+    return current_app.response_class(stream_with_context(chunks), mimetype=mimetype,
+                                      headers={'Content-Disposition': f'attachment; filename={dataset}.{format}'})
+
+
+def json_response(body: dict, status: int = 200):
+    # Encode compactly with the json module's C encoder, without the key sorting and debug pretty-printing of jsonify.
+    return current_app.response_class(json.dumps(body, separators=(',', ':'), ensure_ascii=False), status,
+                                      mimetype='application/json')
+
+
+def read_fields() -> list:
+    fields = request.args.get('fields')
+    if fields is None:
+        return list(DEFAULT_FIELDS)
+    fields = [field for field in fields.split(',') if field]
+    unknown = [field for field in fields if field not in services.SELECTABLE_FIELDS]
+    if unknown:
+        raise ApiException(f'Unknown fields: {", ".join(unknown)}')
+    return fields
+
+
+def read_int(name: str, default: int = None) -> int:
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiException(f'{name} must be an integer')
+
+
+def read_int_list(name: str) -> list:
+    values = request.args.get(name, '')
+    try:
+        return [int(value) for value in values.split(',') if value]
+    except ValueError:
+        raise ApiException(f'{name} must be a comma-separated list of integers')
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+
+from Movie.adapters.repository import AbstractRepository
+from Movie.news.services import directors_of
+
+# Records written per chunk of output, and fetched from the repository at a time.
+DEFAULT_BATCH_SIZE = 1000
+
+MOVIE_COLUMNS = ('rank', 'title', 'release_year', 'description', 'genres', 'directors', 'actors')
+REVIEW_COLUMNS = ('movie_rank', 'username', 'review', 'rating', 'timestamp')
+
+
+def movie_records(repo: AbstractRepository, batch_size: int = DEFAULT_BATCH_SIZE):
+    for movie in repo.iter_movies(batch_size):
+        yield {
+            'rank': movie.id,
+            'title': movie.title,
+            'release_year': movie.release_year,
+            'description': movie.description,
+            'genres': [genre.genre_name for genre in movie.genres],
+            'directors': [director.director_full_name for director in directors_of(movie)],
+            'actors': [actor.actor_full_name for actor in movie.actors]
+        }
+
+
+def review_records(repo: AbstractRepository, batch_size: int = DEFAULT_BATCH_SIZE):
+    for review in repo.iter_reviews(batch_size):
+        yield {
+            'movie_rank': review.movie.id,
+            'username': review.user.user_name,
+            'review': review.review_text,
+            'rating': review.rating,
+            'timestamp': review.timestamp.isoformat() if review.timestamp is not None else None
+        }
+
+
+def ndjson_chunks(records, columns: tuple, batch_size: int = DEFAULT_BATCH_SIZE):
+    """ Yields records as JSON lines, batch_size lines per chunk. """
+    lines = list()
+    for record in records:
+        lines.append(json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+        if len(lines) == batch_size:
+            yield '\n'.join(lines) + '\n'
+            lines.clear()
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def csv_chunks(records, columns: tuple, batch_size: int = DEFAULT_BATCH_SIZE):
+    """ Yields a header row of columns, then records as CSV rows, batch_size rows per chunk. Lists are written as
+    comma separated names, as in the movie data file. """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    for record in records:
+        writer.writerow([','.join(value) if isinstance(value, list) else value for value in record.values()])
+        rows += 1
+        if rows == batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell() > 0:
+        yield buffer.getvalue()
+
+
+DATASETS = {'movies': (movie_records, MOVIE_COLUMNS), 'reviews': (review_records, REVIEW_COLUMNS)}
+FORMATS = {'ndjson': (ndjson_chunks, 'application/x-ndjson'), 'csv': (csv_chunks, 'text/csv')}
+
+
+def export_chunks(repo: AbstractRepository, dataset: str, format: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    """ Yields the movies or reviews of repo, in ndjson or csv format, a chunk at a time.
+
+    Records are read from the repository in batches and written out as they are read, so the memory used doesn't
+    grow with the size of the catalog.
+    """
+    records, columns = DATASETS[dataset]
+    chunks, _ = FORMATS[format]
+    return chunks(records(repo, batch_size), columns, batch_size)
@@ -1,11 +1,57 @@
 from datetime import datetime
-from typing import List, Iterable
+from typing import Iterable, List
 
 import csv
+import sys
 
 
 
+class Association:
+    """ Movies linked to a genre, actor or director, in the order they were added, with constant-time membership.
+
+    Indexing reads a list of the Movies, made by the first index after a change, so index loops take linear time.
+    """
+    __slots__ = ('_movies', '_list')
+
+    def __init__(self, movies: Iterable['Movie'] = ()):
+        self._movies = dict.fromkeys(movies)
+        self._list = None
+
+    def append(self, movie: 'Movie'):
+        self._movies[movie] = None
+        self._list = None
+
+    def extend(self, movies: Iterable['Movie']):
+        if len(self._movies) == 0:
+            self._movies = dict.fromkeys(movies)
+        else:
+            self._movies.update(dict.fromkeys(movies))
+        self._list = None
+
+    def remove(self, movie: 'Movie'):
+        try:
+            del self._movies[movie]
+        except KeyError:
+            raise ValueError(f'{movie} is not in the association')
+        self._list = None
+
+    def __contains__(self, movie):
+        return movie in self._movies
+
+    def __iter__(self):
+        return iter(self._movies)
+
+    def __len__(self):
+        return len(self._movies)
+
+    def __getitem__(self, index):
+        if self._list is None:
+            self._list = list(self._movies)
+        return self._list[index]
+
+
 class Director:
+    __slots__ = ('__director_full_name', '__director_movie', '__weakref__')
 
     def __init__(self, director_full_name: str):
         if director_full_name == "" or type(director_full_name) is not str:
@@ -13,7 +59,7 @@ class Director:
         else:
             self.__director_full_name = director_full_name.strip()
 
-        self.__director_movie: List[Movie] = list()
+        self.__director_movie: Association = Association()
 
     @property
     def director_full_name(self) -> str:
@@ -29,6 +75,9 @@ class Director:
     def add_movie(self, movie: 'Movie'):
         self.__director_movie.append(movie)
 
+    def add_movies(self, movies: Iterable['Movie']):
+        self.__director_movie.extend(movies)
+
     def __repr__(self):
         return f'<Director {self.__director_full_name}>'
 
@@ -45,13 +94,14 @@ class Director:
 
 
 class Genre:
+    __slots__ = ('__genre_name', '_genre_movie', '__weakref__')
 
     def __init__(self, genre_name: str):
         if genre_name == "" or type(genre_name) is not str:
             self.__genre_name = None
         else:
             self.__genre_name = genre_name.strip()
-        self._genre_movie: List[Movie] = list()
+        self._genre_movie: Association = Association()
 
     @property
     def genre_name(self) -> str:
@@ -71,6 +121,9 @@ class Genre:
     def add_movie(self, movie: 'Movie'):
         self._genre_movie.append(movie)
 
+    def add_movies(self, movies: Iterable['Movie']):
+        self._genre_movie.extend(movies)
+
     def __repr__(self):
         return f'<Genre {self.__genre_name}>'
 
@@ -87,6 +140,7 @@ class Genre:
 
 
 class Actor:
+    __slots__ = ('__actor_full_name', '__actors_this_one_has_worked_with', '_actor_movie', '__weakref__')
 
     def __init__(self, actor_full_name: str):
         if actor_full_name == "" or type(actor_full_name) is not str:
@@ -95,7 +149,7 @@ class Actor:
             self.__actor_full_name = actor_full_name.strip()
 
         self.__actors_this_one_has_worked_with = set()
-        self._actor_movie: List[Movie] = list()
+        self._actor_movie: Association = Association()
 
     @property
     def actor_full_name(self) -> str:
@@ -115,6 +169,9 @@ class Actor:
     def add_movie(self, movie: 'Movie'):
         self._actor_movie.append(movie)
 
+    def add_movies(self, movies: Iterable['Movie']):
+        self._actor_movie.extend(movies)
+
     def is_applied_to(self, movie: 'Movie'):
         return movie in self._actor_movie
 
@@ -134,6 +191,8 @@ class Actor:
 
 
 class User:
+    __slots__ = ('__user_name', '__password', '__watched_movies', '__reviews', '__time_spent_watching_movies_minutes',
+                 '__weakref__')
 
     def __init__(self, user_name: str, password: str):
         if user_name == "" or type(user_name) is not str:
@@ -193,8 +252,9 @@ class User:
 
 
 class Review:
+    __slots__ = ('__movie', '__review_text', '__rating', '__user', '__timestamp', '__weakref__')
 
-    def __init__(self, user: User, movie: 'Movie', review_text: str, rating: float, ):
+    def __init__(self, user: User, movie: 'Movie', review_text: str, rating: float, timestamp: datetime = None):
         if isinstance(movie, Movie):
             self.__movie = movie
         else:
@@ -212,7 +272,7 @@ class Review:
         else:
             self.__user = None
 
-        self.__timestamp = datetime.now()
+        self.__timestamp = timestamp if isinstance(timestamp, datetime) else datetime.now()
 
     @property
     def movie(self) -> 'Movie':
@@ -244,6 +304,8 @@ class Review:
 
 
 class Movie:
+    __slots__ = ('__title', '__release_year', '__description', '__director', '__actors', '__genres', '__runtime_minutes',
+                 '__review', '__id', '__weakref__')
 
     def __set_title_internal(self, title: str):
         if title.strip() == "" or type(title) is not str:
@@ -427,7 +489,7 @@ class Movie:
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
-        return self.__get_unique_string_rep() == other.__get_unique_string_rep()
+        return self.__title == other.__title and self.__release_year == other.__release_year
 
     def __lt__(self, other):
         if self.title == other.title:
@@ -435,13 +497,61 @@ class Movie:
         return self.title < other.title
 
     def __hash__(self):
-        return hash(self.__get_unique_string_rep())
+        return hash((self.__title, self.__release_year))
+
+
+def normalize_name(name: str) -> str:
+    # Strips the name and collapses runs of white space inside it to single spaces.
+    return ' '.join(name.split())
+
+
+class EntityRegistry:
+    """ Hands out one shared Genre, Actor or Director per name, so every movie links to the same instance.
+
+    Names are normalized before lookup, so ' Vin  Diesel' and 'Vin Diesel' are the same actor, and each entity's name
+    is an interned string.
+    """
+
+    def __init__(self):
+        self.__genres = dict()
+        self.__actors = dict()
+        self.__directors = dict()
+
+    def genre(self, genre_name: str) -> Genre:
+        return self.__entity(self.__genres, Genre, genre_name)
+
+    def actor(self, actor_full_name: str) -> Actor:
+        return self.__entity(self.__actors, Actor, actor_full_name)
+
+    def director(self, director_full_name: str) -> Director:
+        return self.__entity(self.__directors, Director, director_full_name)
+
+    @property
+    def genres(self) -> List[Genre]:
+        return list(self.__genres.values())
+
+    @property
+    def actors(self) -> List[Actor]:
+        return list(self.__actors.values())
+
+    @property
+    def directors(self) -> List[Director]:
+        return list(self.__directors.values())
+
+    @staticmethod
+    def __entity(entities: dict, entity_class, name: str):
+        name = normalize_name(name)
+        entity = entities.get(name)
+        if entity is None:
+            entity = entities[name] = entity_class(sys.intern(name))
+        return entity
 
 
 class MovieFileCSVReader:
 
     def __init__(self, file_name: str):
         self.__file_name = file_name
+        self.__registry = EntityRegistry()
         self.__dataset_of_movies = []
         self.__dataset_of_actors = set()
         self.__dataset_of_directors = set()
@@ -456,19 +566,19 @@ class MovieFileCSVReader:
                 movie.description = row['Description']
                 movie.runtime_minutes = int(row['Runtime (Minutes)'])
 
-                director = Director(row['Director'])
+                director = self.__registry.director(row['Director'])
                 self.__dataset_of_directors.add(director)
                 movie.director = director
 
                 parsed_genres = row['Genre'].split(',')
                 for genre_string in parsed_genres:
-                    genre = Genre(genre_string)
+                    genre = self.__registry.genre(genre_string)
                     self.__dataset_of_genres.add(genre)
                     movie.add_genre(genre)
 
                 parsed_actors = row['Actors'].split(',')
                 for actor_string in parsed_actors:
-                    actor = Actor(actor_string)
+                    actor = self.__registry.actor(actor_string)
                     self.__dataset_of_actors.add(actor)
                     movie.add_actor(actor)
 
@@ -0,0 +1,95 @@
+"""Caching of rendered template fragments across requests."""
+
+import threading
+import time
+
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from jinja2.runtime import Undefined
+
+# Most fragments kept.
+DEFAULT_MAXSIZE = 256
+
+
+class FragmentCache:
+    """ A bounded cache of rendered fragments, least recently used first out, that counts its hits and render time.
+
+    A fragment is keyed by its name and versions of everything it is rendered from, so a new version renders and
+    caches it afresh while the old entry ages out. A fragment with an undefined version is never cached.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict()
+        self.evictions = 0
+
+    def render(self, key: tuple, render) -> str:
+        if any(isinstance(part, Undefined) for part in key):
+            return render()
+
+        stats = self._stats_of(key[0])
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                stats['hits'] += 1
+                return html
+
+        start = time.perf_counter()
+        html = render()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats['misses'] += 1
+            stats['render_seconds'] += elapsed
+            self._entries[key] = html
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return html
+
+    def stats(self) -> dict:
+        """ Returns the hits, misses and seconds spent rendering misses of each fragment name. """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _stats_of(self, name: str) -> dict:
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, {'hits': 0, 'misses': 0, 'render_seconds': 0.0})
+        return stats
+
+
+class FragmentCacheExtension(Extension):
+    """ Adds a cache tag to templates:
+
+        {% cache 'genre-navigation', catalog_version %} ... {% endcache %}
+
+    The first argument names the fragment, and the rest are its versions. The environment's fragment_cache attribute
+    is the FragmentCache.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache())
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(key)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, key: list, caller):
+        return self.environment.fragment_cache.render(tuple(key), caller)
@@ -12,6 +12,5 @@ def home():
     return render_template(
         'home/home.html',
         selected_articles=utilities.get_selected_articles(),
-        tag_urls=utilities.get_tags_and_urls(),
-        actor_urls=utilities.get_actors_and_urls()
+        tag_urls=utilities.get_tags_and_urls()
     )
@@ -0,0 +1,74 @@
+import threading
+import weakref
+
+from collections import OrderedDict
+
+from Movie.adapters.repository import AbstractRepository
+
+# Most DTOs kept per repository.
+DEFAULT_MAXSIZE = 1024
+
+
+class DtoCache:
+    """ A bounded cache of the dicts built from Movies, least recently used first out.
+
+    Entries are keyed by the kind of dict, the Movie's rank and the Movie's version in the repository. A change to the
+    Movie gives it a new version, so an entry built before the change is never found again and ages out. A cache of
+    maxsize 0 keeps nothing.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, kind: str, rank: int, version):
+        with self._lock:
+            dto = self._entries.get((kind, rank, version))
+            if dto is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end((kind, rank, version))
+            return dto
+
+    def put(self, kind: str, rank: int, version, dto: dict):
+        if self._maxsize == 0:
+            return
+        with self._lock:
+            self._entries[(kind, rank, version)] = dto
+            self._entries.move_to_end((kind, rank, version))
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._entries),
+                'maxsize': self._maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def cache_for(repo: AbstractRepository) -> DtoCache:
+    """ Returns the DtoCache of repo, which lives as long as repo does.
+
+    The cache of a repository whose versions don't see every change, such as SqlAlchemyRepository, keeps nothing:
+    an entry could outlive a change made by another process.
+    """
+    with _caches_lock:
+        cache = _caches.get(repo)
+        if cache is None:
+            cache = _caches[repo] = DtoCache(DEFAULT_MAXSIZE if repo.versions_see_all_changes else 0)
+        return cache
@@ -13,6 +13,9 @@ import Movie.utilities.utilities as utilities
 import Movie.news.services as services
 
 from Movie.authentication.authentication import login_required
+from Movie.news.page_cache import cached_page, shows
+from Movie.news.services import LAST_PAGE
+from Movie.utilities.conditional import conditional_get
 
 
 # Configure Blueprint.
@@ -21,21 +24,19 @@ news_blueprint = Blueprint(
 
 
 @news_blueprint.route('/articles_by_date', methods=['GET'])
+@conditional_get('year', 'date', int)
+@cached_page
 def articles_by_date():
     # Read query parameters.
-    target_date = request.args.get('date')
+    target_date = request.args.get('date', type=int)
     article_to_show_comments = request.args.get('view_comments_for')
 
-    # Fetch the first and last articles in the series.
-    first_article = services.get_first_movie(repo.repo_instance)
-    last_article = services.get_last_movie(repo.repo_instance)
+    # Fetch the first and last release years in the series.
+    first_year, last_year = services.get_first_and_last_year(repo.repo_instance)
 
     if target_date is None:
-        # No date query parameter, so return articles from day 1 of the series.
-        target_date = first_article['release_year']
-    else:
-        # Convert target_date from string to date.
-        target_date = target_date
+        # No date query parameter, or one that isn't a year, so return movies from the first year of the series.
+        target_date = first_year
 
     if article_to_show_comments is None:
         # No view-comments query parameter, so set to a non-existent article id.
@@ -44,8 +45,8 @@ def articles_by_date():
         # Convert article_to_show_comments from string to int.
         article_to_show_comments = int(article_to_show_comments)
 
-    # Fetch article(s) for the target date. This call also returns the previous and next dates for articles immediately
-    # before and after the target date.
+    # Fetch movie(s) for the target year. This call also returns the previous and next years with movies immediately
+    # before and after the target year.
     articles, previous_date, next_date = services.get_movies_by_year(target_date, repo.repo_instance)
 
     first_article_url = None
@@ -54,32 +55,36 @@ def articles_by_date():
     prev_article_url = None
 
     if len(articles) > 0:
-        # There's at least one article for the target date.
+        # There's at least one movie for the target year.
         if previous_date is not None:
-            # There are articles on a previous date, so generate URLs for the 'previous' and 'first' navigation buttons.
-            prev_article_url = url_for('news_bp.articles_by_date', date=previous_date.isoformat())
-            first_article_url = url_for('news_bp.articles_by_date', date=first_article['release_year'].isoformat())
+            # There are movies in a previous year, so generate URLs for the 'previous' and 'first' navigation buttons.
+            prev_article_url = url_for('news_bp.articles_by_date', date=previous_date)
+            first_article_url = url_for('news_bp.articles_by_date', date=first_year)
 
-        # There are articles on a subsequent date, so generate URLs for the 'next' and 'last' navigation buttons.
+        # There are movies in a subsequent year, so generate URLs for the 'next' and 'last' navigation buttons.
         if next_date is not None:
-            next_article_url = url_for('news_bp.articles_by_date', date=next_date.isoformat())
-            last_article_url = url_for('news_bp.articles_by_date', date=last_article['release_year'].isoformat())
+            next_article_url = url_for('news_bp.articles_by_date', date=next_date)
+            last_article_url = url_for('news_bp.articles_by_date', date=last_year)
 
         # Construct urls for viewing article comments and adding comments.
         for article in articles:
             article['view_comment_url'] = url_for('news_bp.articles_by_date', date=target_date, view_comments_for=article['id'])
             article['add_comment_url'] = url_for('news_bp.comment_on_article', article=article['id'])
 
+        shows(articles)
+
         # Generate the webpage to display the articles.
         return render_template(
             'news/articles.html',
             title='Articles',
-            articles_title=target_date.strftime('%A %B %e %Y'),
+            articles_title='Movies released in ' + str(target_date),
             articles=articles,
             selected_articles=utilities.get_selected_articles(len(articles) * 2),
             tag_urls=utilities.get_tags_and_urls(),
             first_article_url=first_article_url,
             last_article_url=last_article_url,
+            prev_article_url=prev_article_url,
+            next_article_url=next_article_url,
             show_comments_for_article=article_to_show_comments
         )
 
@@ -88,12 +93,14 @@ def articles_by_date():
 
 
 @news_blueprint.route('/articles_by_genre', methods=['GET'])
+@conditional_get('genre', 'tag')
+@cached_page
 def articles_by_genre():
     articles_per_page = 2
 
     # Read query parameters.
     tag_name = request.args.get('tag')
-    cursor = request.args.get('cursor')
+    after_rank, before_rank = read_page_cursors()
     article_to_show_comments = request.args.get('view_comments_for')
 
     if article_to_show_comments is None:
@@ -103,43 +110,37 @@ def articles_by_genre():
         # Convert article_to_show_comments from string to int.
         article_to_show_comments = int(article_to_show_comments)
 
-    if cursor is None:
-        # No cursor query parameter, so initialise cursor to start at the beginning.
-        cursor = 0
-    else:
-        # Convert cursor from string to int.
-        cursor = int(cursor)
-
-    # Retrieve article ids for articles that are tagged with tag_name.
-    article_ids = services.get_movie_ranks_for_genre(tag_name, repo.repo_instance)
+    # Retrieve the ranks of the page of movies after (or before) the cursor, without reading the ranks of other pages.
+    page = services.get_movie_ranks_page('genre', tag_name, articles_per_page, after_rank, before_rank,
+                                         repo.repo_instance)
 
     # Retrieve the batch of articles to display on the Web page.
-    articles = services.get_movies_by_rank(article_ids[cursor:cursor + articles_per_page], repo.repo_instance)
+    articles = services.get_movies_by_rank(page.ranks, repo.repo_instance)
 
     first_article_url = None
     last_article_url = None
     next_article_url = None
     prev_article_url = None
 
-    if cursor > 0:
+    if page.previous_cursor is not None:
         # There are preceding articles, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_article_url = url_for('news_bp.articles_by_genre', tag=tag_name, cursor=cursor - articles_per_page)
+        prev_article_url = url_for('news_bp.articles_by_genre', tag=tag_name, before=page.previous_cursor)
         first_article_url = url_for('news_bp.articles_by_genre', tag=tag_name)
 
-    if cursor + articles_per_page < len(article_ids):
+    if page.next_cursor is not None:
         # There are further articles, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_article_url = url_for('news_bp.articles_by_genre', tag=tag_name, cursor=cursor + articles_per_page)
-
-        last_cursor = articles_per_page * int(len(article_ids) / articles_per_page)
-        if len(article_ids) % articles_per_page == 0:
-            last_cursor -= articles_per_page
-        last_article_url = url_for('news_bp.articles_by_genre', tag=tag_name, cursor=last_cursor)
+        next_article_url = url_for('news_bp.articles_by_genre', tag=tag_name, after=page.next_cursor)
+        last_article_url = url_for('news_bp.articles_by_genre', tag=tag_name, before=LAST_PAGE)
 
     # Construct urls for viewing article comments and adding comments.
     for article in articles:
-        article['view_comment_url'] = url_for('news_bp.articles_by_genre', tag=tag_name, cursor=cursor, view_comments_for=article['id'])
+        article['view_comment_url'] = url_for('news_bp.articles_by_genre', tag=tag_name,
+                                              after=request.args.get('after'), before=request.args.get('before'),
+                                              view_comments_for=article['id'])
         article['add_comment_url'] = url_for('news_bp.comment_on_article', article=article['id'])
 
+    shows(articles)
+
     # Generate the webpage to display the articles.
     return render_template(
         'news/articles.html',
@@ -156,13 +157,19 @@ def articles_by_genre():
     )
 
 @news_blueprint.route("/articles_by_actor",methods=["GET"])
+@conditional_get('actor', 'actor')
+@cached_page
 def movie_by_actor():
     movies_per_page = 3
 
     actor_name = request.args.get('actor')
-    cursor = request.args.get('cursor')
+    after_rank, before_rank = read_page_cursors()
     article_to_show_comments = request.args.get('view_comments_for')
 
+    if actor_name is None:
+        # No actor to show, so let the user pick one.
+        return redirect(url_for('news_bp.actor_directory'))
+
     if article_to_show_comments is None:
         # No view-comments query parameter, so set to a non-existent article id.
         article_to_show_comments = -1
@@ -170,44 +177,37 @@ def movie_by_actor():
         # Convert article_to_show_comments from string to int.
         article_to_show_comments = int(article_to_show_comments)
 
-    if cursor is None:
-        # No cursor query parameter, so initialise cursor to start at the beginning.
-        cursor = 0
-    else:
-        # Convert cursor from string to int.
-        cursor = int(cursor)
-
-    # Retrieve article ids for articles that are tagged with tag_name.
-    article_ids = services.get_movie_ranks_for_actor(actor_name, repo.repo_instance)
+    # Retrieve the ranks of the page of movies after (or before) the cursor, without reading the ranks of other pages.
+    page = services.get_movie_ranks_page('actor', actor_name, movies_per_page, after_rank, before_rank,
+                                         repo.repo_instance)
 
     # Retrieve the batch of articles to display on the Web page.
-    articles = services.get_movies_by_rank(article_ids[cursor:cursor + movies_per_page], repo.repo_instance)
+    articles = services.get_movies_by_rank(page.ranks, repo.repo_instance)
 
     first_article_url = None
     last_article_url = None
     next_article_url = None
     prev_article_url = None
 
-    if cursor > 0:
+    if page.previous_cursor is not None:
         # There are preceding articles, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_article_url = url_for('news_bp.articles_by_actor', actor=actor_name, cursor=cursor - movies_per_page)
-        first_article_url = url_for('news_bp.articles_by_actor', actor=actor_name)
+        prev_article_url = url_for('news_bp.movie_by_actor', actor=actor_name, before=page.previous_cursor)
+        first_article_url = url_for('news_bp.movie_by_actor', actor=actor_name)
 
-    if cursor + movies_per_page < len(article_ids):
+    if page.next_cursor is not None:
         # There are further articles, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_article_url = url_for('news_bp.articles_by_actor', actor=actor_name, cursor=cursor + movies_per_page)
-
-        last_cursor = movies_per_page * int(len(article_ids) / movies_per_page)
-        if len(article_ids) % movies_per_page == 0:
-            last_cursor -= movies_per_page
-        last_article_url = url_for('news_bp.articles_by_actor', actor=actor_name, cursor=last_cursor)
+        next_article_url = url_for('news_bp.movie_by_actor', actor=actor_name, after=page.next_cursor)
+        last_article_url = url_for('news_bp.movie_by_actor', actor=actor_name, before=LAST_PAGE)
 
     # Construct urls for viewing article comments and adding comments.
     for article in articles:
-        article['view_comment_url'] = url_for('news_bp.articles_by_tag', actor=actor_name, cursor=cursor,
+        article['view_comment_url'] = url_for('news_bp.movie_by_actor', actor=actor_name,
+                                              after=request.args.get('after'), before=request.args.get('before'),
                                               view_comments_for=article['id'])
         article['add_comment_url'] = url_for('news_bp.comment_on_article', article=article['id'])
 
+    shows(articles)
+
     # Generate the webpage to display the articles.
     return render_template(
         'news/articles.html',
@@ -215,7 +215,7 @@ def movie_by_actor():
         articles_title='Articles acted by ' + actor_name,
         articles=articles,
         selected_articles=utilities.get_selected_articles(len(articles) * 2),
-        tag_urls=utilities.get_actors_and_urls(),
+        tag_urls=utilities.get_tags_and_urls(),
         first_article_url=first_article_url,
         last_article_url=last_article_url,
         prev_article_url=prev_article_url,
@@ -224,6 +224,124 @@ def movie_by_actor():
     )
 
 
+def read_page_cursors() -> tuple:
+    # The page after the 'after' rank, or before the 'before' rank; with neither, the first page. A cursor that isn't
+    # a rank (or LAST_PAGE, for before) is ignored.
+    after_rank = request.args.get('after', type=int)
+    if request.args.get('before') == LAST_PAGE:
+        before_rank = LAST_PAGE
+    else:
+        before_rank = request.args.get('before', type=int)
+    return after_rank, before_rank
+
+
+@news_blueprint.route('/actors', methods=['GET'])
+@cached_page
+def actor_directory():
+    # Read query parameters.
+    directory = utilities.get_actor_directory()
+    bucket = request.args.get('letter')
+    page = request.args.get('page')
+
+    if bucket is None:
+        # No letter query parameter, so start at the first letter with any actors.
+        bucket = directory.buckets[0] if len(directory.buckets) > 0 else None
+
+    if page is None:
+        # No page query parameter, so start at the first page of the letter.
+        page = 0
+    else:
+        # Convert page from string to int.
+        page = int(page)
+
+    actor_names = directory.page(bucket, page) if bucket is not None else []
+    number_of_pages = directory.number_of_pages(bucket) if bucket is not None else 0
+
+    first_page_url = None
+    last_page_url = None
+    next_page_url = None
+    prev_page_url = None
+
+    if page > 0:
+        # There are preceding pages, so generate URLs for the 'previous' and 'first' navigation buttons.
+        prev_page_url = url_for('news_bp.actor_directory', letter=bucket, page=page - 1)
+        first_page_url = url_for('news_bp.actor_directory', letter=bucket)
+
+    if page + 1 < number_of_pages:
+        # There are further pages, so generate URLs for the 'next' and 'last' navigation buttons.
+        next_page_url = url_for('news_bp.actor_directory', letter=bucket, page=page + 1)
+        last_page_url = url_for('news_bp.actor_directory', letter=bucket, page=number_of_pages - 1)
+
+    return render_template(
+        'news/actors.html',
+        title='Actors',
+        letter=bucket,
+        letter_urls={letter: url_for('news_bp.actor_directory', letter=letter) for letter in directory.buckets},
+        actor_urls={name: url_for('news_bp.movie_by_actor', actor=name) for name in actor_names},
+        selected_articles=utilities.get_selected_articles(),
+        tag_urls=utilities.get_tags_and_urls(),
+        first_article_url=first_page_url,
+        last_article_url=last_page_url,
+        prev_article_url=prev_page_url,
+        next_article_url=next_page_url
+    )
+
+
+@news_blueprint.route('/search', methods=['GET'])
+@cached_page
+def search():
+    movies_per_page = 3
+
+    # Read query parameters.
+    query = request.args.get('q', '')
+    cursor = request.args.get('cursor')
+
+    if cursor is None:
+        # No cursor query parameter, so initialise cursor to start at the beginning.
+        cursor = 0
+    else:
+        # Convert cursor from string to int; a negative cursor starts at the beginning.
+        cursor = max(0, int(cursor))
+
+    # Retrieve the batch of best matching movies to display on the Web page.
+    articles, next_cursor = services.search_movies(query, cursor, movies_per_page, repo.repo_instance)
+
+    first_article_url = None
+    next_article_url = None
+    prev_article_url = None
+
+    if cursor > 0:
+        # There are preceding results, so generate URLs for the 'previous' and 'first' navigation buttons.
+        prev_article_url = url_for('news_bp.search', q=query, cursor=max(cursor - movies_per_page, 0))
+        first_article_url = url_for('news_bp.search', q=query)
+
+    if next_cursor is not None:
+        # There are further results, so generate a URL for the 'next' navigation button.
+        next_article_url = url_for('news_bp.search', q=query, cursor=next_cursor)
+
+    # Construct urls for viewing article comments and adding comments.
+    for article in articles:
+        article['view_comment_url'] = url_for('news_bp.articles_by_date', date=article['release_year'], view_comments_for=article['id'])
+        article['add_comment_url'] = url_for('news_bp.comment_on_article', article=article['id'])
+
+    shows(articles)
+
+    # Generate the webpage to display the results.
+    return render_template(
+        'news/articles.html',
+        title='Search',
+        articles_title='Search results for ' + query,
+        articles=articles,
+        selected_articles=utilities.get_selected_articles(),
+        tag_urls=utilities.get_tags_and_urls(),
+        first_article_url=first_article_url,
+        last_article_url=None,
+        prev_article_url=prev_article_url,
+        next_article_url=next_article_url,
+        show_comments_for_article=-1
+    )
+
+
 @news_blueprint.route('/review', methods=['GET', 'POST'])
 @login_required
 def comment_on_article():
@@ -248,7 +366,7 @@ def comment_on_article():
 
         # Cause the web browser to display the page of all articles that have the same date as the commented article,
         # and display all comments, including the new comment.
-        return redirect(url_for('news_bp.articles_by_date', date=article['date'], view_comments_for=article_id))
+        return redirect(url_for('news_bp.articles_by_date', date=article['release_year'], view_comments_for=article_id))
 
     if request.method == 'GET':
         # Request is a HTTP GET to display the form.
@@ -0,0 +1,154 @@
+import functools
+import threading
+import time
+import weakref
+
+from collections import OrderedDict, namedtuple
+
+from flask import current_app, g, make_response, request, session
+
+import Movie.adapters.repository as repo
+from Movie.adapters.repository import AbstractRepository
+
+# Most pages kept per repository.
+DEFAULT_MAXSIZE = 512
+
+CachedPage = namedtuple('CachedPage', ['body', 'content_type', 'ranks', 'render_seconds'])
+
+
+class PageCache:
+    """ A bounded cache of the pages served to anonymous users, least recently used first out.
+
+    Each page remembers the ranks of the Movies it shows, so a Comment added to a Movie drops just the pages showing
+    that Movie. Every hit counts the seconds its page took to make, as time saved.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._keys_by_rank = dict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.size_bytes = 0
+        self.seconds_saved = 0.0
+        # Grows with every invalidation, so a page made while a Comment was added isn't cached.
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: tuple) -> CachedPage:
+        with self._lock:
+            page = self._entries.get(key)
+            if page is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.seconds_saved += page.render_seconds
+                self._entries.move_to_end(key)
+            return page
+
+    def put(self, key: tuple, page: CachedPage, generation: int = None):
+        """ Caches page under key, unless a Movie has been invalidated since generation. """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._remove(key)
+            self._entries[key] = page
+            self.size_bytes += len(page.body)
+            for rank in page.ranks:
+                self._keys_by_rank.setdefault(rank, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_movie(self, rank: int):
+        """ Drops the pages that show the Movie with rank. """
+        with self._lock:
+            self.generation += 1
+            for key in list(self._keys_by_rank.get(rank, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hits / lookups if lookups else 0.0,
+                    'evictions': self.evictions, 'invalidations': self.invalidations, 'size': len(self._entries),
+                    'maxsize': self.maxsize, 'size_bytes': self.size_bytes, 'seconds_saved': self.seconds_saved}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_rank.clear()
+            self.size_bytes = 0
+
+    # Helper method to remove the page under key, if any; called with the lock held.
+    def _remove(self, key: tuple):
+        page = self._entries.pop(key, None)
+        if page is None:
+            return
+        self.size_bytes -= len(page.body)
+        for rank in page.ranks:
+            keys = self._keys_by_rank[rank]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_rank[rank]
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def cache_for(repo: AbstractRepository) -> PageCache:
+    """ Returns the PageCache of repo, which lives as long as repo does. """
+    with _caches_lock:
+        cache = _caches.get(repo)
+        if cache is None:
+            cache = _caches[repo] = PageCache()
+        return cache
+
+
+def cached_page(view):
+    """ Serves the pages of a view to anonymous users from the repository's PageCache.
+
+    A page is keyed by the view's endpoint and sorted query arguments, and by the versions of the navigation and the
+    Editor's picks it also shows. The view names the Movies on its page with shows(). Logged-in users get pages with
+    their name on them, which aren't cached.
+    """
+    @functools.wraps(view)
+    def caching_view(*args, **kwargs):
+        if 'username' in session:
+            return view(*args, **kwargs)
+
+        cache = cache_for(repo.repo_instance)
+        key = page_key()
+        page = cache.get(key)
+        if page is not None:
+            return current_app.response_class(page.body, content_type=page.content_type)
+
+        g.page_ranks = set()
+        generation = cache.generation
+        start = time.perf_counter()
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.direct_passthrough:
+            body = response.get_data()
+            cache.put(key, CachedPage(body, response.content_type, frozenset(g.page_ranks),
+                                      time.perf_counter() - start), generation)
+        return response
+    return caching_view
+
+
+def page_key() -> tuple:
+    args = tuple(sorted(request.args.items(multi=True)))
+    return (request.endpoint, request.script_root, args, repo.repo_instance.get_catalog_version(),
+            current_app.extensions['editors_picks'].key(0)[0])
+
+
+def shows(articles: list):
+    """ Records that the page being made shows the Movies of articles, so a Comment on one of them drops the page. """
+    if 'page_ranks' in g:
+        g.page_ranks.update(article['id'] for article in articles)
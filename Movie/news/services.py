@@ -1,7 +1,14 @@
+import math
+from collections.abc import Sequence
 from typing import List, Iterable
 
 from Movie.adapters.repository import AbstractRepository
-from Movie.domain.domain_model import make_comment, Movie, Review, Genre,Actor,Director
+from Movie.news import dto_cache, page_cache
+from Movie.domain.domain_model import Movie, Review, Genre,Actor,Director
+
+
+# Value of a before cursor that pages to the last movies of a genre, actor or director.
+LAST_PAGE = 'end'
 
 
 class NonExistentArticleException(Exception):
@@ -22,11 +29,9 @@ def add_review(article_id: int, comment_text: str, username: str, repo: Abstract
     if user is None:
         raise UnknownUserException
 
-    # Create comment.
-    comment = make_comment(comment_text, user, article)
-
-    # Update the repository.
-    repo.add_review(comment)
+    # Create the comment and update the repository, as one change.
+    repo.make_review(comment_text, user, article)
+    page_cache.cache_for(repo).invalidate_movie(article_id)
 
 
 def get_movie(article_id: int, repo: AbstractRepository):
@@ -35,20 +40,20 @@ def get_movie(article_id: int, repo: AbstractRepository):
     if article is None:
         raise NonExistentArticleException
 
-    return article_to_dict(article)
+    return cached_article_dict(article, repo)
 
 
 def get_first_movie(repo: AbstractRepository):
 
     article = repo.get_first_movie()
 
-    return article_to_dict(article)
+    return cached_article_dict(article, repo)
 
 
 def get_last_movie(repo: AbstractRepository):
 
     article = repo.get_last_movie()
-    return article_to_dict(article)
+    return cached_article_dict(article, repo)
 
 
 def get_movies_by_year(date, repo: AbstractRepository):
@@ -60,13 +65,43 @@ def get_movies_by_year(date, repo: AbstractRepository):
     prev_date = next_date = None
 
     if len(articles) > 0:
+        prev_date = repo.get_year_of_previous_movie(date)
+        next_date = repo.get_year_of_next_movie(date)
 
-        # Convert Articles to dictionary form.
-        articles_dto = articles_to_dict(articles)
+        # Convert Articles to the dictionary form shown in lists.
+        articles_dto = [cached_summary_dict(article, repo) for article in articles]
 
     return articles_dto,prev_date,next_date
 
 
+def get_movies_by_year_range(start_year, end_year, repo: AbstractRepository):
+    articles = repo.get_movies_by_year_range(start_year, end_year)
+
+    return articles_to_dict(articles)
+
+
+def get_first_and_last_year(repo: AbstractRepository):
+    # Returns the earliest and latest release years in the repository (both None if it's empty).
+    years = repo.get_release_years()
+
+    if len(years) == 0:
+        return None, None
+    return years[0], years[-1]
+
+
+def search_movies(query: str, cursor: int, limit: int, repo: AbstractRepository):
+    # Returns the movies ranked cursor to cursor + limit for query, and the cursor of the next page (None if there
+    # are no further matches).
+    ranks = repo.search_movie_ranks(query, cursor + limit + 1)
+
+    next_cursor = None
+    if len(ranks) > cursor + limit:
+        next_cursor = cursor + limit
+
+    articles = repo.get_movie_by_rank(ranks[cursor:cursor + limit])
+    return [cached_summary_dict(article, repo) for article in articles], next_cursor
+
+
 def get_movie_ranks_for_genre(tag_name, repo: AbstractRepository):
     article_ids = repo.get_movie_ranks_for_genre(tag_name)
 
@@ -79,18 +114,48 @@ def get_movie_ranks_for_actor(actor_name,repo: AbstractRepository):
     return movie_ids
 
 
+def get_movie_ranks_page(kind: str, name: str, limit: int, after_rank, before_rank, repo: AbstractRepository,
+                         count_total: bool = False):
+    # A before_rank of LAST_PAGE gives the last page.
+    if before_rank == LAST_PAGE:
+        before_rank = math.inf
+    return repo.get_movie_ranks_page(kind, name, limit, after_rank, before_rank, count_total)
+
+
 def get_movie_ranks_for_director(director_name, repo:AbstractRepository):
     movie_ids = repo.get_movie_ranks_for_director(director_name)
     return movie_ids
 
 
 def get_movies_by_rank(id_list, repo: AbstractRepository):
-    articles = repo.get_movie_by_rank(id_list)
-
-    # Convert Articles to dictionary form.
-    articles_as_dict = articles_to_dict(articles)
-
-    return articles_as_dict
+    # Only fetch the Articles whose summaries aren't cached. Each id is looked up once, under the version read before
+    # its Article is fetched, as in _cached_dict.
+    cache = dto_cache.cache_for(repo)
+    summaries = dict()
+    versions = dict()
+    for id in id_list:
+        version = repo.get_movie_version(id)
+        summary = cache.get('summary', id, version)
+        if summary is None:
+            versions[id] = version
+        else:
+            summaries[id] = dict(summary)
+    articles = repo.get_movie_by_rank([id for id in id_list if id not in summaries])
+
+    # Convert Articles to the dictionary form shown in lists.
+    for article in articles:
+        summary = article_to_summary_dict(article)
+        cache.put('summary', article.id, versions[article.id], summary)
+        summaries[article.id] = dict(summary)
+
+    return [summaries[id] for id in id_list if id in summaries]
+
+
+def get_selected_fields_by_rank(id_list, fields: Iterable[str], repo: AbstractRepository):
+    # Returns the selected fields of the Articles with ids in id_list, in the order of id_list, skipping ids that
+    # match no Article.
+    articles = {article.id: article for article in repo.get_movie_by_rank(id_list)}
+    return [article_to_selected_dict(articles[id], fields) for id in id_list if id in articles]
 
 
 def get_comments_for_article(article_id, repo: AbstractRepository):
@@ -106,6 +171,26 @@ def get_comments_for_article(article_id, repo: AbstractRepository):
 # Functions to convert model entities to dicts
 # ============================================
 
+def cached_article_dict(article: Movie, repo: AbstractRepository):
+    return _cached_dict('article', article, repo, article_to_dict)
+
+
+def cached_summary_dict(article: Movie, repo: AbstractRepository):
+    return _cached_dict('summary', article, repo, article_to_summary_dict)
+
+
+def _cached_dict(kind: str, article: Movie, repo: AbstractRepository, to_dict):
+    # The version is read before the dict is built, so a change made meanwhile gives a newer version than the
+    # cached dict's. A copy is returned, as callers add their own keys.
+    cache = dto_cache.cache_for(repo)
+    version = repo.get_movie_version(article.id)
+    article_dict = cache.get(kind, article.id, version)
+    if article_dict is None:
+        article_dict = to_dict(article)
+        cache.put(kind, article.id, version, article_dict)
+    return dict(article_dict)
+
+
 def article_to_dict(article: Movie):
     article_dict = {
         'release_year': article.release_year,
@@ -122,6 +207,64 @@ def articles_to_dict(articles: Iterable[Movie]):
     return [article_to_dict(article) for article in articles]
 
 
+class LazyReviewList(Sequence):
+    """ The Comments of an Article in dict form, each converted only when it is read. """
+
+    def __init__(self, comments: Iterable[Review]):
+        self._comments = list(comments)
+
+    def __len__(self):
+        return len(self._comments)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return reviews_to_dict(self._comments[index])
+        return review_to_dict(self._comments[index])
+
+
+# Fields of the summary of an Article shown in lists (news/articles.html). Unlike article_to_dict, a summary names
+# its tags without listing their other articles, and only builds comment dicts if its comments are shown.
+SUMMARY_FIELDS = {
+    'id': lambda article: article.id,
+    'title': lambda article: article.title,
+    'release_year': lambda article: article.release_year,
+    'description': lambda article: article.description,
+    'tags': lambda article: [{'name': tag.genre_name} for tag in article.genres],
+    'comment_count': lambda article: len(article.review),
+    'comments': lambda article: LazyReviewList(article.review),
+}
+
+
+def article_to_summary_dict(article: Movie, fields: Iterable[str] = None):
+    if fields is None:
+        fields = SUMMARY_FIELDS
+    return {field: SUMMARY_FIELDS[field](article) for field in fields}
+
+
+def articles_to_summary_dict(articles: Iterable[Movie], fields: Iterable[str] = None):
+    return [article_to_summary_dict(article, fields) for article in articles]
+
+
+# Fields of an Article that can be selected one by one, and how each is read from the Article.
+SELECTABLE_FIELDS = dict(
+    SUMMARY_FIELDS,
+    comments=lambda article: reviews_to_dict(article.review),
+    actors=lambda article: [actor.actor_full_name for actor in article.actors],
+    directors=lambda article: [director.director_full_name for director in directors_of(article)]
+)
+
+
+def article_to_selected_dict(article: Movie, fields: Iterable[str]):
+    # Builds only the selected fields, so unselected comments, tags or actors are never read.
+    return {field: SELECTABLE_FIELDS[field](article) for field in fields}
+
+
+def directors_of(article: Movie) -> list:
+    if isinstance(article.director, list):
+        return article.director
+    return [] if article.director is None else [article.director]
+
+
 def review_to_dict(comment: Review):
     comment_dict = {
         'username': comment.user.user_name,
@@ -0,0 +1,205 @@
+"""Pre-forking HTTP server that creates the app once and shares it with its worker processes."""
+
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+from werkzeug.serving import BaseWSGIServer
+
+# Seconds a worker waits for a connection before checking whether it should stop.
+POLL_SECONDS = 1.0
+
+MASTER_SIGNALS = (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGUSR1)
+
+
+def read_memory_usage(pid='self') -> dict:
+    """ Returns the kB fields of /proc/<pid>/smaps_rollup, such as Rss, Pss, Shared_Clean and Private_Dirty. """
+    usage = dict()
+    with open(f'/proc/{pid}/smaps_rollup') as infile:
+        for line in infile:
+            fields = line.split()
+            if len(fields) == 3 and fields[2] == 'kB':
+                usage[fields[0].rstrip(':')] = int(fields[1])
+    return usage
+
+
+class WorkerServer(BaseWSGIServer):
+    """ A single-threaded WSGIServer on an inherited listening socket that counts the requests it handles. """
+
+    timeout = POLL_SECONDS
+
+    def __init__(self, host, port, app, fd):
+        super().__init__(host, port, app, fd=fd)
+        self.requests = 0
+
+    def process_request(self, request, client_address):
+        self.requests += 1
+        super().process_request(request, client_address)
+
+
+class PreforkServer:
+    """ Serves the app made by app_factory from a number of forked worker processes.
+
+    The master process makes the app (and so populates the repository) once, then freezes the garbage collector's view
+    of it with gc.freeze() before forking. The workers never scan or write to those objects' GC headers, so their pages
+    stay shared copy-on-write rather than being copied into every worker.
+
+    A worker that has handled max_requests requests (if not 0) exits and is replaced. SIGHUP makes the master remake
+    the app and replace its workers one at a time, each finishing its current request first; SIGTERM or SIGINT stops
+    the workers the same way and then the master. SIGUSR1 prints the memory of each worker.
+    """
+
+    def __init__(self, app_factory, host: str = 'localhost', port: int = 5000, workers: int = None,
+                 max_requests: int = 0, graceful_timeout: float = 30.0):
+        self._app_factory = app_factory
+        self._host = host
+        self._workers = workers or os.cpu_count() or 1
+        self._max_requests = max_requests
+        self._graceful_timeout = graceful_timeout
+        self._app = None
+        self._children = set()
+        self._signals = list()
+
+        self._listener = socket.create_server((host, port), backlog=128)
+        # Workers poll for connections, so that only the one that wins the race to accept one blocks on it.
+        self._listener.setblocking(False)
+
+    @property
+    def address(self):
+        return self._listener.getsockname()
+
+    @property
+    def worker_pids(self):
+        return list(self._children)
+
+    def load(self):
+        """ Makes the app and moves everything allocated so far to the collector's permanent generation. """
+        gc.unfreeze()
+        self._app = None
+        gc.collect()
+        self._app = self._app_factory()
+        gc.collect()
+        gc.freeze()
+
+    def serve_forever(self):
+        for signal_number in MASTER_SIGNALS:
+            signal.signal(signal_number, self._signal_received)
+        if self._app is None:
+            self.load()
+        self._spawn_workers()
+        self._log(f'Serving on http://{self._host}:{self.address[1]} with {self._workers} workers')
+
+        while True:
+            self._reap_workers()
+            while len(self._signals) > 0:
+                signal_number = self._signals.pop(0)
+                if signal_number in (signal.SIGTERM, signal.SIGINT):
+                    self.stop()
+                    return
+                if signal_number == signal.SIGHUP:
+                    self.reload()
+                elif signal_number == signal.SIGUSR1:
+                    self.report_memory()
+            self._spawn_workers()
+            time.sleep(POLL_SECONDS)
+
+    def reload(self):
+        """ Remakes the app, then replaces the old workers by ones forked from it, one at a time. """
+        self._log('Reloading')
+        old_pids = self.worker_pids
+        self.load()
+        for pid in old_pids:
+            self._spawn_worker()
+            self._stop_worker(pid)
+
+    def stop(self):
+        for pid in self.worker_pids:
+            self._signal_worker(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self._graceful_timeout
+        while len(self._children) > 0 and time.monotonic() < deadline:
+            self._reap_workers()
+            time.sleep(0.05)
+        for pid in self.worker_pids:
+            self._signal_worker(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self._children.discard(pid)
+        self._listener.close()
+
+    def report_memory(self) -> dict:
+        """ Prints and returns the memory of each worker: shared with other processes, and private to it, in kB. """
+        report = dict()
+        for pid in self.worker_pids:
+            try:
+                usage = read_memory_usage(pid)
+            except OSError:
+                continue
+            report[pid] = {
+                'shared': usage['Shared_Clean'] + usage['Shared_Dirty'],
+                'private': usage['Private_Clean'] + usage['Private_Dirty'],
+                'pss': usage['Pss']
+            }
+            self._log(f'Worker {pid}: {report[pid]["shared"]} kB shared, {report[pid]["private"]} kB private, '
+                      f'{report[pid]["pss"]} kB PSS')
+        return report
+
+    # Helper methods for the master process.
+    def _signal_received(self, signal_number, frame):
+        self._signals.append(signal_number)
+
+    def _reap_workers(self):
+        for pid in self.worker_pids:
+            finished_pid, status = os.waitpid(pid, os.WNOHANG)
+            if finished_pid != 0:
+                self._children.discard(pid)
+
+    def _spawn_workers(self):
+        while len(self._children) < self._workers:
+            self._spawn_worker()
+
+    def _spawn_worker(self):
+        # Hold back signals until the worker has replaced the master's handlers with its own.
+        signal.pthread_sigmask(signal.SIG_BLOCK, MASTER_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                status = 1
+                sys.excepthook(*sys.exc_info())
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        self._children.add(pid)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, MASTER_SIGNALS)
+
+    def _stop_worker(self, pid: int):
+        self._signal_worker(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+        self._children.discard(pid)
+
+    def _signal_worker(self, pid: int, signal_number: int):
+        try:
+            os.kill(pid, signal_number)
+        except ProcessLookupError:
+            pass
+
+    def _log(self, message: str):
+        print(f'[{os.getpid()}] {message}', file=sys.stderr, flush=True)
+
+    # The worker process.
+    def _run_worker(self):
+        stopping = list()
+        signal.signal(signal.SIGTERM, lambda signal_number, frame: stopping.append(signal_number))
+        for signal_number in (signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(signal_number, signal.SIG_IGN)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, MASTER_SIGNALS)
+
+        server = WorkerServer(self._host, 0, self._app, self._listener.fileno())
+        while len(stopping) == 0 and (self._max_requests == 0 or server.requests < self._max_requests):
+            server.handle_request()
+        server.socket.close()
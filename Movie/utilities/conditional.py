@@ -0,0 +1,83 @@
+import calendar
+import functools
+import hashlib
+import os
+
+from flask import current_app, make_response, request, session
+
+import Movie.adapters.repository as repo
+
+# Cache-Control of browse pages served to anonymous users when the configuration doesn't set one.
+DEFAULT_BROWSE_CACHE_CONTROL = 'public, max-age=60'
+
+# Files the repository is loaded from, whose contents the ETags of browse pages are derived from.
+DATA_FILES = ('news_articles.csv', 'users.csv', 'comments.csv')
+
+
+def conditional_get(kind: str, arg: str, arg_type=str):
+    """ Makes a browse view answer a GET with 304 Not Modified when the client already has the current page.
+
+    The page of an anonymous user shows the Movies of the Genre, Actor or release year of kind named by the query
+    argument arg, and the sidebar's Editor's picks, so its ETag comes from the data the repository was loaded from,
+    the repository's mutation digest for that name and the picks' rotation period, and its Last-Modified from the time
+    of the last change to that name and the start of the period. A request that still matches them gets its 304 before
+    the view calls services or renders templates. Pages of logged-in users greet them by name and aren't made
+    conditional.
+    """
+    def decorate(view):
+        @functools.wraps(view)
+        def conditional_view(*args, **kwargs):
+            if 'username' in session:
+                return view(*args, **kwargs)
+
+            etag, last_modified = page_version(kind, request.args.get(arg, type=arg_type))
+            if is_not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = current_app.config.get('BROWSE_CACHE_CONTROL') or \
+                DEFAULT_BROWSE_CACHE_CONTROL
+            response.vary.add('Cookie')
+            return response
+        return conditional_view
+    return decorate
+
+
+def data_digest(data_path: str) -> str:
+    """ Returns a digest of the data files in data_path, the same in every process and replica loading them. """
+    digest = hashlib.blake2b(digest_size=8)
+    for name in DATA_FILES:
+        path = os.path.join(data_path, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as infile:
+                for block in iter(lambda: infile.read(1 << 20), b''):
+                    digest.update(block)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def page_version(kind: str, name) -> tuple:
+    """ Returns the ETag and Last-Modified time of the page showing the Movies of kind named name. """
+    if name is None:
+        kind = None
+    repository = repo.repo_instance
+    # Derived from the data alone, so every worker and replica serving the same page gives it the same ETag.
+    mutation_digest = repository.get_mutation_digest(kind, name)
+    mutation_time = repository.get_mutation_time(kind, name)
+    editors_picks = current_app.extensions['editors_picks']
+    period = editors_picks.key(0)[0]
+    etag = f'{current_app.extensions["data_digest"]}.{mutation_digest}.{period}'
+    return etag, int(max(mutation_time, editors_picks.period_start()))
+
+
+def is_not_modified(etag: str, last_modified: int) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since is not None:
+        return last_modified <= calendar.timegm(request.if_modified_since.utctimetuple())
+    return False
+
@@ -0,0 +1,89 @@
+import os
+import random
+import threading
+import time
+
+import Movie.adapters.repository as repo
+import Movie.utilities.services as services
+
+# Seconds before a new rotation period starts that the background thread builds its pick sets.
+REFRESH_LEAD_SECONDS = 5
+
+
+class PickSet(tuple):
+    """ A set of picks, which carries the (period, quantity) key it was drawn for. """
+
+    def __new__(cls, picks, key: tuple):
+        pick_set = super().__new__(cls, picks)
+        pick_set.key = key
+        return pick_set
+
+
+class EditorsPicks:
+    """ Pool of the sets of movies shown as Editor's picks in the sidebar.
+
+    Time is divided into rotation periods, and the picks of a given quantity are the same for every request in a
+    period: they are drawn with a random number generator seeded with the period, then kept. A background thread
+    builds the sets of the next period shortly before it starts, so requests only look them up.
+    """
+
+    def __init__(self, app, rotation_seconds: int):
+        self._app = app
+        self._rotation_seconds = rotation_seconds
+        self._sets = dict()
+        self._lock = threading.Lock()
+        self._refresher_pid = None
+
+    def get(self, quantity: int, now: float = None) -> PickSet:
+        key = self.key(quantity, now)
+        picks = self._sets.get(key)
+        if picks is None:
+            picks = self._build(*key)
+        if not self._app.testing:
+            self._start_refresher()
+        return picks
+
+    def key(self, quantity: int, now: float = None) -> tuple:
+        """ Returns the (period, quantity) that identifies the picks of quantity at time now. """
+        if now is None:
+            now = time.time()
+        return int(now // self._rotation_seconds), quantity
+
+    def period_start(self, now: float = None) -> float:
+        """ Returns the time at which the rotation period containing now started. """
+        return self.key(0, now)[0] * self._rotation_seconds
+
+    def refresh(self, now: float = None):
+        """ Builds the sets of the next period for each quantity asked for so far, and drops those of past periods. """
+        period = self.key(0, now)[0]
+        for quantity in {quantity for _, quantity in list(self._sets)}:
+            if (period + 1, quantity) not in self._sets:
+                self._build(period + 1, quantity)
+        with self._lock:
+            for key in list(self._sets):
+                if key[0] < period:
+                    del self._sets[key]
+
+    def _build(self, period: int, quantity: int) -> PickSet:
+        # The sets hold no URLs, which depend on the request; the sidebar builds the links as it renders them.
+        articles = services.get_random_articles(quantity, repo.repo_instance, random.Random(period))
+        picks = PickSet(articles, (period, quantity))
+        with self._lock:
+            return self._sets.setdefault((period, quantity), picks)
+
+    # The background thread; started in each process that serves requests, as threads don't survive fork().
+    def _start_refresher(self):
+        if self._refresher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._refresher_pid != os.getpid():
+                self._refresher_pid = os.getpid()
+                threading.Thread(target=self._refresh_forever, daemon=True).start()
+
+    def _refresh_forever(self):
+        lead = min(REFRESH_LEAD_SECONDS, self._rotation_seconds / 10)
+        while True:
+            next_period = self.key(0)[0] + 1
+            time.sleep(max(0.0, next_period * self._rotation_seconds - lead - time.time()))
+            self.refresh()
+            time.sleep(lead)
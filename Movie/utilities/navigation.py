@@ -0,0 +1,83 @@
+import string
+import threading
+
+from bisect import bisect_left
+from typing import List
+
+from flask import request
+
+import Movie.adapters.repository as repo
+
+# Bucket of the actor directory for names that don't start with a letter from A to Z.
+OTHER_BUCKET = '#'
+LETTER_BUCKETS = list(string.ascii_uppercase)
+
+
+class NavigationMaps:
+    """ Navigation built from the repository's Genres and Actors, kept until the repository's catalog changes.
+
+    Each map is built the first time a request asks for it after a Movie, Genre, Actor or Director is added, instead
+    of on every request.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._maps = dict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str, build):
+        version = repo.repo_instance.get_catalog_version()
+        # URLs depend on where the app is mounted.
+        key = (name, request.script_root)
+        with self._lock:
+            if self._version != version:
+                self._maps.clear()
+                self._version = version
+            value = self._maps.get(key)
+        if value is None:
+            value = build()
+            with self._lock:
+                if self._version == version:
+                    value = self._maps.setdefault(key, value)
+        return value
+
+
+class ActorDirectory:
+    """ Actor names sorted alphabetically, in buckets by first letter and pages within a bucket. """
+
+    def __init__(self, names: List[str], page_size: int):
+        self._names = sorted(names, key=str.casefold)
+        self._keys = [name.casefold() for name in self._names]
+        self._page_size = page_size
+        self.buckets = [bucket for bucket in LETTER_BUCKETS + [OTHER_BUCKET] if self.bucket_size(bucket) > 0]
+
+    def bucket_size(self, bucket: str) -> int:
+        return sum(end - start for start, end in self._bucket_ranges(bucket))
+
+    def number_of_pages(self, bucket: str) -> int:
+        return -(-self.bucket_size(bucket) // self._page_size)
+
+    def page(self, bucket: str, page: int) -> List[str]:
+        """ Returns the names on page (counting from 0) of bucket, or an empty list past its last page. """
+        names = list()
+        skip = page * self._page_size
+        for start, end in self._bucket_ranges(bucket):
+            if skip >= end - start:
+                skip -= end - start
+                continue
+            start += skip
+            skip = 0
+            names.extend(self._names[start:min(end, start + self._page_size - len(names))])
+            if len(names) == self._page_size:
+                break
+        return names
+
+    # Helper method to find the ranges of sorted names in a bucket.
+    def _bucket_ranges(self, bucket: str) -> List[tuple]:
+        if bucket == OTHER_BUCKET:
+            # Names before 'a' (digits, punctuation) and after 'z' (accented letters and other scripts).
+            return [(0, bisect_left(self._keys, 'a')), (bisect_left(self._keys, '{'), len(self._keys))]
+        if bucket not in LETTER_BUCKETS:
+            return []
+        letter = bucket.lower()
+        return [(bisect_left(self._keys, letter), bisect_left(self._keys, chr(ord(letter) + 1)))]
@@ -26,7 +26,7 @@ def get_director_name(repo:AbstractRepository):
     return director
 
 
-def get_random_articles(quantity, repo: AbstractRepository):
+def get_random_articles(quantity, repo: AbstractRepository, rng=random):
     article_count = repo.get_number_of_movie()
 
     if quantity >= article_count:
@@ -34,7 +34,7 @@ def get_random_articles(quantity, repo: AbstractRepository):
         quantity = article_count - 1
 
     # Pick distinct and random articles.
-    random_ids = random.sample(range(1, article_count), quantity)
+    random_ids = rng.sample(range(1, article_count), quantity)
     articles = repo.get_movie_by_rank(random_ids)
 
     return articles_to_dict(articles)
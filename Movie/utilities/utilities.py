@@ -1,7 +1,11 @@
-from flask import Blueprint, request, render_template, redirect, url_for, session
+from flask import Blueprint, request, render_template, redirect, url_for, session, current_app
 
 import Movie.adapters.repository as repo
 import Movie.utilities.services as services
+from Movie.utilities.navigation import ActorDirectory
+
+# Actors listed per page of the actor directory.
+ACTORS_PER_PAGE = 50
 
 
 # Configure Blueprint.
@@ -10,6 +14,10 @@ utilities_blueprint = Blueprint(
 
 
 def get_tags_and_urls():
+    return current_app.extensions['navigation'].get('tag_urls', build_tags_and_urls)
+
+
+def build_tags_and_urls():
     tag_names = services.get_genre_names(repo.repo_instance)
     tag_urls = dict()
     for tag_name in tag_names:
@@ -18,13 +26,14 @@ def get_tags_and_urls():
     return tag_urls
 
 
-def get_actors_and_urls():
-    actor_names = services.get_actor_name(repo.repo_instance)
-    actor_urls = dict()
-    for actor_name in actor_names:
-        actor_urls[actor_name] = url_for("news_bp.movie_by_actor", actor = actor_name)
+def get_actor_directory() -> ActorDirectory:
+    return current_app.extensions['navigation'].get('actor_directory', build_actor_directory)
+
+
+def build_actor_directory():
+    actor_names = set(services.get_actor_name(repo.repo_instance))
+    return ActorDirectory(list(actor_names), ACTORS_PER_PAGE)
 
-    return actor_urls
 def get_director_and_url():
     director_names = services.get_director_name(repo.repo_instance)
     director_urls = dict()
@@ -34,8 +43,5 @@ def get_director_and_url():
     return director_urls
 
 def get_selected_articles(quantity=3):
-    articles = services.get_random_articles(quantity, repo.repo_instance)
-
-    for article in articles:
-        article['hyperlink'] = url_for('news_bp.articles_by_date', date=article['date'])
-    return articles
\ No newline at end of file
+    # The picks rotate periodically rather than per request; see EditorsPicks.
+    return current_app.extensions['editors_picks'].get(quantity)
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""Micro-benchmarks for the repository and service layers.
+
+Run a benchmark from the project root, e.g. `python -m benchmarks.user_lookup`.
+"""
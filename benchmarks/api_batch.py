@@ -0,0 +1,46 @@
+"""Time to read the first 100 movies of a genre: scraping the HTML genre pages one page at a time, versus one call to
+the JSON API with a few fields and with the default fields.
+
+Usage: python -m benchmarks.api_batch [number_of_movies]
+"""
+import sys
+import tempfile
+import timeit
+
+from Movie import create_app
+
+from benchmarks.synthetic import write_dataset
+
+MOVIES = 100
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_dataset(data_path, number_of_movies)
+        app = create_app({'TESTING': True, 'REPOSITORY': 'memory', 'TEST_DATA_PATH': data_path,
+                          'WTF_CSRF_ENABLED': False, 'PAGE_CACHE_SIZE': 0, 'FRAGMENT_CACHE_SIZE': 0})
+    client = app.test_client()
+
+    def scrape():
+        url = '/articles_by_genre?tag=Drama'
+        for _ in range(MOVIES // 2):
+            response = client.get(url)
+            # Follow the 'next' button, as a scraper would.
+            after = response.data.split(b'after=', 1)[1].split(b'"', 1)[0].decode()
+            url = f'/articles_by_genre?tag=Drama&after={after}'
+
+    def call(fields: str):
+        return lambda: client.get(f'/api/v1/genres/Drama/movies?limit={MOVIES}{fields}')
+
+    repeats = 5
+    print(f'{"read":>22} {"ms":>10}')
+    for name, read in [('HTML pages', scrape), ('API, fields=id,title', call('&fields=id,title')),
+                       ('API, default fields', call(''))]:
+        read()
+        print(f'{name:>22} {timeit.timeit(read, number=repeats) / repeats * 1000:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Full MemoryRepository catalog load time as the catalog doubles; near-constant time per movie means linear loading.
+
+Usage: python -m benchmarks.association_scaling [largest_number_of_movies]
+"""
+import sys
+import tempfile
+import time
+
+from Movie.adapters.memory_repository import MemoryRepository, load_movies_and_genres_and_actors_and_directors
+
+from benchmarks.synthetic import write_dataset
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 160_000
+
+    sizes = list()
+    number_of_movies = largest
+    while number_of_movies >= 10_000:
+        sizes.insert(0, number_of_movies)
+        number_of_movies //= 2
+
+    print(f'{"movies":>10} {"load (s)":>10} {"us/movie":>10}')
+    for number_of_movies in sizes:
+        with tempfile.TemporaryDirectory() as data_path:
+            write_dataset(data_path, number_of_movies)
+            start = time.perf_counter()
+            load_movies_and_genres_and_actors_and_directors(data_path, MemoryRepository())
+            elapsed = time.perf_counter() - start
+        print(f'{number_of_movies:>10} {elapsed:>10.2f} {elapsed / number_of_movies * 1e6:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
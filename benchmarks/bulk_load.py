@@ -0,0 +1,55 @@
+"""Movie ingestion time: per-row add_movie (insort) versus the add_movies bulk load.
+
+Usage: python -m benchmarks.bulk_load [number_of_movies]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from Movie.adapters.memory_repository import MemoryRepository, read_csv_file, \
+    load_movies_and_genres_and_actors_and_directors
+from Movie.domain.domain_model import Movie
+
+from benchmarks.synthetic import write_dataset
+
+
+def load_per_row(data_path: str):
+    repo = MemoryRepository()
+    for data_row in read_csv_file(os.path.join(data_path, 'news_articles.csv')):
+        repo.add_movie(Movie(data_row[1], int(data_row[6])), int(data_row[0]), data_row[3])
+    return repo
+
+
+def load_bulk(data_path: str):
+    repo = MemoryRepository()
+    movies = list()
+    for data_row in read_csv_file(os.path.join(data_path, 'news_articles.csv')):
+        movie = Movie(data_row[1], int(data_row[6]))
+        movie.set_id(int(data_row[0]))
+        movie.description = data_row[3]
+        movies.append(movie)
+    repo.add_movies(movies)
+    return repo
+
+
+def timed(label: str, function, *args):
+    start = time.perf_counter()
+    function(*args)
+    print(f'{label:<40} {time.perf_counter() - start:>8.2f} s')
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_dataset(data_path, number_of_movies)
+        print(f'{number_of_movies} movies')
+        timed('movies, per-row add_movie', load_per_row, data_path)
+        timed('movies, bulk add_movies', load_bulk, data_path)
+        timed('full catalog load (bulk)', load_movies_and_genres_and_actors_and_directors, data_path,
+              MemoryRepository())
+
+
+if __name__ == '__main__':
+    main()
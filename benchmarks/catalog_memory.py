@@ -0,0 +1,59 @@
+"""Bytes per movie held by MemoryRepository and ColumnarRepository after loading a synthetic catalog.
+
+Usage: python -m benchmarks.catalog_memory [number_of_movies]
+"""
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from Movie.adapters import memory_repository, columnar_repository
+from Movie.adapters.search_index import SearchIndex
+
+from benchmarks.synthetic import write_dataset
+
+
+def measure(label: str, number_of_movies: int, build):
+    gc.collect()
+    tracemalloc.start()
+    built = build()
+    gc.collect()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<30} {size / number_of_movies:>10.0f} {peak / number_of_movies:>10.0f}')
+    return built
+
+
+def build_repo(data_path: str, repository_class, loader):
+    repo = repository_class()
+    loader(data_path, repo)
+    return repo
+
+
+def build_search_index(data_path: str):
+    # Both repositories carry one of these; it is reported separately.
+    index = SearchIndex()
+    for data_row in memory_repository.read_csv_file(os.path.join(data_path, 'news_articles.csv')):
+        index.add(int(data_row[0]), data_row[1], data_row[3])
+    return index
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_dataset(data_path, number_of_movies)
+        print(f'{number_of_movies} movies')
+        print(f'{"repository":<30} {"bytes/movie":>10} {"peak":>10}')
+        measure('MemoryRepository', number_of_movies, lambda: build_repo(
+            data_path, memory_repository.MemoryRepository,
+            memory_repository.load_movies_and_genres_and_actors_and_directors))
+        measure('ColumnarRepository', number_of_movies, lambda: build_repo(
+            data_path, columnar_repository.ColumnarRepository,
+            columnar_repository.load_movies_and_genres_and_actors_and_directors))
+        measure('(search index in each)', number_of_movies, lambda: build_search_index(data_path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Per-object memory of the slotted domain classes against dict-backed equivalents, measured with tracemalloc.
+
+Usage: python -m benchmarks.domain_memory [number_of_movies]
+"""
+import ast
+import gc
+import inspect
+import sys
+import tracemalloc
+import types
+
+from Movie.domain import domain_model
+
+
+def unslotted_model():
+    # The domain module re-executed without its __slots__ declarations, so the classes' isinstance checks
+    # refer to each other and instances keep their attributes in a __dict__.
+    tree = ast.parse(inspect.getsource(domain_model))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            node.body = [statement for statement in node.body if not (
+                isinstance(statement, ast.Assign) and
+                any(isinstance(target, ast.Name) and target.id == '__slots__' for target in statement.targets))]
+    module = types.ModuleType('unslotted_domain_model')
+    exec(compile(tree, domain_model.__file__, 'exec'), module.__dict__)
+    return module
+
+
+def model_classes(module):
+    return module.Movie, module.Genre, module.Actor, module.Director, module.User, module.Review
+
+
+def build_catalog(number_of_movies: int, classes):
+    movie_class, genre_class, actor_class, director_class, user_class, review_class = classes
+    genres = [genre_class(f'Genre {i}') for i in range(20)]
+    user = user_class('fmercury', 'hash')
+
+    movies = list()
+    for rank in range(number_of_movies):
+        movie = movie_class(f'Movie {rank}', 2000 + rank % 20)
+        movie.set_id(rank)
+        movie.description = 'A group of intergalactic criminals are forced to work together.'
+        movie.add_genre(genres[rank % 20])
+        movie.add_actor(actor_class(f'Actor {rank}'))
+        movie.add_director(director_class(f'Director {rank}'))
+        if rank % 10 == 0:
+            movie.add_review(review_class(user, movie, 'Great', 8))
+        movies.append(movie)
+    return movies
+
+
+def measure(number_of_movies: int, classes) -> float:
+    gc.collect()
+    tracemalloc.start()
+    catalog = build_catalog(number_of_movies, classes)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    return size / number_of_movies
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    slotted_classes = model_classes(domain_model)
+    dict_classes = model_classes(unslotted_model())
+
+    # Each movie carries one actor, one director and a tenth of a review, so the per-movie figure covers those too.
+    dict_backed = measure(number_of_movies, dict_classes)
+    slotted = measure(number_of_movies, slotted_classes)
+    print(f'{number_of_movies} movies')
+    print(f'dict-backed {dict_backed:>8.0f} bytes/movie')
+    print(f'slotted     {slotted:>8.0f} bytes/movie')
+    print(f'saving      {dict_backed - slotted:>8.0f} bytes/movie ({(1 - slotted / dict_backed) * 100:.0f}%)')
+
+
+if __name__ == '__main__':
+    main()
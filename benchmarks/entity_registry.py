@@ -0,0 +1,43 @@
+"""Entity instances and actor index size after loading a synthetic catalog with MovieFileCSVReader and the
+MemoryRepository loader.
+
+Usage: python -m benchmarks.entity_registry [number_of_movies]
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from Movie.adapters.memory_repository import MemoryRepository, load_movies_and_genres_and_actors_and_directors
+from Movie.domain.domain_model import MovieFileCSVReader
+
+from benchmarks.synthetic import write_movies_csv
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_movies_csv(data_path, number_of_movies)
+        print(f'{number_of_movies} movies')
+
+        tracemalloc.start()
+        reader = MovieFileCSVReader(os.path.join(data_path, 'news_articles.csv'))
+        reader.read_csv_file()
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        movies = reader.dataset_of_movies
+        instances = {id(entity) for movie in movies for entity in movie.actors + movie.genres + [movie.director]}
+        print(f'MovieFileCSVReader: {len(instances)} entity instances for '
+              f'{len(reader.dataset_of_actors) + len(reader.dataset_of_genres) + len(reader.dataset_of_directors)} '
+              f'entities, {size / 2 ** 20:.1f} MiB')
+
+        repo = MemoryRepository()
+        load_movies_and_genres_and_actors_and_directors(data_path, repo)
+        names = {actor.actor_full_name for actor in repo.get_actors()}
+        print(f'MemoryRepository: {len(repo.get_actors())} actors for {len(names)} distinct names, '
+              f'{len(repo._postings["actor"])} actor index entries')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Peak memory allocated while exporting the whole catalog as NDJSON, streamed in chunks, versus building the whole
+export at once, for growing catalogs. The streamed export's peak stays flat; the whole export's grows with the catalog.
+
+Usage: python -m benchmarks.export_memory [largest_number_of_movies]
+"""
+import sys
+import tempfile
+import tracemalloc
+
+from Movie.adapters import columnar_repository
+from Movie.adapters.columnar_repository import ColumnarRepository
+from Movie.api import export
+
+from benchmarks.synthetic import write_movies_csv
+
+
+def peak_kib(write) -> float:
+    tracemalloc.start()
+    write()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    largest_number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print(f'{"movies":>10} {"streamed KiB":>14} {"whole KiB":>14}')
+    number_of_movies = 1_000
+    while number_of_movies <= largest_number_of_movies:
+        with tempfile.TemporaryDirectory() as data_path:
+            write_movies_csv(data_path, number_of_movies)
+            repo = ColumnarRepository()
+            columnar_repository.load_movies_and_genres_and_actors_and_directors(data_path, repo, processes=1)
+
+        def streamed():
+            for _ in export.export_chunks(repo, 'movies', 'ndjson'):
+                pass
+
+        def whole():
+            ''.join(list(export.export_chunks(repo, 'movies', 'ndjson')))
+
+        print(f'{number_of_movies:>10} {peak_kib(streamed):>14.0f} {peak_kib(whole):>14.0f}')
+        number_of_movies *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Movie CSV parsing throughput: the serial read_csv_file loop versus the chunked multi-process pipeline.
+
+Usage: python -m benchmarks.ingestion [number_of_movies]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from Movie.adapters.ingestion import IngestionStats, read_movie_records
+from Movie.adapters.memory_repository import read_csv_file
+
+from benchmarks.synthetic import write_movies_csv
+
+
+def parse_serially(filename: str) -> int:
+    rows = 0
+    for data_row in read_csv_file(filename):
+        data_row[2].split(',')
+        data_row[5].split(',')
+        int(data_row[0])
+        int(data_row[6])
+        rows += 1
+    return rows
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_movies_csv(data_path, number_of_movies)
+        filename = os.path.join(data_path, 'news_articles.csv')
+        print(f'{number_of_movies} movies, {os.path.getsize(filename) / 2 ** 20:.0f} MiB, {os.cpu_count()} CPUs')
+        print(f'{"parser":<20} {"seconds":>10} {"rows/s":>12}')
+
+        start = time.perf_counter()
+        rows = parse_serially(filename)
+        elapsed = time.perf_counter() - start
+        print(f'{"read_csv_file":<20} {elapsed:>10.2f} {rows / elapsed:>12.0f}')
+
+        process_counts = [1]
+        while process_counts[-1] * 2 <= (os.cpu_count() or 1):
+            process_counts.append(process_counts[-1] * 2)
+        for processes in process_counts:
+            stats = IngestionStats()
+            for _ in read_movie_records(filename, processes, stats=stats):
+                pass
+            print(f'{f"pipeline, {processes} proc":<20} {stats.seconds:>10.2f} {stats.rows_per_second:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
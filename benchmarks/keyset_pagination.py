@@ -0,0 +1,50 @@
+"""Time to find one page of a genre's movie ranks at growing depths: slicing the full list of ranks at an offset, as
+the genre pages did, versus seeking to the page's cursor with get_movie_ranks_page.
+
+Usage: python -m benchmarks.keyset_pagination [number_of_movies]
+"""
+import sys
+import tempfile
+import timeit
+
+from Movie.adapters import columnar_repository
+from Movie.adapters.columnar_repository import ColumnarRepository
+from Movie.adapters.memory_repository import MemoryRepository, load_movies_and_genres_and_actors_and_directors
+
+from benchmarks.synthetic import write_movies_csv
+
+MOVIES_PER_PAGE = 2
+
+
+def time_pages(repo, genre: str):
+    ranks = repo.get_movie_ranks_for_genre(genre)
+    repeats = 200
+    for depth in (0.0, 0.5, 1.0):
+        offset = min(int(len(ranks) * depth), len(ranks) - MOVIES_PER_PAGE)
+        after_rank = ranks[offset - 1] if offset > 0 else None
+        sliced = timeit.timeit(lambda: repo.get_movie_ranks_for_genre(genre)[offset:offset + MOVIES_PER_PAGE],
+                               number=repeats) / repeats
+        keyset = timeit.timeit(lambda: repo.get_movie_ranks_page('genre', genre, MOVIES_PER_PAGE, after_rank),
+                               number=repeats) / repeats
+        assert repo.get_movie_ranks_page('genre', genre, MOVIES_PER_PAGE, after_rank).ranks == \
+            ranks[offset:offset + MOVIES_PER_PAGE]
+        print(f'{type(repo).__name__:>18} {offset:>8} {sliced * 1e6:>12.1f} {keyset * 1e6:>12.1f}')
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_movies_csv(data_path, number_of_movies)
+        memory_repo = MemoryRepository()
+        load_movies_and_genres_and_actors_and_directors(data_path, memory_repo, processes=1)
+        columnar_repo = ColumnarRepository()
+        columnar_repository.load_movies_and_genres_and_actors_and_directors(data_path, columnar_repo, processes=1)
+
+    print(f'{"repository":>18} {"offset":>8} {"slice us":>12} {"keyset us":>12}')
+    for repo in (memory_repo, columnar_repo):
+        time_pages(repo, 'Drama')
+
+
+if __name__ == '__main__':
+    main()
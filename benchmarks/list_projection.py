@@ -0,0 +1,39 @@
+"""Time to build the dicts of one page of a genre listing, with the full article_to_dict and with the list summary,
+for growing catalogs. The full dict lists every movie of each tag, so it grows with the catalog; the summary doesn't.
+
+Usage: python -m benchmarks.list_projection [largest_number_of_movies]
+"""
+import sys
+import tempfile
+import timeit
+
+from Movie.adapters.memory_repository import MemoryRepository, load_movies_and_genres_and_actors_and_directors
+from Movie.news import services
+
+from benchmarks.synthetic import write_movies_csv
+
+MOVIES_PER_PAGE = 2
+
+
+def main():
+    largest_number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print(f'{"movies":>10} {"full dicts ms":>14} {"summaries ms":>14}')
+    number_of_movies = 1_000
+    while number_of_movies <= largest_number_of_movies:
+        with tempfile.TemporaryDirectory() as data_path:
+            write_movies_csv(data_path, number_of_movies)
+            repo = MemoryRepository()
+            load_movies_and_genres_and_actors_and_directors(data_path, repo, processes=1)
+
+        ranks = repo.get_movie_ranks_for_genre('Drama')[:MOVIES_PER_PAGE]
+        movies = repo.get_movie_by_rank(ranks)
+        repeats = 200
+        full = timeit.timeit(lambda: services.articles_to_dict(movies), number=repeats) / repeats
+        summary = timeit.timeit(lambda: services.articles_to_summary_dict(movies), number=repeats) / repeats
+        print(f'{number_of_movies:>10} {full * 1000:>14.3f} {summary * 1000:>14.3f}')
+        number_of_movies *= 10
+
+
+if __name__ == '__main__':
+    main()
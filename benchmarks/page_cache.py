@@ -0,0 +1,74 @@
+"""Anonymous browsing with reviews posted now and then, with and without the page cache: time per request, and the
+cache's hit ratio, memory use and time saved. The cache counts the time a page took to make when it was cached,
+which includes warming the caches under it, so it credits itself with more than the measured saving.
+
+Pages are picked with a skew towards the first ones, as on a real site. Every REVIEW_EVERY requests a logged-in user
+reviews a random movie, which drops the cached pages showing it.
+
+Usage: python -m benchmarks.page_cache [number_of_movies] [requests]
+"""
+import random
+import sys
+import tempfile
+import time
+
+from Movie import create_app
+import Movie.adapters.repository as repo
+from Movie.news import page_cache
+
+from benchmarks.synthetic import write_dataset
+
+REVIEW_EVERY = 50
+GENRES = ['Action', 'Adventure', 'Comedy', 'Drama', 'Horror', 'Romance', 'Sci-Fi', 'Thriller']
+
+
+def pages(number_of_movies: int, rng: random.Random):
+    while True:
+        kind = rng.randrange(3)
+        page = int(rng.paretovariate(1.2)) - 1
+        if kind == 0:
+            yield f'/articles_by_date?date={2020 - page % 70}'
+        elif kind == 1:
+            yield f'/articles_by_genre?tag={GENRES[page % len(GENRES)]}&after={10 * (page // len(GENRES) % 50)}'
+        else:
+            yield f'/articles_by_actor?actor=Actor%20{page % max(1, number_of_movies // 5)}'
+
+
+def browse(data_path: str, number_of_movies: int, number_of_requests: int, cache_size: int) -> tuple:
+    app = create_app({'TESTING': True, 'REPOSITORY': 'memory', 'TEST_DATA_PATH': data_path, 'WTF_CSRF_ENABLED': False,
+                      'PAGE_CACHE_SIZE': cache_size})
+    rng = random.Random(235)
+    reader = app.test_client()
+    writer = app.test_client()
+    writer.post('/authentication/login', data={'username': 'user1', 'password': 'Password1'})
+
+    start = time.perf_counter()
+    for index, url in zip(range(number_of_requests), pages(number_of_movies, rng)):
+        reader.get(url)
+        if index % REVIEW_EVERY == REVIEW_EVERY - 1:
+            writer.post('/review', data={'comment': f'Review number {index}',
+                                         'article_id': rng.randint(1, number_of_movies)})
+    elapsed = time.perf_counter() - start
+    return elapsed / number_of_requests, page_cache.cache_for(repo.repo_instance).stats()
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    number_of_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_dataset(data_path, number_of_movies)
+        uncached, _ = browse(data_path, number_of_movies, number_of_requests, 0)
+        cached, stats = browse(data_path, number_of_movies, number_of_requests, page_cache.DEFAULT_MAXSIZE)
+
+    print(f'{"page cache":>12} {"ms/request":>12}')
+    print(f'{"off":>12} {uncached * 1000:>12.3f}')
+    print(f'{"on":>12} {cached * 1000:>12.3f}')
+    print(f'hit ratio {stats["hit_ratio"]:.1%}, {stats["size"]} pages in {stats["size_bytes"] / 1024:.0f} KiB, '
+          f'{stats["invalidations"]} dropped by reviews, {stats["evictions"]} evicted, '
+          f'{stats["seconds_saved"]:.2f} s of page making saved by the count of the cache, '
+          f'{(uncached - cached) * number_of_requests:.2f} s measured')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""Password hashing throughput during user import, by number of worker processes.
+
+Usage: python -m benchmarks.password_hashing [number_of_passwords]
+"""
+import os
+import sys
+import time
+
+from Movie.adapters.password_hashing import hash_passwords
+
+
+def main():
+    number_of_passwords = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    passwords = [f'Password{i}' for i in range(number_of_passwords)]
+
+    process_counts = [1]
+    while process_counts[-1] * 2 <= (os.cpu_count() or 1):
+        process_counts.append(process_counts[-1] * 2)
+
+    print(f'{number_of_passwords} passwords, {os.cpu_count()} CPUs')
+    print(f'{"processes":>10} {"seconds":>10} {"hashes/s":>10}')
+    for processes in process_counts:
+        start = time.perf_counter()
+        for _ in hash_passwords(passwords, processes):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f'{processes:>10} {elapsed:>10.2f} {number_of_passwords / elapsed:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
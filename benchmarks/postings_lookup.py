@@ -0,0 +1,38 @@
+"""Genre/actor/director rank lookup latency in MemoryRepository as the number of actors grows."""
+import random
+import timeit
+
+from Movie.adapters.memory_repository import MemoryRepository
+from Movie.domain.domain_model import Movie, Actor, make_actor_association
+
+SIZES = (1_000, 10_000, 100_000)
+LOOKUPS = 10_000
+
+
+def build_repo(number_of_actors: int):
+    repo = MemoryRepository()
+    movies = list()
+    for rank in range(1, number_of_actors + 1):
+        movie = Movie(f'Movie {rank}', 2000)
+        movie.set_id(rank)
+        movies.append(movie)
+    repo.add_movies(movies)
+
+    for i, movie in enumerate(movies):
+        actor = Actor(f'Actor {i}')
+        make_actor_association(movie, actor)
+        repo.add_actor(actor)
+    return repo
+
+
+def main():
+    print(f'{"actors":>10} {"ns/lookup":>10}')
+    for size in SIZES:
+        repo = build_repo(size)
+        names = [f'Actor {random.randrange(size)}' for _ in range(LOOKUPS)]
+        seconds = timeit.timeit(lambda: [repo.get_movie_ranks_for_actor(name) for name in names], number=5)
+        print(f'{size:>10} {seconds / (5 * LOOKUPS) * 1e9:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Requests per second and memory per worker: the single-threaded wsgi.py server versus the pre-forking server, with
+and without gc.freeze() in the master.
+
+Each client process requests a mix of pages over fresh connections. Memory is read from /proc/<pid>/smaps_rollup of
+every worker after the load, once the workers' garbage collectors have run over the app they inherited.
+
+Usage: python -m benchmarks.prefork [number_of_movies] [workers] [requests]
+"""
+import gc
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+import urllib.request
+
+from werkzeug.serving import make_server
+
+from Movie import create_app
+from Movie.prefork import PreforkServer, read_memory_usage
+
+from benchmarks.synthetic import write_dataset
+
+CLIENTS = 4
+PAGES = ['/', '/articles_by_date?date=2015', '/articles_by_genre?tag=Drama', '/articles_by_actor?actor=Actor%201',
+         '/search?query=galaxy+robot']
+
+
+class UnfrozenPreforkServer(PreforkServer):
+
+    def load(self):
+        self._app = self._app_factory()
+
+
+def app_factory(data_path: str):
+    return lambda: create_app({'TESTING': False, 'REPOSITORY': 'memory', 'TEST_DATA_PATH': data_path,
+                               'WTF_CSRF_ENABLED': False})
+
+
+def quietly():
+    # Silence the request log, which is the same for every server.
+    sys.stderr = open(os.devnull, 'w')
+
+
+def serve_single_threaded(data_path: str, port: int):
+    quietly()
+    make_server('localhost', port, app_factory(data_path)(), threaded=False).serve_forever()
+
+
+def serve_prefork(server_class, data_path: str, port: int, workers: int):
+    quietly()
+    server_class(app_factory(data_path), 'localhost', port, workers).serve_forever()
+
+
+def request_pages(port: int, number_of_requests: int):
+    for index in range(number_of_requests):
+        with urllib.request.urlopen(f'http://localhost:{port}{PAGES[index % len(PAGES)]}') as response:
+            response.read()
+
+
+def wait_until_serving(port: int):
+    while True:
+        try:
+            request_pages(port, 1)
+            return
+        except OSError:
+            time.sleep(0.2)
+
+
+def measure(label: str, target, args, port: int, number_of_requests: int):
+    server = multiprocessing.Process(target=target, args=args)
+    server.start()
+    wait_until_serving(port)
+
+    start = time.perf_counter()
+    clients = [multiprocessing.Process(target=request_pages, args=(port, number_of_requests // CLIENTS))
+               for _ in range(CLIENTS)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    pids = [int(pid) for pid in open(f'/proc/{server.pid}/task/{server.pid}/children').read().split()] or [server.pid]
+    usages = [read_memory_usage(pid) for pid in pids]
+    shared = sum(usage['Shared_Clean'] + usage['Shared_Dirty'] for usage in usages) / len(usages) / 1024
+    private = sum(usage['Private_Clean'] + usage['Private_Dirty'] for usage in usages) / len(usages) / 1024
+    print(f'{label:<28} {number_of_requests / elapsed:>10.0f} {shared:>12.1f} {private:>12.1f}')
+
+    os.kill(server.pid, signal.SIGTERM)
+    server.join()
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    number_of_requests = int(sys.argv[3]) if len(sys.argv) > 3 else 400
+    gc.collect()
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_dataset(data_path, number_of_movies)
+        print(f'{number_of_movies} movies, {workers} workers, {number_of_requests} requests, {os.cpu_count()} CPUs')
+        print(f'{"server":<28} {"req/s":>10} {"shared MiB":>12} {"private MiB":>12}')
+        measure('wsgi.py (threaded=False)', serve_single_threaded, (data_path, 5101), 5101, number_of_requests)
+        measure('prefork without gc.freeze', serve_prefork, (UnfrozenPreforkServer, data_path, 5102, workers), 5102,
+                number_of_requests)
+        measure('prefork with gc.freeze', serve_prefork, (PreforkServer, data_path, 5103, workers), 5103,
+                number_of_requests)
+
+
+if __name__ == '__main__':
+    main()
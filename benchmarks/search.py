@@ -0,0 +1,44 @@
+"""Full-text search latency over a synthetic catalog.
+
+Usage: python -m benchmarks.search [number_of_movies]
+"""
+import random
+import sys
+import time
+
+from Movie.adapters.search_index import SearchIndex
+
+from benchmarks.synthetic import WORDS
+
+QUERIES = 200
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(235)
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    for rank in range(1, number_of_movies + 1):
+        title = ' '.join(rng.choice(WORDS) for _ in range(3)) + f' title{rank}'
+        description = ' '.join(rng.choice(WORDS) for _ in range(20)) + f' unique{rank}'
+        index.add(rank, title, description)
+    print(f'indexed {number_of_movies} movies in {time.perf_counter() - start:.1f} s')
+
+    workloads = {
+        'rare term': lambda: f'unique{rng.randint(1, number_of_movies)}',
+        'rare + common term': lambda: f'title{rng.randint(1, number_of_movies)} {rng.choice(WORDS)}',
+        'common term': lambda: rng.choice(WORDS),
+    }
+    for label, make_query in workloads.items():
+        queries = [make_query() for _ in range(QUERIES)]
+        for run in ('cold', 'warm'):
+            # The first run builds the impact lists of the common terms.
+            start = time.perf_counter()
+            for query in queries:
+                index.search(query, limit=10)
+            print(f'{label:<20} {run} {(time.perf_counter() - start) / QUERIES * 1000:>8.2f} ms/query')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Memory per worker process when every worker loads its own MemoryRepository versus when all of them map one shared
+catalog file, at 1, 8 and 32 concurrent workers.
+
+RSS counts shared pages in full in every process; PSS divides them between the processes that map them, and Private is
+memory no other process shares. Linux only, as it reads /proc/self/smaps_rollup.
+
+Usage: python -m benchmarks.shared_catalog_rss [number_of_movies]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+
+from Movie.adapters import memory_repository, shared_catalog
+from Movie.adapters.memory_repository import MemoryRepository
+
+from benchmarks.synthetic import write_dataset
+
+WORKER_COUNTS = (1, 8, 32)
+
+
+def memory_usage() -> dict:
+    usage = dict()
+    with open('/proc/self/smaps_rollup') as infile:
+        for line in infile:
+            fields = line.split()
+            if len(fields) == 3 and fields[2] == 'kB':
+                usage[fields[0].rstrip(':')] = int(fields[1])
+    return usage
+
+
+def serve(backend: str, data_path: str, catalog_path: str, barrier, results):
+    if backend == 'memory':
+        repo = MemoryRepository()
+        memory_repository.populate(data_path, repo)
+    else:
+        repo = shared_catalog.SharedCatalogRepository(catalog_path)
+        shared_catalog.populate(data_path, repo)
+
+    # Touch the whole catalog, as a worker does over time when serving requests.
+    for rank in range(1, repo.get_number_of_movie() + 1, 97):
+        movie = repo.get_movie(rank)
+        movie.actors, movie.genres, movie.director
+    for year in repo.get_release_years():
+        repo.get_movie_by_year(year)
+    repo.search_movie_ranks('movie story')
+
+    # Measure once every worker is alive, so that shared pages are divided between all of them.
+    barrier.wait()
+    usage = memory_usage()
+    results.put((usage['Rss'], usage['Pss'], usage['Private_Clean'] + usage['Private_Dirty']))
+    barrier.wait()
+
+
+def run(backend: str, workers: int, data_path: str, catalog_path: str):
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=serve, args=(backend, data_path, catalog_path, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    usages = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    rss, pss, private = (sum(values) / workers / 1024 for values in zip(*usages))
+    print(f'{backend:<8} {workers:>8} {rss:>10.1f} {pss:>10.1f} {private:>10.1f} {pss * workers:>12.1f}')
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_dataset(data_path, number_of_movies)
+        catalog_path = os.path.join(data_path, 'catalog.bin')
+        shared_catalog.build_catalog(data_path, catalog_path)
+
+        print(f'{number_of_movies} movies, catalog file {os.path.getsize(catalog_path) / 2 ** 20:.1f} MiB')
+        print(f'{"backend":<8} {"workers":>8} {"RSS MiB":>10} {"PSS MiB":>10} {"Private":>10} {"total PSS":>12}')
+        for workers in WORKER_COUNTS:
+            for backend in ('memory', 'shared'):
+                run(backend, workers, data_path, catalog_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Synthetic data files in the same layout as Movie/adapters/data."""
+import csv
+import os
+import random
+
+MOVIE_HEADERS = ['Rank', 'Title', 'Genre', 'Description', 'Director', 'Actors', 'Year', 'Runtime (Minutes)',
+                 'Rating', 'Votes', 'Revenue (Millions)', 'Metascore']
+
+GENRES = ['Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Drama', 'Family', 'Fantasy',
+          'History', 'Horror', 'Music', 'Musical', 'Mystery', 'Romance', 'Sci-Fi', 'Sport', 'Thriller', 'War',
+          'Western']
+
+WORDS = ['galaxy', 'criminal', 'warrior', 'universe', 'mankind', 'moon', 'structure', 'team', 'secret', 'city',
+         'family', 'journey', 'love', 'war', 'island', 'detective', 'robot', 'king', 'river', 'storm', 'night',
+         'dream', 'empire', 'heist', 'ghost', 'summer', 'school', 'ocean', 'mountain', 'revenge']
+
+
+def write_movies_csv(data_path: str, number_of_movies: int, number_of_actors: int = None, seed: int = 235):
+    rng = random.Random(seed)
+    if number_of_actors is None:
+        number_of_actors = max(10, number_of_movies // 4)
+    number_of_directors = max(5, number_of_movies // 10)
+
+    with open(os.path.join(data_path, 'news_articles.csv'), 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(MOVIE_HEADERS)
+        for rank in range(1, number_of_movies + 1):
+            title = ' '.join(rng.choice(WORDS).capitalize() for _ in range(3)) + f' {rank}'
+            genres = ','.join(rng.sample(GENRES, rng.randint(1, 3)))
+            description = ' '.join(rng.choice(WORDS) for _ in range(20))
+            director = f'Director {rng.randrange(number_of_directors)}'
+            actors = ', '.join(f'Actor {i}' for i in rng.sample(range(number_of_actors), 4))
+            year = rng.randint(1950, 2020)
+            writer.writerow([rank, title, genres, description, director, actors, year, rng.randint(80, 180),
+                             round(rng.uniform(1, 10), 1), rng.randint(100, 1000000), '', ''])
+
+
+def write_users_csv(data_path: str, number_of_users: int):
+    with open(os.path.join(data_path, 'users.csv'), 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['id', 'username', 'password'])
+        for user_id in range(1, number_of_users + 1):
+            writer.writerow([user_id, f'user{user_id}', f'Password{user_id}'])
+
+
+def write_comments_csv(data_path: str, number_of_comments: int, number_of_users: int, number_of_movies: int,
+                       seed: int = 235):
+    rng = random.Random(seed)
+    with open(os.path.join(data_path, 'comments.csv'), 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['id', 'author-id', 'article-id', 'comment-text', 'timestamp'])
+        for comment_id in range(1, number_of_comments + 1):
+            writer.writerow([comment_id, rng.randint(1, number_of_users), rng.randint(1, number_of_movies),
+                             ' '.join(rng.choice(WORDS) for _ in range(8)), '2020-02-28 14:31:26'])
+
+
+def write_dataset(data_path: str, number_of_movies: int, number_of_users: int = 2, number_of_comments: int = 2):
+    os.makedirs(data_path, exist_ok=True)
+    write_movies_csv(data_path, number_of_movies)
+    write_users_csv(data_path, number_of_users)
+    write_comments_csv(data_path, number_of_comments, number_of_users, number_of_movies)
@@ -0,0 +1,31 @@
+"""Username lookup latency in MemoryRepository from 1k to 1M users."""
+import random
+import timeit
+
+from Movie.adapters.memory_repository import MemoryRepository
+from Movie.domain.domain_model import User
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+LOOKUPS = 10_000
+
+
+def build_repo(number_of_users: int, case_insensitive: bool):
+    repo = MemoryRepository(case_insensitive_usernames=case_insensitive)
+    for i in range(number_of_users):
+        repo.add_user(User(f'User{i}', 'hash'))
+    return repo
+
+
+def main():
+    print(f'{"users":>10} {"mode":>18} {"ns/lookup":>10}')
+    for size in SIZES:
+        for case_insensitive in (False, True):
+            repo = build_repo(size, case_insensitive)
+            names = [f'User{random.randrange(size)}' for _ in range(LOOKUPS)]
+            seconds = timeit.timeit(lambda: [repo.get_user(name) for name in names], number=5)
+            mode = 'case-insensitive' if case_insensitive else 'case-sensitive'
+            print(f'{size:>10} {mode:>18} {seconds / (5 * LOOKUPS) * 1e9:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
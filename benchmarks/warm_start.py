@@ -0,0 +1,42 @@
+"""MemoryRepository startup time: populating from the CSV files versus reading a snapshot.
+
+Usage: python -m benchmarks.warm_start [number_of_movies] [number_of_users]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from Movie.adapters import snapshot
+from Movie.adapters.memory_repository import MemoryRepository, populate
+
+from benchmarks.synthetic import write_dataset
+
+
+def timed(label: str, function, *args):
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<30} {elapsed:>8.2f} s')
+    return elapsed
+
+
+def main():
+    number_of_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    number_of_users = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as data_path:
+        write_dataset(data_path, number_of_movies, number_of_users, number_of_movies // 10)
+        snapshot_path = os.path.join(data_path, 'repository.snapshot')
+
+        print(f'{number_of_movies} movies, {number_of_users} users, {number_of_movies // 10} comments')
+        repo = MemoryRepository()
+        from_csv = timed('populate from CSV', populate, data_path, repo)
+        timed('write snapshot', snapshot.write_snapshot, repo, snapshot_path)
+        print(f'{"snapshot size":<30} {os.path.getsize(snapshot_path) / 2 ** 20:>8.1f} MiB')
+        from_snapshot = timed('read snapshot', snapshot.read_snapshot, snapshot_path, MemoryRepository())
+        print(f'{"speed-up":<30} {from_csv / from_snapshot:>8.1f} x')
+
+
+if __name__ == '__main__':
+    main()
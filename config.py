@@ -20,3 +20,24 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     REPOSITORY = environ.get('REPOSITORY')
+
+    # Treat usernames that differ only by case as the same user.
+    CASE_INSENSITIVE_USERNAMES = environ.get('CASE_INSENSITIVE_USERNAMES') == 'True'
+
+    # Snapshot of the populated MemoryRepository, written by `flask write-snapshot` and read at startup.
+    SNAPSHOT_PATH = environ.get('SNAPSHOT_PATH')
+
+    # Catalog file mapped by every worker when REPOSITORY is shared; built by `flask build-catalog` or at startup.
+    SHARED_CATALOG_PATH = environ.get('SHARED_CATALOG_PATH')
+
+    # Seconds for which the same Editor's picks are shown in the sidebar.
+    EDITORS_PICKS_ROTATION_SECONDS = environ.get('EDITORS_PICKS_ROTATION_SECONDS', 300)
+
+    # Most rendered template fragments, such as the sidebar, kept across requests.
+    FRAGMENT_CACHE_SIZE = environ.get('FRAGMENT_CACHE_SIZE', 256)
+
+    # Cache-Control of the browse pages served to anonymous users, which also answer conditional GETs with 304.
+    BROWSE_CACHE_CONTROL = environ.get('BROWSE_CACHE_CONTROL', 'public, max-age=60')
+
+    # Most pages served to anonymous users kept across requests.
+    PAGE_CACHE_SIZE = environ.get('PAGE_CACHE_SIZE', 512)
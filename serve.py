@@ -0,0 +1,22 @@
+"""Production entry point: a pre-forking server whose workers share one populated repository."""
+import argparse
+
+from Movie import create_app
+from Movie.prefork import PreforkServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='requests after which a worker is replaced (default: 0, never)')
+    args = parser.parse_args()
+
+    server = PreforkServer(create_app, args.host, args.port, args.workers, args.max_requests)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
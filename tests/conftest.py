@@ -5,26 +5,36 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, clear_mappers
 
 from Movie import create_app
-from Movie.adapters import memory_repository, database_repository
+from Movie.adapters import memory_repository, database_repository, columnar_repository
 from Movie.adapters.orm import metadata, map_model_to_tables
 from Movie.adapters.memory_repository import MemoryRepository
+from Movie.adapters.columnar_repository import ColumnarRepository
 
 
 #TEST_DATA_PATH = 'C:\Users\myn83\Desktop\CS235A2\tests\data\database'
 #TODO: You have to adapt these paths to your file structure
-TEST_DATA_PATH_MEMORY = os.path.join('A:', os.sep, 'Movie', 'tests', 'data', 'memory')
-TEST_DATA_PATH_DATABASE = os.path.join('A:', os.sep, 'Movie', 'tests', 'data','database')
+TEST_DATA_PATH_MEMORY = os.path.join(os.path.dirname(__file__), 'data', 'memory')
+TEST_DATA_PATH_DATABASE = os.path.join(os.path.dirname(__file__), 'data', 'database')
 
 
 TEST_DATABASE_URI_IN_MEMORY = 'sqlite://'
 TEST_DATABASE_URI_FILE = 'sqlite:///covid-19-test.db'
 
-@pytest.fixture
-def in_memory_repo():
-    repo = MemoryRepository()
-    memory_repository.populate(TEST_DATA_PATH_MEMORY, repo)
+@pytest.fixture(params=['memory', 'columnar'])
+def in_memory_repo(request):
+    # Both in-memory repository implementations honour the same contract.
+    if request.param == 'columnar':
+        repo = ColumnarRepository()
+        columnar_repository.populate(TEST_DATA_PATH_MEMORY, repo)
+    else:
+        repo = MemoryRepository()
+        memory_repository.populate(TEST_DATA_PATH_MEMORY, repo)
     return repo
 
+@pytest.fixture
+def memory_data_path():
+    return TEST_DATA_PATH_MEMORY
+
 @pytest.fixture
 def database_engine():
     engine = create_engine(TEST_DATABASE_URI_FILE)
@@ -40,6 +50,8 @@ def database_engine():
 
 @pytest.fixture
 def empty_session():
+    # Clear mappers left by a fixture whose setup failed before it could tear down.
+    clear_mappers()
     engine = create_engine(TEST_DATABASE_URI_IN_MEMORY)
     metadata.create_all(engine)
     for table in reversed(metadata.sorted_tables):
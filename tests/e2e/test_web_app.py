@@ -1,6 +1,26 @@
+import csv
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import urllib.request
+
 import pytest
 
 from flask import session
+from jinja2 import Environment
+
+from Movie import create_app
+from Movie.fragment_cache import FragmentCacheExtension
+from Movie.news import page_cache
+import Movie.adapters.repository as repo
+import Movie.utilities.utilities as utilities
+from Movie.domain.domain_model import Genre
+from Movie.prefork import PreforkServer
+from Movie.utilities.editors_picks import EditorsPicks
 
 
 def test_register(client):
@@ -143,3 +163,325 @@ def test_articles_with_tag(client):
     assert b'Articles tagged by Health' in response.data
     assert b'Coronavirus: First case of virus in New Zealand' in response.data
     assert b'Covid 19 coronavirus: US deaths double in two days, Trump says quarantine not necessary' in response.data
+
+
+def test_movies_by_year(client):
+    response = client.get('/articles_by_date?date=2014')
+    assert response.status_code == 200
+
+    assert b'Movies released in 2014' in response.data
+    assert b'Guardians of the Galaxy' in response.data
+
+    # Check that the navigation buttons link to the neighbouring years.
+    assert b'/articles_by_date?date=2012' in response.data
+    assert b'/articles_by_date?date=2016' in response.data
+
+
+def test_movies_by_a_malformed_year_start_at_the_first_year(client):
+    response = client.get('/articles_by_date?date=abc')
+    assert response.status_code == 200
+    assert b'Movies released in ' in response.data
+    assert response.data == client.get('/articles_by_date').data
+
+
+def test_movies_by_actor(client):
+    response = client.get('/articles_by_actor?actor=Vin Diesel')
+    assert response.status_code == 200
+
+    assert b'Articles acted by Vin Diesel' in response.data
+    assert b'Guardians of the Galaxy' in response.data
+
+
+def test_search(client):
+    response = client.get('/search?q=galaxy')
+    assert response.status_code == 200
+
+    assert b'Search results for galaxy' in response.data
+    assert b'Guardians of the Galaxy' in response.data
+
+    # A negative cursor starts at the first result.
+    response = client.get('/search?q=galaxy&cursor=-5')
+    assert response.status_code == 200
+    assert b'Guardians of the Galaxy' in response.data
+
+
+def test_prefork_server_recycles_workers_and_stops(memory_data_path):
+    def app_factory():
+        return create_app({'TESTING': True, 'REPOSITORY': 'memory', 'TEST_DATA_PATH': memory_data_path,
+                           'WTF_CSRF_ENABLED': False})
+
+    server = PreforkServer(app_factory, port=0, workers=2, max_requests=2, graceful_timeout=5)
+    port = server.address[1]
+    master = multiprocessing.get_context('fork').Process(target=server.serve_forever)
+    master.start()
+
+    # Six requests outlast the first two workers, so some of them are served by their replacements.
+    bodies = list()
+    deadline = time.monotonic() + 30
+    while len(bodies) < 6 and time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://localhost:{port}/articles_by_date?date=2014', timeout=5) as response:
+                bodies.append(response.read())
+        except OSError:
+            time.sleep(0.2)
+
+    os.kill(master.pid, signal.SIGTERM)
+    master.join(10)
+
+    assert len(bodies) == 6
+    assert all(b'Guardians of the Galaxy' in body for body in bodies)
+    assert master.exitcode == 0
+
+
+def test_genre_pages_are_served_while_reviews_are_posted_from_other_threads(client):
+    app = client.application
+    errors = list()
+    reviews_per_writer = 20
+    number_of_reviews = len(repo.repo_instance.get_reviews())
+
+    def read_genre_pages():
+        reader = app.test_client()
+        try:
+            for _ in range(40):
+                response = reader.get('/articles_by_genre?tag=Action&view_comments_for=1')
+                assert response.status_code == 200
+                assert b'Guardians of the Galaxy' in response.data
+        except Exception as exception:
+            errors.append(exception)
+
+    def post_reviews(writer_id):
+        writer = app.test_client()
+        try:
+            writer.post('/authentication/login', data={'username': 'thorke', 'password': 'cLQ^C#oFXloS'})
+            for index in range(reviews_per_writer):
+                response = writer.post('/review', data={'comment': f'Review {index} by writer {writer_id}',
+                                                         'article_id': 1})
+                assert response.status_code == 302
+        except Exception as exception:
+            errors.append(exception)
+
+    # Switch threads far more often than usual, so that reads and writes interleave inside the repository.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=read_genre_pages) for _ in range(4)]
+        threads += [threading.Thread(target=post_reviews, args=(writer_id,)) for writer_id in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert errors == []
+    assert len(repo.repo_instance.get_reviews()) == number_of_reviews + 2 * reviews_per_writer
+
+
+def test_editors_picks_rotate_once_per_period(client):
+    app = client.application
+    picks = app.extensions['editors_picks']
+
+    first_picks = picks.get(3, now=0)
+    assert len(first_picks) == 3
+    assert picks.get(3, now=299) is first_picks
+
+    # Picks are drawn afresh each period, but the same in every process.
+    picks.refresh(now=299)
+    assert picks.get(3, now=300) == EditorsPicks(app, 300).get(3, now=300)
+
+
+def test_editors_picks_link_under_the_script_root_of_the_request(client):
+    response = client.get('/', base_url='http://localhost/movies')
+    assert response.status_code == 200
+    assert b'href="/movies/articles_by_date?date=' in response.data
+
+    response = client.get('/')
+    assert b'href="/articles_by_date?date=' in response.data
+
+
+def test_actor_directory(client):
+    response = client.get('/actors?letter=C')
+    assert response.status_code == 200
+    assert b'Chris Pratt' in response.data
+    assert b'/articles_by_actor?actor=Chris+Pratt' in response.data
+    assert b'Vin Diesel' not in response.data
+
+    # Browsing by actor without naming one leads to the directory.
+    response = client.get('/articles_by_actor')
+    assert response.headers['Location'] == 'http://localhost/actors'
+
+
+def test_navigation_maps_are_rebuilt_when_a_genre_is_added(client):
+    with client.application.test_request_context():
+        tag_urls = utilities.get_tags_and_urls()
+        assert utilities.get_tags_and_urls() is tag_urls
+
+        repo.repo_instance.add_genre(Genre('Western'))
+        assert utilities.get_tags_and_urls()['Western'] == '/articles_by_genre?tag=Western'
+
+
+def test_layout_fragments_are_cached_until_their_versions_change(client):
+    fragment_cache = client.application.jinja_env.fragment_cache
+
+    client.get('/')
+    client.get('/authentication/login')
+    stats = fragment_cache.stats()
+    assert stats['genre-navigation']['hits'] == 1
+    assert stats['genre-navigation']['misses'] == 1
+    assert stats['genre-navigation']['render_seconds'] > 0
+    assert stats['sidebar']['hits'] >= 1
+
+    repo.repo_instance.add_genre(Genre('Western'))
+    response = client.get('/')
+    assert b'/articles_by_genre?tag=Western' in response.data
+    assert fragment_cache.stats()['genre-navigation']['misses'] == 2
+
+
+def test_fragment_cache_tag():
+    environment = Environment(extensions=[FragmentCacheExtension])
+    environment.fragment_cache.maxsize = 1
+    template = environment.from_string("{% cache 'greeting', version %}Hello {{ name }}{% endcache %}")
+
+    assert template.render(version=1, name='Ann') == 'Hello Ann'
+    assert template.render(version=1, name='Bob') == 'Hello Ann'
+    assert template.render(version=2, name='Bob') == 'Hello Bob'
+    # Without a version the fragment isn't cached.
+    assert template.render(name='Cat') == 'Hello Cat'
+    assert environment.fragment_cache.evictions == 1
+    assert environment.fragment_cache.stats()['greeting']['hits'] == 1
+
+
+def test_browse_pages_answer_conditional_gets_until_a_review_changes_them(client, auth):
+    client.application.config['BROWSE_CACHE_CONTROL'] = 'public, max-age=30'
+    action = client.get('/articles_by_genre?tag=Action')
+    mystery = client.get('/articles_by_genre?tag=Mystery')
+    assert action.headers['Cache-Control'] == 'public, max-age=30'
+    assert 'Cookie' in action.headers['Vary']
+
+    response = client.get('/articles_by_genre?tag=Action', headers={'If-None-Match': action.headers['ETag']})
+    assert response.status_code == 304
+    assert response.data == b''
+    response = client.get('/articles_by_genre?tag=Action',
+                          headers={'If-Modified-Since': action.headers['Last-Modified']})
+    assert response.status_code == 304
+
+    # A review of Guardians of the Galaxy changes the Action page, but not the Mystery page.
+    reviewer = client.application.test_client()
+    reviewer.post('/authentication/login', data={'username': 'thorke', 'password': 'cLQ^C#oFXloS'})
+    reviewer.post('/review', data={'comment': 'Worth watching twice', 'article_id': 1})
+
+    response = client.get('/articles_by_genre?tag=Action&view_comments_for=1',
+                          headers={'If-None-Match': action.headers['ETag']})
+    assert response.status_code == 200
+    assert b'Worth watching twice' in response.data
+    response = client.get('/articles_by_genre?tag=Mystery', headers={'If-None-Match': mystery.headers['ETag']})
+    assert response.status_code == 304
+
+    # Pages of logged-in users greet them by name, so aren't conditional.
+    auth.login()
+    response = client.get('/articles_by_genre?tag=Mystery', headers={'If-None-Match': mystery.headers['ETag']})
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_browse_page_etags_are_the_same_in_every_app_loading_the_same_data(client):
+    etag = client.get('/articles_by_genre?tag=Action').headers['ETag']
+
+    # Another worker or replica, started later, with its own repository.
+    time.sleep(0.01)
+    replica = create_app(dict(client.application.config))
+    assert replica.test_client().get('/articles_by_genre?tag=Action').headers['ETag'] == etag
+
+
+def test_anonymous_pages_are_cached_until_a_review_of_one_of_their_movies(client, auth):
+    cache = page_cache.cache_for(repo.repo_instance)
+    client.get('/articles_by_genre?tag=Action')
+    client.get('/articles_by_genre?tag=Mystery')
+    client.get('/articles_by_genre?tag=Action')
+    assert cache.stats()['hits'] == 1
+
+    reviewer = client.application.test_client()
+    reviewer.post('/authentication/login', data={'username': 'thorke', 'password': 'cLQ^C#oFXloS'})
+    reviewer.post('/review', data={'comment': 'Worth watching twice', 'article_id': 1})
+    assert cache.stats()['invalidations'] == 1
+
+    response = client.get('/articles_by_genre?view_comments_for=1&tag=Action')
+    assert b'Worth watching twice' in response.data
+    client.get('/articles_by_genre?tag=Mystery')
+    assert cache.stats()['hits'] == 2
+
+    # Logged-in users see their name on every page, so get pages of their own.
+    auth.login()
+    response = client.get('/articles_by_genre?tag=Mystery')
+    assert b'Hello, thorke' in response.data
+    assert cache.stats()['hits'] == 2
+
+
+def test_genre_pages_are_paged_by_rank(client):
+    response = client.get('/articles_by_genre?tag=Adventure')
+    assert b'Guardians of the Galaxy' in response.data and b'Prometheus' in response.data
+    assert b'/articles_by_genre?tag=Adventure&amp;after=2' in response.data
+    assert b'/articles_by_genre?tag=Adventure&amp;before=end' in response.data
+
+    response = client.get('/articles_by_genre?tag=Adventure&after=2')
+    assert b'Suicide Squad' in response.data
+    # The sidebar's Editor's picks can show any movie, so check the page's own links.
+    assert b'view_comments_for=2' not in response.data
+    assert b'/articles_by_genre?tag=Adventure&amp;before=5' in response.data
+
+    response = client.get('/articles_by_genre?tag=Adventure&before=end')
+    assert b'Prometheus' in response.data and b'Suicide Squad' in response.data
+
+    # A malformed cursor is ignored, as if there were none.
+    for cursor in ('before=xyz', 'after=xyz'):
+        response = client.get(f'/articles_by_genre?tag=Adventure&{cursor}')
+        assert response.status_code == 200
+        assert b'/articles_by_genre?tag=Adventure&amp;after=2' in response.data
+
+
+def test_api_fetches_selected_fields_of_many_movies(client):
+    response = client.get('/api/v1/movies?ranks=2,1,999&fields=id,title,directors,comment_count')
+    assert response.status_code == 200
+    assert response.get_json() == {'movies': [
+        {'id': 2, 'title': 'Prometheus', 'directors': ['Ridley Scott'], 'comment_count': 0},
+        {'id': 1, 'title': 'Guardians of the Galaxy', 'directors': ['James Gunn'], 'comment_count': 2}
+    ]}
+
+    response = client.get('/api/v1/movies?ranks=1&fields=id,budget')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Unknown fields: budget'}
+
+
+def test_api_looks_up_and_pages_through_the_movies_of_a_genre(client):
+    assert client.get('/api/v1/actors/Vin Diesel/ranks').get_json() == {'name': 'Vin Diesel', 'ranks': [1]}
+
+    page = client.get('/api/v1/genres/Adventure/movies?limit=2&fields=id&total=true').get_json()
+    assert page == {'movies': [{'id': 1}, {'id': 2}], 'next_cursor': 2, 'previous_cursor': None, 'total': 3}
+
+    page = client.get(f'/api/v1/genres/Adventure/movies?limit=2&fields=id&after={page["next_cursor"]}').get_json()
+    assert page['movies'] == [{'id': 5}]
+    assert page['next_cursor'] is None
+
+    page = client.get('/api/v1/genres/Adventure/movies?limit=2&fields=id&before=end').get_json()
+    assert page['movies'] == [{'id': 2}, {'id': 5}]
+    assert page['previous_cursor'] == 2
+    assert client.get('/api/v1/genres/Adventure/movies?before=xyz').status_code == 400
+
+
+def test_catalog_and_reviews_are_exported_in_streamed_chunks(client):
+    response = client.get('/api/v1/export/movies.ndjson')
+    assert response.is_streamed
+    assert response.headers['Content-Disposition'] == 'attachment; filename=movies.ndjson'
+    movies = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert len(movies) == repo.repo_instance.get_number_of_movie()
+    assert {'rank': 2, 'title': 'Prometheus'}.items() <= [movie for movie in movies if movie['rank'] == 2][0].items()
+
+    response = client.get('/api/v1/export/reviews.csv')
+    rows = list(csv.reader(response.data.decode().splitlines()))
+    assert rows[0] == ['movie_rank', 'username', 'review', 'rating', 'timestamp']
+    assert rows[1][:3] == ['1', 'fmercury', 'Oh no, COVID-19 has hit New Zealand']
+    assert len(rows) == 3
+
+    result = client.application.test_cli_runner().invoke(args=['export', 'reviews', '--format', 'ndjson'])
+    assert result.exit_code == 0
+    assert len(result.output.splitlines()) == 2
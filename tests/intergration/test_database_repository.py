@@ -1,8 +1,9 @@
+import math
 from datetime import date, datetime
 
 import pytest
 
-from Movie.adapters.database_repository import SqlAlchemyRepository
+from Movie.adapters.database_repository import SqlAlchemyRepository, query_movie_ranks_page
 from Movie.domain.domain_model import User, Movie, Genre, Review, make_comment
 from Movie.adapters.repository import RepositoryException
 
@@ -160,6 +161,47 @@ def test_repository_returns_movie_ranks_for_existing_genre(session_factory):
 
     assert movie_ranks == [2]
 
+def test_movie_ranks_are_paged_through_with_keyset_queries(empty_session):
+    # Runs the queries of SqlAlchemyRepository.get_movie_ranks_page on its own rows, without the CSV data.
+    session = empty_session
+    actors = {1: 'Chris Pratt, Zoe Saldana', 2: 'Zoe Saldana', 3: 'Chris Pratts', 4: 'Chris Pratt', 5: 'Chris_Pratt',
+              6: 'Vin Diesel, Chris Pratt', 7: 'Chris Pratt'}
+    for rank, movie_actors in actors.items():
+        director = 'James Gunn' if rank < 3 else 'Ridley Scott'
+        session.execute('INSERT INTO movies (rank, year, title, director, genres, actors) '
+                        'VALUES (:rank, 2016, :title, :director, :genres, :actors)',
+                        {'rank': rank, 'title': f'Movie {rank}', 'director': director, 'genres': 'Action',
+                         'actors': movie_actors})
+    session.execute("INSERT INTO genres (id, name) VALUES (1, 'Action'), (2, 'Drama')")
+    for movie_genre, rank in enumerate([1, 3, 4, 6, 7], start=1):
+        session.execute('INSERT INTO movie_genres (id, movie_id, genre_id) VALUES (:id, :rank, 1)',
+                        {'id': movie_genre, 'rank': rank})
+
+    page = query_movie_ranks_page(session, 'genre', 'Action', 2, count_total=True)
+    assert page == ([1, 3], 3, None, 5)
+    page = query_movie_ranks_page(session, 'genre', 'Action', 2, after_rank=page.next_cursor)
+    assert page == ([4, 6], 6, 4, None)
+    page = query_movie_ranks_page(session, 'genre', 'Action', 2, after_rank=page.next_cursor)
+    assert page == ([7], None, 7, None)
+
+    # Back from the last page to the first.
+    page = query_movie_ranks_page(session, 'genre', 'Action', 2, before_rank=math.inf)
+    assert page == ([6, 7], None, 6, None)
+    page = query_movie_ranks_page(session, 'genre', 'Action', 2, before_rank=page.previous_cursor)
+    assert page == ([3, 4], 4, 3, None)
+    page = query_movie_ranks_page(session, 'genre', 'Action', 2, before_rank=page.previous_cursor)
+    assert page == ([1], 1, None, None)
+
+    # Actors match whole names, and LIKE wildcards in a name match only themselves.
+    page = query_movie_ranks_page(session, 'actor', 'Chris Pratt', 10, count_total=True)
+    assert page == ([1, 4, 6, 7], None, None, 4)
+    assert query_movie_ranks_page(session, 'actor', 'Chris_Pratt', 10).ranks == [5]
+    assert query_movie_ranks_page(session, 'director', 'James Gunn', 1, after_rank=1).ranks == [2]
+    assert query_movie_ranks_page(session, 'genre', 'Drama', 2, count_total=True) == ([], None, None, 0)
+    with pytest.raises(RepositoryException):
+        query_movie_ranks_page(session, 'year', '2016', 2)
+
+
 def test_repository_returns_an_empty_list_for_non_existent_genre(session_factory):
     repo = SqlAlchemyRepository(session_factory)
 
@@ -4,7 +4,9 @@ import datetime
 
 from sqlalchemy.exc import IntegrityError
 
-from Movie.domain.domain_model import User, Movie, Review, Genre, make_comment, make_genre_association
+from Movie.domain.domain_model import make_comment, make_genre_association
+# Sessions work with the mapped subclasses of the slotted domain classes.
+from Movie.adapters.orm import User, Movie, Review, Genre, persistent
 
 movie_year = 2012
 
@@ -165,7 +167,7 @@ def test_saving_of_reviews(empty_session):
     # Note: if the bidirectional links between the new Comment and the User and
     # Article objects hadn't been established in memory, they would exist following
     # committing the addition of the Comment to the database.
-    empty_session.add(review)
+    empty_session.add(persistent(review))
     empty_session.commit()
 
     rows = list(empty_session.execute('SELECT user_id, movie_id, review FROM reviews'))
@@ -238,4 +240,54 @@ def test_save_commented_movie(empty_session):
     # Check that the comments table has a new record that links to the articles and users
     # tables.
     rows = list(empty_session.execute('SELECT user_id, movie_id, review FROM reviews'))
-    assert rows == [(user_key, movie_key, review_text)]
\ No newline at end of file
+    assert rows == [(user_key, movie_key, review_text)]
+
+def test_domain_entities_are_copied_into_their_mapped_classes(empty_session):
+    from Movie.domain import domain_model
+
+    user = domain_model.User("Andrew", "111")
+    persistent_user = persistent(user)
+
+    assert type(persistent_user) is User
+    assert isinstance(persistent_user, domain_model.User)
+    assert persistent_user.user_name == "Andrew"
+    assert persistent(persistent_user) is persistent_user
+    assert empty_session.query(User).all() == []
+
+
+def test_related_domain_entities_are_copied_together(empty_session):
+    from Movie.domain import domain_model
+
+    movie = domain_model.Movie('Prometheus', 2012)
+    review = make_comment('Some comment text.', domain_model.User('Andrew', '111'), movie)
+    persistent_review = persistent(review)
+
+    assert type(persistent_review) is Review
+    assert type(persistent_review.user) is User and type(persistent_review.movie) is Movie
+    assert persistent_review.user.reviews[0] is persistent_review
+    assert persistent_review.movie.review[0] is persistent_review
+
+
+def test_users_and_reviews_are_persisted_and_reloaded(empty_session):
+    from Movie.domain import domain_model
+
+    empty_session.execute("INSERT INTO movies (rank, year, title, director, genres, actors) VALUES "
+                          "(1, 2012, 'Prometheus', 'Ridley Scott', 'Sci-Fi', 'Noomi Rapace')")
+    user = persistent(domain_model.User('Andrew', 'pw'))
+    empty_session.add(user)
+    movie = empty_session.query(Movie).one()
+    # A Review linked to a persistent User and Movie is built of the mapped class, as SqlAlchemyRepository does.
+    review = Review(user, movie, 'Some comment text.', 5)
+    user.add_review(review)
+    movie.add_review(review)
+    empty_session.commit()
+    empty_session.expunge_all()
+
+    user = empty_session.query(User).one()
+    assert (user.user_name, user.password, user.watched_movies) == ('Andrew', 'pw', [])
+    review = user.reviews[0]
+    assert len(user.reviews) == 1
+    assert review.review_text == 'Some comment text.'
+    assert review.user is user
+    assert review.movie.id == 1 and review.movie.title == 'Prometheus' and review.movie.release_year == 2012
+    assert review.movie.review == [review]
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from Movie.adapters.columnar_repository import ColumnarRepository
+from Movie.domain.domain_model import Movie
+
+
+def movie_row(rank: int, title: str, year: int = 2016):
+    return rank, title, 'Drama', f'About {title}', 'Denis Villeneuve', 'Amy Adams', year, 116
+
+
+def test_repository_indexes_rows_bulk_loaded_out_of_rank_order():
+    repo = ColumnarRepository()
+    repo.add_movie_rows([movie_row(3, 'Sicario', 2015), movie_row(1, 'Arrival'), movie_row(2, 'Prisoners', 2013)])
+    repo.add_movie_rows([movie_row(5, 'Dune', 2021), movie_row(4, 'Enemy', 2013)])
+
+    assert [repo.get_movie(rank).title for rank in range(1, 6)] == ['Arrival', 'Prisoners', 'Sicario', 'Enemy', 'Dune']
+    assert [movie.title for movie in repo.get_movie_by_year(2013)] == ['Enemy', 'Prisoners']
+    assert repo.get_release_years() == [2013, 2015, 2016, 2021]
+    assert repo.get_first_movie().title == 'Arrival'
+    assert repo.get_last_movie().title == 'Sicario'
+    assert repo.get_movie_ranks_for_genre('Drama') == [1, 2, 3, 4, 5]
+
+
+def test_repository_replaces_a_movie_of_the_same_rank():
+    repo = ColumnarRepository()
+    repo.add_movie_rows([movie_row(1, 'Arrival'), movie_row(2, 'Prisoners', 2013)])
+
+    repo.add_movie(Movie('Dune', 2021), 2, 'About Dune')
+    repo.add_movie_rows([movie_row(3, 'Sicario', 2015), movie_row(1, 'Enemy', 2013), movie_row(3, 'Incendies', 2010)])
+
+    # Nothing of the replaced movies is left in the repository's indexes.
+    assert repo.get_number_of_movie() == 3
+    assert [repo.get_movie(rank).title for rank in (1, 2, 3)] == ['Enemy', 'Dune', 'Incendies']
+    assert repo.get_release_years() == [2010, 2013, 2021]
+    assert [movie.title for movie in repo.get_movie_by_year(2013)] == ['Enemy']
+    assert repo.search_movie_ranks('prisoners') == []
+    assert repo.search_movie_ranks('sicario') == []
+    assert repo.get_first_movie().title == 'Dune'
+    assert repo.get_last_movie().title == 'Incendies'
+    assert repo.get_movie_ranks_for_genre('Drama') == [1, 3]
+    assert [movie.id for movie in repo.iter_movies()] == [1, 2, 3]
+
+
+def test_readers_materializing_the_same_movie_at_once_get_the_same_movie():
+    repo = ColumnarRepository()
+    repo.add_movie_rows([movie_row(1, 'Arrival')])
+    materialize = repo._materialize
+
+    def slow_materialize(row):
+        # Long enough for the other reader to look for the Movie before it is stored.
+        time.sleep(0.1)
+        return materialize(row)
+
+    repo._materialize = slow_materialize
+    movies = list()
+    readers = [threading.Thread(target=lambda: movies.append(repo.get_movie(1))) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+
+    assert movies[0] is movies[1] is repo.get_movie(1)
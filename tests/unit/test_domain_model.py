@@ -1,7 +1,11 @@
+import os
+import sys
+import weakref
+
 from datetime import date
 
 from Movie.domain.domain_model import User, Actor, Genre, Review, Movie, Director, MovieFileCSVReader, ModelException, \
-    make_comment, make_genre_association
+    make_comment, make_genre_association, EntityRegistry, Association
 
 import pytest
 
@@ -101,3 +105,62 @@ def test_make_tag_associations_with_article_already_tagged(movie, genre):
 
     with pytest.raises(ModelException):
         make_genre_association(movie, genre)
+
+
+def test_domain_objects_are_slotted(movie, user, genre):
+    comment = make_comment('COVID-19 in the USA!', user, movie)
+
+    for entity in (movie, user, genre, comment, Actor('Chris Pratt'), Director('James Gunn')):
+        # No per-instance __dict__, but entities can still be weakly referenced (e.g. by caches and the ORM).
+        assert not hasattr(entity, '__dict__')
+        assert weakref.ref(entity)() is entity
+
+
+def test_genre_association_keeps_order_and_membership(genre):
+    movies = [Movie(f'Movie {i}', 2000 + i) for i in range(5)]
+    for movie in reversed(movies):
+        make_genre_association(movie, genre)
+
+    assert list(genre.genre_movie) == list(reversed(movies))
+    assert genre.number_of_genre_movie == 5
+
+    # Membership goes by title and release year, like Movie equality.
+    assert genre.is_applied_to(Movie('Movie 3', 2003))
+    assert not genre.is_applied_to(Movie('Movie 3', 2004))
+
+
+def test_remakes_hash_apart():
+    assert hash(Movie('Dune', 1984)) == hash(Movie('Dune', 1984))
+    assert hash(Movie('Dune', 1984)) != hash(Movie('Dune', 2021))
+
+
+def test_association_indexes_in_order_after_changes():
+    movies = [Movie(f'Movie {i}', 2000 + i) for i in range(4)]
+    association = Association(movies[:3])
+
+    assert [association[index] for index in range(len(association))] == movies[:3]
+    association.append(movies[3])
+    association.remove(movies[0])
+    assert [association[index] for index in range(len(association))] == movies[1:]
+    assert association[-1] is movies[3]
+
+
+def test_registry_hands_out_one_entity_per_normalized_name():
+    registry = EntityRegistry()
+
+    actor = registry.actor(' Vin  Diesel')
+
+    assert registry.actor('Vin Diesel') is actor
+    assert actor.actor_full_name == 'Vin Diesel'
+    assert actor.actor_full_name is sys.intern('Vin Diesel')
+    assert registry.genre('Sci-Fi') is registry.genre('Sci-Fi ')
+    assert registry.director('James Gunn') is not registry.director('Ridley Scott')
+    assert registry.actors == [actor]
+
+
+def test_csv_reader_movies_share_entities(memory_data_path):
+    reader = MovieFileCSVReader(os.path.join(memory_data_path, 'news_articles.csv'))
+    reader.read_csv_file()
+
+    actors = [actor for movie in reader.dataset_of_movies for actor in movie.actors]
+    assert len({id(actor) for actor in actors}) == len(reader.dataset_of_actors)
@@ -0,0 +1,40 @@
+import csv
+import os
+
+from Movie.adapters import ingestion
+
+
+def test_movie_file_is_parsed_the_same_in_chunks_across_processes(memory_data_path):
+    filename = os.path.join(memory_data_path, 'news_articles.csv')
+    stats = ingestion.IngestionStats()
+
+    records = list(ingestion.read_movie_records(filename, processes=1))
+    chunked_records = list(ingestion.read_movie_records(filename, processes=2, chunk_bytes=256, stats=stats))
+
+    assert len(ingestion.chunk_ranges(filename, 256)) > 1
+    assert chunked_records == records
+    assert stats.rows == len(records)
+    assert records[0].rank == 1
+    assert records[0].genres == ['Action', 'Adventure', 'Sci-Fi']
+    assert records[0].actors == ['Chris Pratt', 'Vin Diesel', 'Bradley Cooper', 'Zoe Saldana']
+
+
+def test_rows_with_quoted_line_breaks_are_kept_whole_across_chunks(tmp_path):
+    filename = str(tmp_path / 'news_articles.csv')
+    with open(filename, 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['Rank', 'Title', 'Genre', 'Description', 'Director', 'Actors', 'Year', 'Runtime (Minutes)'])
+        for rank in range(1, 21):
+            # Every other description spans several lines, with escaped quotes on some of them.
+            description = f'Line one of {rank}.\nLine "two"\n\nand three.' if rank % 2 else f'Plain {rank}.'
+            writer.writerow([rank, f'Movie {rank}', 'Drama,Comedy', description, 'Ann Director', 'Al Actor', 2000, 90])
+
+    whole = list(ingestion.read_movie_records(filename, processes=1, chunk_bytes=2 ** 20))
+    for chunk_bytes in range(1, 120, 7):
+        ranges = ingestion.chunk_ranges(filename, chunk_bytes)
+        assert len(ranges) > 1
+        records = [record for start, end in ranges for record in ingestion.parse_chunk(filename, start, end)]
+        assert records == whole
+
+    assert [record.rank for record in whole] == list(range(1, 21))
+    assert whole[0].description == 'Line one of 1.\nLine "two"\n\nand three.'
@@ -0,0 +1,33 @@
+import threading
+
+import pytest
+
+from Movie.adapters.locking import ReaderWriterLock
+
+
+def test_reader_writer_lock_lets_readers_share_and_makes_writers_wait():
+    lock = ReaderWriterLock()
+    events = list()
+
+    def write():
+        with lock.write():
+            events.append('write')
+
+    with lock.read():
+        writer = threading.Thread(target=write)
+        writer.start()
+        writer.join(0.2)
+        # The writer waits for the reader, and a thread already reading can read again.
+        assert writer.is_alive()
+        with lock.read():
+            events.append('read')
+    writer.join()
+
+    assert events == ['read', 'write']
+    with lock.write():
+        with lock.read():
+            events.append('read inside write')
+    with pytest.raises(RuntimeError):
+        with lock.read():
+            with lock.write():
+                pass
@@ -1,10 +1,15 @@
+import math
 from datetime import date, datetime
 from typing import List
 
 import pytest
 
 from Movie.domain.domain_model import User, Movie, Genre, Review, make_comment
-from Movie.adapters.repository import RepositoryException
+from Movie.adapters.repository import RankPage, RepositoryException
+
+from Movie.adapters import memory_repository
+from Movie.adapters.columnar_repository import ColumnarRepository
+from Movie.adapters.memory_repository import MemoryRepository
 
 
 def test_repository_can_add_a_user(in_memory_repo):
@@ -25,6 +30,20 @@ def test_repository_does_not_retrieve_a_non_existent_user(in_memory_repo):
     assert user is None
 
 
+@pytest.mark.parametrize('repository_class', [MemoryRepository, ColumnarRepository])
+def test_repository_can_retrieve_a_user_case_insensitively(repository_class):
+    repo = repository_class(case_insensitive_usernames=True)
+    user = User('Dave', '123456789')
+    repo.add_user(user)
+
+    assert repo.get_user('dave') is user
+    assert repo.get_user('DAVE') is user
+
+
+def test_repository_username_lookup_is_case_sensitive_by_default(in_memory_repo):
+    assert in_memory_repo.get_user('FMERCURY') is None
+
+
 def test_repository_can_retrieve_article_count(in_memory_repo):
     number_of_articles = in_memory_repo.get_number_of_movie()
 
@@ -41,6 +60,21 @@ def test_repository_can_add_article(in_memory_repo):
     assert in_memory_repo.get_movie(3) is article
 
 
+def test_repository_can_bulk_add_articles(in_memory_repo):
+    articles = [Movie('Zootopia', 2016), Movie('Arrival', 2016)]
+    for rank, article in enumerate(articles, start=6):
+        article.set_id(rank)
+        article.description = 'blahblah'
+
+    in_memory_repo.add_movies(articles)
+
+    assert in_memory_repo.get_number_of_movie() == 7
+    assert in_memory_repo.get_movie(7) is articles[1]
+    assert in_memory_repo.get_first_movie().title == 'Arrival'
+    assert in_memory_repo.get_last_movie().title == 'Zootopia'
+    assert len(in_memory_repo.get_movie_by_year(2016)) == 5
+
+
 def test_repository_can_retrieve_article(in_memory_repo):
     article = in_memory_repo.get_movie(1)
 
@@ -72,6 +106,35 @@ def test_repository_can_retrieve_articles_by_date(in_memory_repo):
     assert len(articles) == 3
 
 
+def test_repository_does_not_retrieve_articles_for_a_year_without_articles(in_memory_repo):
+    articles = in_memory_repo.get_movie_by_year(2013)
+    assert len(articles) == 0
+
+
+def test_repository_can_retrieve_articles_by_year_range(in_memory_repo):
+    articles = in_memory_repo.get_movies_by_year_range(2013, 2016)
+
+    assert [article.release_year for article in articles] == [2014, 2016, 2016, 2016]
+
+
+def test_repository_can_get_release_years(in_memory_repo):
+    assert in_memory_repo.get_release_years() == [2012, 2014, 2016]
+
+
+def test_repository_can_get_years_of_previous_and_next_articles(in_memory_repo):
+    assert in_memory_repo.get_year_of_previous_movie(2014) == 2012
+    assert in_memory_repo.get_year_of_next_movie(2014) == 2016
+
+    # Years without articles still have neighbours.
+    assert in_memory_repo.get_year_of_previous_movie(2015) == 2014
+    assert in_memory_repo.get_year_of_next_movie(2013) == 2014
+
+
+def test_repository_returns_none_when_there_are_no_previous_or_next_years(in_memory_repo):
+    assert in_memory_repo.get_year_of_previous_movie(2012) is None
+    assert in_memory_repo.get_year_of_next_movie(2016) is None
+
+
 
 
 def test_repository_can_retrieve_tags(in_memory_repo):
@@ -136,12 +199,101 @@ def test_repository_returns_an_empty_list_for_non_existent_tag(in_memory_repo):
     assert len(article_ids) == 0
 
 
+def test_repository_pages_through_movie_ranks_from_a_cursor(in_memory_repo):
+    page = in_memory_repo.get_movie_ranks_page('genre', 'Adventure', 2, count_total=True)
+    assert page == RankPage([1, 2], 2, None, 3)
+
+    page = in_memory_repo.get_movie_ranks_page('genre', 'Adventure', 2, after_rank=page.next_cursor)
+    assert page == RankPage([5], None, 5, None)
+
+    page = in_memory_repo.get_movie_ranks_page('genre', 'Adventure', 2, before_rank=page.previous_cursor)
+    assert page == RankPage([1, 2], 2, None, None)
+    assert in_memory_repo.get_movie_ranks_page('genre', 'Adventure', 2, before_rank=math.inf).ranks == [2, 5]
+    assert in_memory_repo.get_movie_ranks_page('actor', 'Tom Hanks', 2, count_total=True) == RankPage([], None, None, 0)
+
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_page('year', 2014, 2)
+
+
+def test_repository_iterates_over_every_movie_and_comment_in_batches(in_memory_repo):
+    movies = list(in_memory_repo.iter_movies(batch_size=2))
+    assert len({movie.id for movie in movies}) == len(movies) == in_memory_repo.get_number_of_movie()
+
+    iterator = in_memory_repo.iter_reviews(batch_size=1)
+    next(iterator)
+    # The iterator holds no lock between batches, so the repository can change while it is consumed.
+    in_memory_repo.add_review(make_comment('Still worth it', in_memory_repo.get_user('thorke'), movies[0]))
+    assert len(list(iterator)) == 2
+
+
+@pytest.mark.parametrize('repository_class', [MemoryRepository, ColumnarRepository])
+def test_repository_iterates_over_movies_of_the_same_title_and_year_across_batches(repository_class):
+    repo = repository_class()
+    for rank in range(1, 6):
+        repo.add_movie(Movie('Dune', 2021), rank, f'Cut {rank}')
+
+    for batch_size in (1, 2, 3):
+        assert sorted(movie.id for movie in repo.iter_movies(batch_size=batch_size)) == [1, 2, 3, 4, 5]
+
+
+def test_repository_returns_movie_ranks_for_existing_actor(in_memory_repo):
+    assert in_memory_repo.get_movie_ranks_for_actor('Vin Diesel') == [1]
+
+
+def test_repository_returns_an_empty_list_for_non_existent_actor(in_memory_repo):
+    assert in_memory_repo.get_movie_ranks_for_actor('Tom Hanks') == []
+
+
+def test_repository_returns_movie_ranks_for_existing_director(in_memory_repo):
+    assert in_memory_repo.get_movie_ranks_for_director('Ridley Scott') == [2]
+
+
+def test_repository_indexes_movies_added_to_an_existing_genre(in_memory_repo):
+    article = Movie('Arrival', 2016)
+    article.add_genre(Genre('Adventure'))
+    in_memory_repo.add_movie(article, 6, 'blahblah')
+
+    assert in_memory_repo.get_movie_ranks_for_genre('Adventure') == [1, 2, 5, 6]
+
+
+def test_repository_indexes_movies_bulk_added_to_an_existing_genre(in_memory_repo):
+    article = Movie('Arrival', 2016)
+    article.set_id(6)
+    article.description = 'blahblah'
+    article.add_genre(Genre('Adventure'))
+    in_memory_repo.add_movies([article])
+
+    assert in_memory_repo.get_movie_ranks_for_genre('Adventure') == [1, 2, 5, 6]
+    assert in_memory_repo.get_movie_ranks_page('genre', 'Adventure', 2, after_rank=5).ranks == [6]
+
+
+def test_repository_can_search_articles(in_memory_repo):
+    # 'Galaxy' only appears in the title and description of article 1.
+    assert in_memory_repo.search_movie_ranks('galaxy') == [1]
+
+    # Articles matching more of the query rank first.
+    ranks = in_memory_repo.search_movie_ranks('guardians of the galaxy')
+    assert ranks[0] == 1
+    assert in_memory_repo.search_movie_ranks('guardians of the galaxy', limit=1) == [1]
+
+
+def test_repository_returns_an_empty_list_for_an_unmatched_search(in_memory_repo):
+    assert in_memory_repo.search_movie_ranks('coronavirus') == []
+
+
+def test_repository_indexes_added_articles_for_search(in_memory_repo):
+    article = Movie('Arrival', 2016)
+    in_memory_repo.add_movie(article, 6, 'A linguist works with the military to communicate with alien lifeforms.')
+
+    assert in_memory_repo.search_movie_ranks('linguist') == [6]
+
 
 def test_repository_can_add_a_tag(in_memory_repo):
     tag = Genre('Motoring')
     in_memory_repo.add_genre(tag)
 
     assert tag in in_memory_repo.get_genres()
+    assert in_memory_repo.get_movie_ranks_for_genre('Motoring') == []
 
 
 def test_repository_can_add_a_comment(in_memory_repo):
@@ -154,6 +306,53 @@ def test_repository_can_add_a_comment(in_memory_repo):
     assert comment in in_memory_repo.get_reviews()
 
 
+def test_repository_mutation_versions_grow_with_the_comments_on_their_movies(in_memory_repo):
+    action_version = in_memory_repo.get_mutation_version('genre', 'Action')
+    mystery_version = in_memory_repo.get_mutation_version('genre', 'Mystery')
+    version = in_memory_repo.get_mutation_version()
+
+    article = in_memory_repo.get_movie(2)
+    in_memory_repo.add_review(make_comment("Trump's onto it!", in_memory_repo.get_user('thorke'), article))
+
+    assert in_memory_repo.get_mutation_version() > version
+    assert in_memory_repo.get_mutation_version('genre', 'Mystery') > mystery_version
+    assert in_memory_repo.get_mutation_version('year', article.release_year) > version
+    assert in_memory_repo.get_mutation_version('genre', 'Action') == action_version
+    assert in_memory_repo.get_mutation_time('genre', 'Mystery') >= in_memory_repo.get_mutation_time('genre', 'Action')
+
+    in_memory_repo.add_genre(Genre('Motoring'))
+    assert in_memory_repo.get_mutation_version('genre', 'Action') > action_version
+
+
+@pytest.mark.parametrize('repository_class', [MemoryRepository, ColumnarRepository])
+def test_repositories_record_their_own_changes(repository_class):
+    repo = repository_class()
+    other_repo = repository_class()
+    assert repo.get_catalog_version() == 0
+
+    repo.add_genre(Genre('Western'))
+    assert repo.get_catalog_version() > 0
+    assert other_repo.get_catalog_version() == 0
+
+    # Versions are never handed out twice, even by different repositories.
+    other_repo.add_genre(Genre('Western'))
+    assert other_repo.get_catalog_version() > repo.get_catalog_version()
+
+
+def test_repository_mutation_digests_follow_the_comments_added(memory_data_path):
+    repos = [MemoryRepository(), MemoryRepository()]
+    for repo in repos:
+        memory_repository.populate(memory_data_path, repo)
+    assert repos[0].get_mutation_digest('genre', 'Mystery') == repos[1].get_mutation_digest('genre', 'Mystery')
+
+    for repo, text in zip(repos, ['Loved it', 'Hated it']):
+        article = repo.get_movie(2)
+        repo.add_review(make_comment(text, repo.get_user('thorke'), article))
+    assert repos[0].get_mutation_digest('genre', 'Mystery') != repos[1].get_mutation_digest('genre', 'Mystery')
+    assert repos[0].get_mutation_digest('genre', 'Action') == repos[1].get_mutation_digest('genre', 'Action')
+    assert repos[0].get_mutation_digest() != repos[1].get_mutation_digest()
+
+
 def test_repository_does_not_add_a_comment_without_a_user(in_memory_repo):
     article = in_memory_repo.get_movie(2)
     comment = Review(None, article, "Trump's onto it!",5)
@@ -176,6 +375,3 @@ def test_repository_does_not_add_a_comment_without_an_article_properly_attached(
 
 def test_repository_can_retrieve_comments(in_memory_repo):
     assert len(in_memory_repo.get_reviews()) == 2
-
-
-
@@ -0,0 +1,31 @@
+import os
+import shutil
+
+from werkzeug.security import check_password_hash
+
+from Movie.adapters import memory_repository, password_hashing
+from Movie.adapters.memory_repository import MemoryRepository
+
+
+def test_passwords_are_hashed_in_order_across_processes():
+    passwords = ['cLQ^C#oFXloS', 'mvNNbc1eLA$i', 'Password1', 'Password2', 'Password3']
+
+    password_hashes = list(password_hashing.hash_passwords(iter(passwords), processes=2, chunk_size=1))
+
+    assert len(password_hashes) == len(passwords)
+    for password, password_hash in zip(passwords, password_hashes):
+        assert check_password_hash(password_hash, password)
+
+
+def test_repository_loads_a_pre_hashed_users_file(memory_data_path, tmp_path):
+    data_path = str(tmp_path / 'data')
+    shutil.copytree(memory_data_path, data_path)
+    users_path = os.path.join(data_path, 'users.csv')
+    password_hashing.write_hashed_users_file(users_path, str(tmp_path / 'hashed_users.csv'), processes=1)
+    shutil.copy(str(tmp_path / 'hashed_users.csv'), users_path)
+    assert password_hashing.users_file_is_hashed(users_path)
+
+    repo = MemoryRepository()
+    memory_repository.populate(data_path, repo)
+
+    assert check_password_hash(repo.get_user('fmercury').password, 'mvNNbc1eLA$i')
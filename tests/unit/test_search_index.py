@@ -0,0 +1,71 @@
+import random
+
+from Movie.adapters.search_index import SearchIndex, tokenize
+
+
+def test_tokenize_keeps_accented_and_non_latin_letters():
+    assert tokenize('Amélie, Léon: The Professional') == ['amélie', 'léon', 'the', 'professional']
+    assert tokenize('STRASSE straße') == ['strasse', 'strasse']
+    assert tokenize('千と千尋の神隠し 2001') == ['千と千尋の神隠し', '2001']
+
+
+def test_index_finds_accented_titles():
+    index = SearchIndex()
+    index.add(1, 'Amélie', 'A shy waitress decides to change the lives of those around her.')
+    index.add(2, 'Léon', 'A hitman takes in a twelve year old girl.')
+
+    assert index.search('AMÉLIE') == [1]
+    assert index.search('léon', limit=1) == [2]
+
+
+def test_index_orders_equal_scores_by_rank_for_any_limit():
+    index = SearchIndex()
+    for rank in (5, 3, 9, 1, 7):
+        index.add(rank, 'Alien', 'The same description')
+
+    assert index.search('alien') == [1, 3, 5, 7, 9]
+    for limit in range(1, 6):
+        assert index.search('alien', limit=limit) == [1, 3, 5, 7, 9][:limit]
+
+
+def test_index_keeps_the_impact_lists_of_terms_not_in_an_added_document():
+    index = SearchIndex()
+    index.add(1, 'Alien', 'A crew meets a creature')
+    index.add(2, 'Aliens', 'A crew returns')
+    index.search('crew', limit=1)
+    index.search('alien', limit=1)
+
+    index.add(3, 'Arrival', 'A linguist meets a creature')
+
+    assert 'crew' in index._impacts
+    assert 'creature' not in index._impacts
+
+
+def test_index_removes_a_document_from_its_terms_only():
+    index = SearchIndex()
+    index.add(1, 'Alien', 'A crew meets a creature')
+    index.add(2, 'Arrival', 'A linguist meets a creature')
+
+    index.remove(1)
+
+    assert index.search('alien') == []
+    assert index.search('creature') == [2]
+    assert 'crew' not in index._postings
+    assert index.number_of_documents == 1
+
+
+def test_index_top_k_matches_a_full_ranking_after_documents_are_added():
+    rng = random.Random(235)
+    words = ['alien', 'crew', 'ship', 'planet', 'war', 'star', 'love', 'city', 'night', 'ghost']
+    index = SearchIndex()
+    for rank in range(1, 301):
+        index.add(rank, ' '.join(rng.choice(words) for _ in range(rng.randint(1, 12))))
+        if rank % 50 == 0:
+            # Build the impact lists, then keep adding documents that change the collection statistics.
+            for word in words:
+                index.search(word, limit=5)
+
+    for query in ['alien', 'crew ship', 'star war night', 'ghost love city planet']:
+        ranking = index.search(query)
+        for limit in (1, 5, 20):
+            assert index.search(query, limit=limit) == ranking[:limit]
@@ -1,11 +1,13 @@
+import threading
 from datetime import date
 
 import pytest
 
 from Movie.authentication.services import AuthenticationException
-from Movie.news import services as news_services
+from Movie.news import dto_cache, page_cache, services as news_services
 from Movie.authentication import services as auth_services
 from Movie.news.services import NonExistentArticleException
+from Movie.utilities.navigation import ActorDirectory
 
 
 def test_can_add_user(in_memory_repo):
@@ -68,6 +70,23 @@ def test_can_add_comment(in_memory_repo):
         None) is not None
 
 
+def test_a_review_is_linked_to_its_movie_and_user_only_under_the_write_lock(in_memory_repo):
+    movie = in_memory_repo.get_movie(3)
+    user = in_memory_repo.get_user('fmercury')
+    reviews = len(movie.review), len(user.reviews), len(in_memory_repo.get_reviews())
+
+    with in_memory_repo._lock.read():
+        writer = threading.Thread(target=news_services.add_review, args=(3, 'Worth the wait.', 'fmercury', in_memory_repo))
+        writer.start()
+        writer.join(0.2)
+        # While a reader holds the lock, the new review is linked to nothing.
+        assert writer.is_alive()
+        assert (len(movie.review), len(user.reviews)) == reviews[:2]
+    writer.join()
+
+    assert (len(movie.review), len(user.reviews), len(in_memory_repo.get_reviews())) == tuple(n + 1 for n in reviews)
+
+
 def test_cannot_add_comment_for_non_existent_article(in_memory_repo):
     article_id = 7
     comment_text = "COVID-19 - what's that?"
@@ -198,3 +217,150 @@ def test_get_comments_for_article_without_comments(in_memory_repo):
     comments_as_dict = news_services.get_comments_for_article(2, in_memory_repo)
     assert len(comments_as_dict) == 0
 
+
+def test_get_movies_by_year_returns_neighbouring_years(in_memory_repo):
+    movies_as_dict, prev_year, next_year = news_services.get_movies_by_year(2014, in_memory_repo)
+
+    assert [movie['id'] for movie in movies_as_dict] == [1]
+    assert prev_year == 2012
+    assert next_year == 2016
+
+
+def test_get_movies_by_year_with_non_existent_year(in_memory_repo):
+    movies_as_dict, prev_year, next_year = news_services.get_movies_by_year(2013, in_memory_repo)
+
+    assert len(movies_as_dict) == 0
+    assert prev_year is None and next_year is None
+
+
+def test_get_first_and_last_year(in_memory_repo):
+    assert news_services.get_first_and_last_year(in_memory_repo) == (2012, 2016)
+
+
+def test_search_movies(in_memory_repo):
+    movies_as_dict, next_cursor = news_services.search_movies('galaxy', 0, 3, in_memory_repo)
+
+    assert [movie['id'] for movie in movies_as_dict] == [1]
+    assert next_cursor is None
+
+
+def test_search_movies_returns_next_cursor(in_memory_repo):
+    # 'the' occurs in every description.
+    movies_as_dict, next_cursor = news_services.search_movies('the', 0, 2, in_memory_repo)
+
+    assert len(movies_as_dict) == 2
+    assert next_cursor == 2
+
+
+def test_get_movies_by_rank_returns_summaries(in_memory_repo):
+    movies_as_dict = news_services.get_movies_by_rank([1], in_memory_repo)
+
+    movie_as_dict = movies_as_dict[0]
+    assert movie_as_dict['title'] == 'Guardians of the Galaxy'
+    assert movie_as_dict['tags'] == [{'name': 'Action'}, {'name': 'Adventure'}, {'name': 'Sci-Fi'}]
+    assert movie_as_dict['comment_count'] == 2
+    assert len(movie_as_dict['comments']) == 2
+    assert all(comment['article_id'] == 1 for comment in movie_as_dict['comments'])
+
+    # The full dict still lists the other movies of each tag.
+    movie_as_dict = news_services.get_movie(1, in_memory_repo)
+    assert movie_as_dict['tags'][0]['tagged_articles'] == [1, 5]
+
+
+def test_summaries_have_only_the_selected_fields(in_memory_repo):
+    movie = in_memory_repo.get_movie(1)
+
+    movie_as_dict = news_services.article_to_summary_dict(movie, ['id', 'title'])
+
+    assert movie_as_dict == {'id': 1, 'title': 'Guardians of the Galaxy'}
+
+
+def test_get_selected_fields_by_rank_builds_only_the_selected_fields(in_memory_repo):
+    articles = news_services.get_selected_fields_by_rank([3, 1], ['id', 'actors', 'comments'], in_memory_repo)
+
+    assert [article['id'] for article in articles] == [3, 1]
+    assert articles[1]['actors'] == ['Chris Pratt', 'Vin Diesel', 'Bradley Cooper', 'Zoe Saldana']
+    assert len(articles[1]['comments']) == 2
+    assert set(articles[0]) == {'id', 'actors', 'comments'}
+
+
+def test_movie_dicts_are_cached_until_the_movie_changes(in_memory_repo):
+    cache = dto_cache.cache_for(in_memory_repo)
+
+    movie_as_dict = news_services.get_movie(1, in_memory_repo)
+    assert news_services.get_movie(1, in_memory_repo) == movie_as_dict
+    assert cache.stats()['hits'] == 1
+
+    # Adding a comment gives the movie a new version, so its cached dicts aren't served again.
+    news_services.add_review(1, 'Loved it', 'fmercury', in_memory_repo)
+    movie_as_dict = news_services.get_movie(1, in_memory_repo)
+    assert len(movie_as_dict['comments']) == 3
+    assert news_services.get_movies_by_rank([1], in_memory_repo)[0]['comment_count'] == 3
+    assert cache.stats()['hits'] == 1
+
+
+def test_movie_summaries_are_looked_up_once_per_movie(in_memory_repo):
+    cache = dto_cache.cache_for(in_memory_repo)
+
+    cold = news_services.get_movies_by_rank([1, 2, 3], in_memory_repo)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    assert news_services.get_movies_by_rank([1, 2, 3], in_memory_repo) == cold
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_movie_dicts_are_not_cached_for_a_repository_whose_versions_miss_changes(in_memory_repo):
+    # As for SqlAlchemyRepository, where other processes add comments without changing this process's versions.
+    in_memory_repo.versions_see_all_changes = False
+    cache = dto_cache.cache_for(in_memory_repo)
+
+    news_services.get_movies_by_rank([1, 2], in_memory_repo)
+    news_services.get_movie(1, in_memory_repo)
+    news_services.get_movies_by_rank([1, 2], in_memory_repo)
+
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 5)
+
+
+def test_dto_cache_evicts_the_least_recently_used_dict():
+    cache = dto_cache.DtoCache(maxsize=2)
+    cache.put('article', 1, (0, 0), {'id': 1})
+    cache.put('article', 2, (0, 0), {'id': 2})
+    cache.get('article', 1, (0, 0))
+    cache.put('article', 3, (0, 0), {'id': 3})
+
+    assert cache.get('article', 2, (0, 0)) is None
+    assert cache.get('article', 1, (0, 0)) == {'id': 1}
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2}
+
+
+def test_adding_a_comment_drops_the_cached_pages_showing_the_movie(in_memory_repo):
+    cache = page_cache.cache_for(in_memory_repo)
+    cache.put('page of 1 and 2', page_cache.CachedPage(b'1 2', 'text/html', frozenset({1, 2}), 0.5))
+    cache.put('page of 3', page_cache.CachedPage(b'3', 'text/html', frozenset({3}), 0.5))
+    generation = cache.generation
+
+    news_services.add_review(2, 'Better than the first one', 'fmercury', in_memory_repo)
+    cache.put('page of 2 made meanwhile', page_cache.CachedPage(b'2', 'text/html', frozenset({2}), 0.5), generation)
+
+    assert cache.get('page of 1 and 2') is None
+    assert cache.get('page of 2 made meanwhile') is None
+    assert cache.get('page of 3').body == b'3'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['invalidations'], stats['size']) == (1, 2, 1, 1)
+    assert stats['size_bytes'] == 1
+    assert stats['seconds_saved'] == 0.5
+
+
+def test_actor_directory_pages_through_each_letter():
+    names = ['Zoe Saldana', 'anya Taylor-Joy', 'Amy Adams', '50 Cent', 'Émile Hirsch']
+    names += [f'Actor {i}' for i in range(4)]
+    directory = ActorDirectory(names, page_size=3)
+
+    assert directory.buckets == ['A', 'Z', '#']
+    assert directory.number_of_pages('A') == 2
+    assert directory.page('A', 0) == ['Actor 0', 'Actor 1', 'Actor 2']
+    assert directory.page('A', 1) == ['Actor 3', 'Amy Adams', 'anya Taylor-Joy']
+    assert directory.page('A', 2) == []
+    assert directory.page('#', 0) == ['50 Cent', 'Émile Hirsch']
+    assert directory.page('B', 0) == []
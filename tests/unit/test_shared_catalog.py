@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+
+import pytest
+
+from Movie import create_app
+from Movie.adapters import columnar_repository, shared_catalog
+from Movie.adapters.columnar_repository import ColumnarRepository
+from Movie.adapters.repository import RepositoryException
+from Movie.domain.domain_model import Movie, Genre
+
+
+def test_shared_catalog_repository_reads_the_same_catalog(memory_data_path, tmp_path):
+    catalog_path = str(tmp_path / 'catalog.bin')
+    assert shared_catalog.catalog_is_stale(catalog_path, memory_data_path)
+    shared_catalog.build_catalog(memory_data_path, catalog_path)
+    assert not shared_catalog.catalog_is_stale(catalog_path, memory_data_path)
+
+    repo = shared_catalog.SharedCatalogRepository(catalog_path)
+    shared_catalog.populate(memory_data_path, repo)
+    columnar_repo = ColumnarRepository()
+    columnar_repository.populate(memory_data_path, columnar_repo)
+
+    assert repo.get_catalog_version() > 0
+    movie = repo.get_first_movie()
+    assert movie == columnar_repo.get_first_movie()
+    assert movie.actors == columnar_repo.get_first_movie().actors
+    assert repo.get_number_of_movie() == columnar_repo.get_number_of_movie()
+    assert repo.get_movie_by_year(2016) == columnar_repo.get_movie_by_year(2016)
+    assert repo.get_release_years() == columnar_repo.get_release_years()
+    assert repo.get_movie_ranks_for_genre('Action') == columnar_repo.get_movie_ranks_for_genre('Action')
+    assert repo.get_movie_ranks_for_actor('Chris Pratt') == [1]
+    assert repo.get_movie_ranks_for_genre('Western') == []
+    assert repo.search_movie_ranks('guardians galaxy') == columnar_repo.search_movie_ranks('guardians galaxy')
+    assert len(repo.get_actors()) == len(columnar_repo.get_actors())
+    assert repo.get_user('fmercury') is not None
+    assert len(repo.get_reviews()) == len(columnar_repo.get_reviews())
+
+
+def test_shared_catalog_repository_does_not_add_movies(memory_data_path, tmp_path):
+    catalog_path = str(tmp_path / 'catalog.bin')
+    shared_catalog.build_catalog(memory_data_path, catalog_path)
+    repo = shared_catalog.SharedCatalogRepository(catalog_path)
+
+    with pytest.raises(RepositoryException):
+        repo.add_movie(Movie('Split', 2016), 6, '')
+    with pytest.raises(RepositoryException):
+        repo.add_genre(Genre('Western'))
+
+
+def test_catalog_is_built_once_by_workers_starting_together(memory_data_path, tmp_path, monkeypatch):
+    catalog_path = str(tmp_path / 'catalog.bin')
+    build_catalog = shared_catalog.build_catalog
+    builds = list()
+
+    def slow_build_catalog(data_path, path):
+        builds.append(path)
+        time.sleep(0.1)
+        build_catalog(data_path, path)
+
+    monkeypatch.setattr(shared_catalog, 'build_catalog', slow_build_catalog)
+    workers = [threading.Thread(target=shared_catalog.ensure_catalog, args=(memory_data_path, catalog_path))
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert builds == [catalog_path]
+    assert sorted(os.listdir(tmp_path)) == ['catalog.bin', 'catalog.bin.lock']
+    assert shared_catalog.SharedCatalogRepository(catalog_path).get_number_of_movie() > 0
+
+
+def test_shared_repository_requires_a_catalog_path(memory_data_path):
+    with pytest.raises(RuntimeError, match='SHARED_CATALOG_PATH'):
+        create_app({
+            'TESTING': True,
+            'REPOSITORY': 'shared',
+            'SHARED_CATALOG_PATH': None,
+            'TEST_DATA_PATH': memory_data_path,
+        })
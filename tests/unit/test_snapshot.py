@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import pytest
+
+from Movie.adapters import memory_repository, snapshot
+from Movie.adapters.memory_repository import MemoryRepository
+
+
+def test_repository_can_be_restored_from_a_snapshot(memory_data_path, tmp_path):
+    repo = MemoryRepository()
+    memory_repository.populate(memory_data_path, repo)
+    snapshot_path = str(tmp_path / 'repository.snapshot')
+    snapshot.write_snapshot(repo, snapshot_path)
+
+    restored = MemoryRepository()
+    snapshot.read_snapshot(snapshot_path, restored)
+
+    assert restored.get_number_of_movie() == repo.get_number_of_movie()
+    assert restored.get_first_movie() == repo.get_first_movie()
+    assert restored.get_release_years() == repo.get_release_years()
+    assert restored.get_movie_by_year(2016) == repo.get_movie_by_year(2016)
+    assert [genre.genre_name for genre in restored.get_genres()] == [genre.genre_name for genre in repo.get_genres()]
+    assert restored.get_movie_ranks_for_genre('Sci-Fi') == repo.get_movie_ranks_for_genre('Sci-Fi')
+    assert restored.get_movie(1).genres == repo.get_movie(1).genres
+    assert restored.search_movie_ranks('guardians') == repo.search_movie_ranks('guardians')
+
+    # Passwords are stored already hashed, and comments keep their authors and timestamps.
+    assert restored.get_user('fmercury').password == repo.get_user('fmercury').password
+    assert [(review.user.user_name, review.movie.id, review.timestamp) for review in restored.get_reviews()] == \
+           [(review.user.user_name, review.movie.id, review.timestamp) for review in repo.get_reviews()]
+
+
+def test_repository_is_loaded_from_csv_if_the_snapshot_is_corrupt(memory_data_path, tmp_path):
+    repo = MemoryRepository()
+    memory_repository.populate(memory_data_path, repo)
+    snapshot_path = str(tmp_path / 'repository.snapshot')
+    snapshot.write_snapshot(repo, snapshot_path)
+    with open(snapshot_path, 'r+b') as snapshot_file:
+        snapshot_file.seek(-1, os.SEEK_END)
+        last_byte = snapshot_file.read(1)
+        snapshot_file.seek(-1, os.SEEK_END)
+        snapshot_file.write(bytes([last_byte[0] ^ 0xff]))
+
+    with pytest.raises(snapshot.SnapshotException):
+        snapshot.read_snapshot(snapshot_path, MemoryRepository())
+
+    restored = MemoryRepository()
+    assert not snapshot.populate(snapshot_path, memory_data_path, restored)
+    assert restored.get_number_of_movie() == repo.get_number_of_movie()
+
+
+def test_repository_is_loaded_from_csv_if_the_snapshot_is_stale(memory_data_path, tmp_path):
+    data_path = str(tmp_path / 'data')
+    shutil.copytree(memory_data_path, data_path)
+    repo = MemoryRepository()
+    memory_repository.populate(data_path, repo)
+    snapshot_path = str(tmp_path / 'repository.snapshot')
+    snapshot.write_snapshot(repo, snapshot_path)
+
+    assert snapshot.populate(snapshot_path, data_path, MemoryRepository())
+
+    # Touch a CSV file after the snapshot was written.
+    snapshot_mtime = os.path.getmtime(snapshot_path)
+    os.utime(os.path.join(data_path, 'comments.csv'), (snapshot_mtime + 10, snapshot_mtime + 10))
+
+    assert not snapshot.populate(snapshot_path, data_path, MemoryRepository())